@@ -4,6 +4,9 @@
 -- Enable UUID extension
 CREATE EXTENSION IF NOT EXISTS "uuid-ossp";
 
+-- Enable btree_gist (equality on UUID inside GiST exclusion constraints)
+CREATE EXTENSION IF NOT EXISTS btree_gist;
+
 -- Create ENUM types for better data integrity
 CREATE TYPE appointment_status AS ENUM ('scheduled', 'confirmed', 'cancelled', 'completed', 'no_show');
 CREATE TYPE notification_channel AS ENUM ('email', 'sms', 'telegram', 'whatsapp');
@@ -45,6 +48,21 @@ CREATE TABLE IF NOT EXISTS doctors (
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
 );
 
+-- Table: Appointment Series
+-- Stores recurring series; occurrences are rows in appointments
+CREATE TABLE IF NOT EXISTS appointment_series (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    patient_id UUID NOT NULL REFERENCES patients(id) ON DELETE CASCADE,
+    doctor_id UUID NOT NULL REFERENCES doctors(id) ON DELETE CASCADE,
+    recurrence_rule JSONB NOT NULL, -- {"frequency": "weekly", "interval": 1, "weekdays": ["Monday"], "until": null, "count": 10}
+    start_date DATE NOT NULL,
+    start_time TIME NOT NULL,
+    end_time TIME NOT NULL,
+    reason TEXT,
+    notes TEXT,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
 -- Table: Appointments
 -- Stores appointment details
 CREATE TABLE IF NOT EXISTS appointments (
@@ -65,8 +83,13 @@ CREATE TABLE IF NOT EXISTS appointments (
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
     cancelled_at TIMESTAMP WITH TIME ZONE,
     cancellation_reason TEXT,
-    -- Ensure no double booking for doctors
-    CONSTRAINT unique_doctor_appointment UNIQUE(doctor_id, appointment_date, appointment_time)
+    series_id UUID REFERENCES appointment_series(id) ON DELETE SET NULL,
+    -- Ensure no double booking for doctors: active appointments of the same
+    -- doctor may not overlap (checked atomically by the INSERT/UPDATE itself)
+    CONSTRAINT no_overlapping_doctor_appointments EXCLUDE USING gist (
+        doctor_id WITH =,
+        tsrange(appointment_date + start_time, appointment_date + end_time) WITH &&
+    ) WHERE (status IN ('scheduled', 'confirmed'))
 );
 
 -- Table: Notifications
@@ -107,12 +130,46 @@ CREATE TABLE IF NOT EXISTS system_settings (
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
 );
 
+-- Table: Doctor Stats (counters maintained from appointment events,
+-- recomputed periodically by the appointment-service reconciler)
+CREATE TABLE IF NOT EXISTS doctor_stats (
+    doctor_id UUID PRIMARY KEY REFERENCES doctors(id) ON DELETE CASCADE,
+    scheduled_count BIGINT NOT NULL DEFAULT 0,
+    confirmed_count BIGINT NOT NULL DEFAULT 0,
+    completed_count BIGINT NOT NULL DEFAULT 0,
+    cancelled_count BIGINT NOT NULL DEFAULT 0,
+    no_show_count BIGINT NOT NULL DEFAULT 0,
+    duration_minutes_sum BIGINT NOT NULL DEFAULT 0,
+    completion_seconds_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+    first_appointment_date DATE,
+    last_appointment_date DATE,
+    reconciled_at TIMESTAMP WITH TIME ZONE,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Table: Appointment Rollups (appointments per doctor, day, start hour
+-- and status; maintained from appointment events, rebuilt periodically)
+CREATE TABLE IF NOT EXISTS appointment_rollups_daily (
+    appointment_date DATE NOT NULL,
+    doctor_id UUID NOT NULL REFERENCES doctors(id) ON DELETE CASCADE,
+    hour SMALLINT NOT NULL,
+    status appointment_status NOT NULL,
+    appointment_count BIGINT NOT NULL DEFAULT 0,
+    duration_minutes_sum BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (appointment_date, doctor_id, hour, status)
+);
+
 -- Create indexes for better query performance
 CREATE INDEX idx_appointments_patient_id ON appointments(patient_id);
 CREATE INDEX idx_appointments_doctor_id ON appointments(doctor_id);
 CREATE INDEX idx_appointments_date ON appointments(appointment_date);
 CREATE INDEX idx_appointments_status ON appointments(status);
 CREATE INDEX idx_appointments_date_time ON appointments(appointment_date, appointment_time);
+CREATE INDEX idx_appointments_patient_keyset ON appointments(patient_id, appointment_date, start_time, id);
+CREATE INDEX idx_appointments_doctor_keyset ON appointments(doctor_id, appointment_date, start_time, id);
+CREATE INDEX idx_appointments_keyset ON appointments(appointment_date, start_time, id);
+CREATE INDEX idx_appointments_series_id ON appointments(series_id) WHERE series_id IS NOT NULL;
+CREATE INDEX idx_appointment_rollups_doctor_date ON appointment_rollups_daily(doctor_id, appointment_date);
 CREATE INDEX idx_notifications_appointment_id ON notifications(appointment_id);
 CREATE INDEX idx_notifications_patient_id ON notifications(patient_id);
 CREATE INDEX idx_notifications_status ON notifications(status);
@@ -139,6 +196,23 @@ CREATE TRIGGER update_doctors_updated_at BEFORE UPDATE ON doctors
 CREATE TRIGGER update_appointments_updated_at BEFORE UPDATE ON appointments
     FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
 
+-- Notify listeners (appointment-service schedule cache) when a doctor changes
+CREATE OR REPLACE FUNCTION notify_doctor_change()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        PERFORM pg_notify('doctor_changes', OLD.id::text);
+        RETURN OLD;
+    END IF;
+    PERFORM pg_notify('doctor_changes', NEW.id::text);
+    RETURN NEW;
+END;
+$$ language 'plpgsql';
+
+CREATE TRIGGER doctor_change_notify_trigger
+AFTER INSERT OR UPDATE OR DELETE ON doctors
+    FOR EACH ROW EXECUTE FUNCTION notify_doctor_change();
+
 -- Function to log appointment changes
 CREATE OR REPLACE FUNCTION log_appointment_changes()
 RETURNS TRIGGER AS $$
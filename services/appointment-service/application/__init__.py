@@ -3,13 +3,17 @@
 
 from .use_cases import (
     CreateAppointmentUseCase,
+    BulkCreateAppointmentsUseCase,
+    CreateRecurringSeriesUseCase,
     UpdateAppointmentUseCase,
     CancelAppointmentUseCase,
     GetAppointmentUseCase,
     ListAppointmentsUseCase,
     ConfirmAppointmentUseCase,
     CompleteAppointmentUseCase,
+    AppointmentPage,
     IAppointmentRepository,
+    IDoctorRepository,
     IEventPublisher,
     IAvailabilityService,
     IValidationService
@@ -26,14 +30,18 @@ from .services import (
 __all__ = [
     # Use Cases
     'CreateAppointmentUseCase',
+    'BulkCreateAppointmentsUseCase',
+    'CreateRecurringSeriesUseCase',
     'UpdateAppointmentUseCase',
     'CancelAppointmentUseCase',
     'GetAppointmentUseCase',
     'ListAppointmentsUseCase',
     'ConfirmAppointmentUseCase',
     'CompleteAppointmentUseCase',
+    'AppointmentPage',
     # Interfaces
     'IAppointmentRepository',
+    'IDoctorRepository',
     'IEventPublisher',
     'IAvailabilityService',
     'IValidationService',
@@ -1,27 +1,460 @@
 # Domain Services
 # Demonstrates: Domain Logic Encapsulation, Business Rules
 
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import date, time, datetime, timedelta
+import asyncio
+import calendar
+import heapq
+import json
 import logging
 
 from domain.entities import Appointment, AppointmentStatus, TimeSlot
 from domain.value_objects import DoctorId, PatientId
+from domain.availability import (
+    DayOccupancy,
+    ScheduleTemplate,
+    DEFAULT_SCHEDULE,
+    interval_mask,
+    minute_of_day,
+    time_of_minute
+)
 
 logger = logging.getLogger(__name__)
 
+# Statuses that occupy a doctor's time
+ACTIVE_STATUSES = (AppointmentStatus.SCHEDULED, AppointmentStatus.CONFIRMED)
+
+def _json_column(value):
+    """JSONB column value; asyncpg returns JSONB as text unless decoded"""
+    return json.loads(value) if isinstance(value, str) else value
+
+class DoctorScheduleCache:
+    """
+    In-process cache of compiled doctor schedule templates
+    Demonstrates: Cache-aside with explicit invalidation
+    
+    Templates are compiled once from the doctors table JSONB columns and
+    reused by every availability call. invalidate() is wired to the
+    doctor_changes LISTEN/NOTIFY channel, and from_doctor() also recompiles
+    whenever the row's updated_at differs from the cached version.
+    """
+    
+    def __init__(self, doctor_repository=None):
+        self.doctor_repository = doctor_repository
+        self._templates: Dict[str, tuple] = {}  # doctor_id -> (version, template)
+    
+    async def get(self, doctor_id) -> ScheduleTemplate:
+        """Get the compiled template for a doctor, loading it on miss"""
+        key = str(doctor_id)
+        cached = self._templates.get(key)
+        if cached is not None:
+            return cached[1]
+        
+        if self.doctor_repository is None:
+            return DEFAULT_SCHEDULE
+        
+        doctor = await self.doctor_repository.find_by_id(key)
+        if doctor is None:
+            self._templates[key] = (None, DEFAULT_SCHEDULE)
+            return DEFAULT_SCHEDULE
+        
+        return self.from_doctor(doctor)
+    
+    def from_doctor(self, doctor: Dict[str, Any]) -> ScheduleTemplate:
+        """Get the template for an already loaded doctor row"""
+        key = str(doctor['id'])
+        version = doctor.get('updated_at')
+        cached = self._templates.get(key)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        
+        template = ScheduleTemplate.compile(
+            _json_column(doctor.get('available_days')),
+            _json_column(doctor.get('available_hours'))
+        )
+        self._templates[key] = (version, template)
+        return template
+    
+    def invalidate(self, doctor_id=None) -> None:
+        """Drop one doctor's template (or all templates if no ID given)"""
+        if doctor_id is None:
+            self._templates.clear()
+        else:
+            self._templates.pop(str(doctor_id), None)
+        logger.debug(f"Schedule cache invalidated for doctor: {doctor_id or 'all'}")
+
+class DoctorDirectorySnapshot:
+    """
+    Immutable copy of the doctor directory with its lookup indexes
+    Rows keep the repository's order (by name) and shape
+    """
+    
+    __slots__ = ('doctors', 'version', '_by_specialty', '_by_weekday')
+    
+    def __init__(self, doctors: List[Dict[str, Any]], version=None):
+        self.doctors = doctors
+        self.version = version
+        by_specialty: Dict[str, List[int]] = {}
+        by_weekday: Dict[str, List[int]] = {}
+        for position, doctor in enumerate(doctors):
+            specialty = (doctor.get('specialty') or '').lower()
+            by_specialty.setdefault(specialty, []).append(position)
+            for day in _json_column(doctor.get('available_days')) or []:
+                by_weekday.setdefault(day, []).append(position)
+        self._by_specialty = by_specialty
+        self._by_weekday = by_weekday
+    
+    def _positions(self, specialty: Optional[str], available_day: Optional[str]):
+        """Ascending row positions matching both filters (None = no filter)"""
+        positions = None
+        if specialty:
+            # Partial, case-insensitive match (ILIKE '%x%'), checked once
+            # per distinct specialty rather than once per doctor
+            needle = specialty.lower()
+            matched = [
+                rows for name, rows in self._by_specialty.items() if needle in name
+            ]
+            positions = matched[0] if len(matched) == 1 else sorted(
+                position for rows in matched for position in rows
+            )
+        if available_day:
+            day_positions = self._by_weekday.get(available_day, [])
+            if positions is None:
+                positions = day_positions
+            else:
+                on_day = set(day_positions)
+                positions = [position for position in positions if position in on_day]
+        return range(len(self.doctors)) if positions is None else positions
+    
+    def find_page(
+        self,
+        specialty: Optional[str] = None,
+        available_day: Optional[str] = None,
+        limit: int = 20,
+        offset: int = 0
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """One page of matching doctors and the total match count"""
+        positions = self._positions(specialty, available_day)
+        doctors = self.doctors
+        return [doctors[position] for position in positions[offset:offset + limit]], len(positions)
+
+class DoctorDirectory:
+    """
+    In-memory doctor directory
+    Demonstrates: Snapshot read model - the doctors table changes rarely
+    but is listed on every bot interaction, so /doctors is served from a
+    process-local copy indexed by specialty and weekday
+    
+    invalidate() is wired to the doctor_changes LISTEN/NOTIFY channel and
+    reloads the snapshot in the background; a periodic version check
+    (row count + last updated_at) catches notifications lost while the
+    listener connection was down. Until the first load, and while a
+    change is being reloaded, pages come from the repository (one query)
+    so a change is never hidden behind the old snapshot.
+    
+    Returned rows are shared with the snapshot and must not be modified.
+    """
+    
+    def __init__(self, doctor_repository, refresh_interval: float = 60):
+        self.doctor_repository = doctor_repository
+        self.refresh_interval = refresh_interval
+        self._snapshot: Optional[DoctorDirectorySnapshot] = None
+        self._stale = True
+        self._changes = 0  # bumped by every invalidate()
+        self._reload: Optional[asyncio.Task] = None
+        self._monitor: Optional[asyncio.Task] = None
+    
+    async def start(self) -> None:
+        """Load the first snapshot and start the version check"""
+        try:
+            await self.refresh()
+        except Exception as e:
+            logger.warning(f"Doctor directory not loaded, using the database: {e}")
+        if self.refresh_interval > 0:
+            self._monitor = asyncio.create_task(self._watch_version())
+    
+    async def stop(self) -> None:
+        """Stop background work"""
+        for task in (self._monitor, self._reload):
+            if task is not None:
+                task.cancel()
+        self._monitor = self._reload = None
+    
+    async def refresh(self) -> None:
+        """Replace the snapshot with the current table contents"""
+        changes = self._changes
+        # Version first: a change landing between the two reads makes the
+        # stored version older than the rows, which only causes one more
+        # reload later
+        version = await self.doctor_repository.get_version()
+        doctors = await self.doctor_repository.find_all()
+        self._snapshot = DoctorDirectorySnapshot(doctors, version)
+        # A notification that arrived meanwhile may not be in these rows
+        if changes == self._changes:
+            self._stale = False
+        logger.info(f"Doctor directory loaded: {len(doctors)} doctors")
+    
+    def invalidate(self, doctor_id=None) -> None:
+        """
+        A doctor changed: stop serving the snapshot and reload it
+        Bursts of notifications share one reload
+        """
+        self._changes += 1
+        self._stale = True
+        if self._reload is None or self._reload.done():
+            self._reload = asyncio.create_task(self._reload_after_change())
+    
+    async def _reload_after_change(self) -> None:
+        # Go around until a reload completes without a notification
+        # arriving during it
+        while self._stale:
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.warning(f"Doctor directory reload failed: {e}")
+                return
+    
+    async def _watch_version(self) -> None:
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                version = await self.doctor_repository.get_version()
+                snapshot = self._snapshot
+                if snapshot is None or version != snapshot.version:
+                    await self.refresh()
+            except Exception as e:
+                logger.warning(f"Doctor directory version check failed: {e}")
+    
+    async def find_page(
+        self,
+        specialty: Optional[str] = None,
+        available_day: Optional[str] = None,
+        limit: int = 20,
+        offset: int = 0
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """One page of the directory and the total match count"""
+        if self._stale or self._snapshot is None:
+            return await self.doctor_repository.find_page(
+                specialty=specialty,
+                available_day=available_day,
+                limit=limit,
+                offset=offset
+            )
+        return self._snapshot.find_page(specialty, available_day, limit, offset)
+
+class SummaryReconciler:
+    """
+    Periodic recomputation of a materialized summary (doctor statistics,
+    appointment rollups)
+    Demonstrates: Reconciliation job - summaries are maintained from
+    events, this bounds how long a lost or raced delta can skew them
+    
+    The repository provides reconcile(). The first run happens right
+    after start(), in the background, so summaries cover appointments
+    made before they were maintained.
+    """
+    
+    def __init__(self, repository, name: str, interval: float = 900):
+        self.repository = repository
+        self.name = name
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+    
+    async def start(self) -> None:
+        """Start the reconciliation loop"""
+        self._task = asyncio.create_task(self._run())
+    
+    async def stop(self) -> None:
+        """Stop the reconciliation loop"""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+    
+    async def reconcile(self) -> int:
+        """Recompute the summary now"""
+        rows = await self.repository.reconcile()
+        logger.info(f"{self.name} reconciled: {rows} rows")
+        return rows
+    
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.reconcile()
+            except Exception as e:
+                logger.warning(f"{self.name} reconciliation failed: {e}")
+            if self.interval <= 0:
+                return
+            await asyncio.sleep(self.interval)
+
+class AppointmentAnalyticsService:
+    """
+    Clinic-wide appointment statistics
+    Demonstrates: Reads from rollups - cost depends on the number of
+    doctor x day x hour x status rows in the range, not on the number of
+    appointments
+    """
+    
+    def __init__(self, rollup_repository):
+        self.rollup_repository = rollup_repository
+    
+    async def get_statistics(
+        self,
+        date_from: date,
+        date_to: date,
+        doctor_id: Optional[DoctorId] = None
+    ) -> Dict[str, Any]:
+        """
+        AppointmentStatisticsDTO fields for appointments dated in
+        [date_from, date_to], optionally for one doctor
+        Busiest day and hour ignore cancelled appointments.
+        """
+        if date_from > date_to:
+            raise ValueError("date_from must not be after date_to")
+        
+        summary = await self.rollup_repository.summarize(date_from, date_to, doctor_id)
+        counts = {status.value: 0 for status in AppointmentStatus}
+        duration_minutes = 0
+        for status, (count, minutes) in summary['by_status'].items():
+            counts[status] = count
+            duration_minutes += minutes
+        
+        total = sum(counts.values())
+        by_weekday = summary['by_weekday']
+        by_hour = summary['by_hour']
+        busiest_weekday = max(by_weekday, key=by_weekday.get) if by_weekday else None
+        
+        return {
+            "total_appointments": total,
+            "scheduled_count": counts['scheduled'],
+            "confirmed_count": counts['confirmed'],
+            "completed_count": counts['completed'],
+            "cancelled_count": counts['cancelled'],
+            "no_show_count": counts['no_show'],
+            "average_duration_minutes": round(duration_minutes / total, 2) if total else 0.0,
+            "busiest_day": calendar.day_name[busiest_weekday - 1] if busiest_weekday else None,
+            "busiest_hour": max(by_hour, key=by_hour.get) if by_hour else None,
+            "cancellation_rate": round(counts['cancelled'] / total, 3) if total else 0.0,
+            "no_show_rate": round(counts['no_show'] / total, 3) if total else 0.0
+        }
+
+class OccupancyCache:
+    """
+    Materialized per-doctor/day occupancy bitmaps in the shared cache
+    Demonstrates: Write-driven incremental maintenance - appointment
+    events flip only the affected minutes instead of invalidating
+    
+    Entries are filled on read misses and patched by
+    OccupancyEventHandler; patches never create entries, so a missing
+    day is always recomputed from the database. A fill is claimed before
+    the bookings are read (begin_fill) and only stored if no patch hit
+    the missing entry meanwhile (put), so an event landing mid-fill is
+    never lost.
+    """
+    
+    def __init__(self, cache_service, ttl: int = 3600):
+        self.cache = cache_service
+        self.ttl = ttl
+    
+    @staticmethod
+    def _key(doctor_id, day: date) -> str:
+        return f"occupancy:{doctor_id}:{day.isoformat()}"
+    
+    async def get(self, doctor_id, day: date) -> Optional[DayOccupancy]:
+        """Get the materialized occupancy, None on miss"""
+        cached = await self.cache.get(self._key(doctor_id, day))
+        if cached is None:
+            return None
+        return DayOccupancy.from_bitmap(cached)
+    
+    async def begin_fill(self, doctor_id, day: date) -> str:
+        """Claim the fill of a missing day, before reading its bookings"""
+        return await self.cache.begin_fill(self._key(doctor_id, day))
+    
+    async def put(self, doctor_id, day: date, occupancy: DayOccupancy, token: str) -> bool:
+        """
+        Store a freshly computed occupancy
+        Skipped (False) when a booking change since begin_fill voided it
+        """
+        return await self.cache.complete_fill(
+            self._key(doctor_id, day),
+            token,
+            self.ttl,
+            occupancy.to_bitmap()
+        )
+    
+    async def book(self, doctor_id, day: date, time_slot: TimeSlot) -> None:
+        """Mark the slot's minutes as occupied"""
+        await self.cache.set_bits(
+            self._key(doctor_id, day),
+            time_slot.start_minute,
+            time_slot.end_minute,
+            1
+        )
+    
+    async def book_many(self, slots: List[Tuple[Any, date, TimeSlot]]) -> None:
+        """Mark several (doctor_id, day, time_slot) as occupied at once"""
+        await self.cache.set_bits_many([
+            (self._key(doctor_id, day), time_slot.start_minute, time_slot.end_minute, 1)
+            for doctor_id, day, time_slot in slots
+        ])
+    
+    async def release(self, doctor_id, day: date, time_slot: TimeSlot) -> None:
+        """Mark the slot's minutes as free"""
+        await self.cache.set_bits(
+            self._key(doctor_id, day),
+            time_slot.start_minute,
+            time_slot.end_minute,
+            0
+        )
+
 class AvailabilityService:
     """
     Domain Service for managing appointment availability
     Demonstrates: Domain Service Pattern, Business Logic Encapsulation
     """
     
-    def __init__(self, appointment_repository):
+    def __init__(
+        self,
+        appointment_repository,
+        doctor_repository=None,
+        schedule_cache=None,
+        occupancy_cache: Optional[OccupancyCache] = None
+    ):
         """
         Initialize with repository
         Note: Domain services can use repositories but remain focused on domain logic
         """
         self.appointment_repository = appointment_repository
+        self.doctor_repository = doctor_repository
+        self.schedule_cache = schedule_cache or DoctorScheduleCache(doctor_repository)
+        self.occupancy_cache = occupancy_cache
+    
+    async def _day_occupancy(self, doctor_id: DoctorId, appointment_date: date) -> DayOccupancy:
+        """
+        Occupancy of one doctor/day
+        Served from the materialized bitmap when cached, recomputed from
+        the database (and materialized) on miss
+        """
+        if self.occupancy_cache is None:
+            existing_appointments = await self.appointment_repository.find_by_doctor_and_date(
+                doctor_id, appointment_date
+            )
+            return self._build_occupancy(existing_appointments)
+        
+        occupancy = await self.occupancy_cache.get(doctor_id, appointment_date)
+        if occupancy is not None:
+            return occupancy
+        
+        # Claim first, then read the primary: every booking change after
+        # the claim either is in the rows or voids the put
+        token = await self.occupancy_cache.begin_fill(doctor_id, appointment_date)
+        existing_appointments = await self.appointment_repository.find_by_doctor_and_date(
+            doctor_id, appointment_date, primary=True
+        )
+        occupancy = self._build_occupancy(existing_appointments)
+        await self.occupancy_cache.put(doctor_id, appointment_date, occupancy, token)
+        return occupancy
     
     async def is_slot_available(
         self, 
@@ -32,20 +465,15 @@ class AvailabilityService:
         """
         Check if a specific time slot is available for a doctor
         Business Rule: No overlapping appointments
+        Note: Advisory only - bookings are enforced atomically on insert
         """
-        # Get all appointments for the doctor on that date
-        existing_appointments = await self.appointment_repository.find_by_doctor_and_date(
-            doctor_id, appointment_date
-        )
+        occupancy = await self._day_occupancy(doctor_id, appointment_date)
         
-        # Check for overlaps
-        for appointment in existing_appointments:
-            if appointment.status in [AppointmentStatus.SCHEDULED, AppointmentStatus.CONFIRMED]:
-                if time_slot.overlaps_with(appointment.time_slot):
-                    logger.info(
-                        f"Slot  {time_slot.start_time}-{time_slot.end_time}  overlaps with existing appointment"
-                    )
-                    return False
+        if not occupancy.is_free(time_slot.start_minute, time_slot.end_minute):
+            logger.info(
+                f"Slot  {time_slot.start_time}-{time_slot.end_time}  overlaps with existing appointment"
+            )
+            return False
         
         return True
     
@@ -58,67 +486,230 @@ class AvailabilityService:
         """
         Get all available time slots for a doctor on a specific date
         Business Rules:
-        - Working hours: 8:00 AM to 6:00 PM
-        - Lunch break: 1:00 PM to 2:00 PM
+        - Working days/hours come from the doctor's schedule
+          (default: Monday to Friday, 8:00 AM to 6:00 PM)
+        - Lunch break: 1:00 PM to 2:00 PM unless the schedule overrides it
         - Minimum slot duration: 15 minutes
+        Demonstrates: Bitmap availability engine (see domain.availability)
         """
-        available_slots = []
+        schedule = await self.schedule_cache.get(doctor_id)
+        working_mask = schedule.working_mask(appointment_date)
+        if not working_mask:
+            return []
         
-        # Define working hours
-        working_start = time(8, 0)  # 8:00 AM
-        lunch_start = time(13, 0)   # 1:00 PM
-        lunch_end = time(14, 0)     # 2:00 PM
-        working_end = time(18, 0)   # 6:00 PM
+        # Get existing appointments (materialized bitmap when cached)
+        occupancy = await self._day_occupancy(doctor_id, appointment_date)
         
-        # Get existing appointments
-        existing_appointments = await self.appointment_repository.find_by_doctor_and_date(
-            doctor_id, appointment_date
+        return self._free_slots(occupancy, working_mask, duration_minutes)
+    
+    @staticmethod
+    def _build_occupancy(appointments: List[Appointment]) -> DayOccupancy:
+        """Occupancy bitmap of scheduled/confirmed appointments"""
+        return DayOccupancy.from_intervals(
+            (apt.time_slot.start_minute, apt.time_slot.end_minute)
+            for apt in appointments
+            if apt.status in ACTIVE_STATUSES
         )
-        
-        # Filter only scheduled/confirmed appointments
-        booked_slots = [
-            apt.time_slot for apt in existing_appointments
-            if apt.status in [AppointmentStatus.SCHEDULED, AppointmentStatus.CONFIRMED]
+    
+    @staticmethod
+    def _free_slots(
+        occupancy: DayOccupancy,
+        working_mask: int,
+        duration_minutes: int
+    ) -> List[TimeSlot]:
+        """Intersect bookings with the working template and build slots"""
+        return [
+            TimeSlot.from_minutes(start, start + duration_minutes)
+            for start in occupancy.free_starts(duration_minutes, working_mask)
         ]
+    
+    async def get_available_slots_range(
+        self,
+        doctor_id: DoctorId,
+        start_date: date,
+        end_date: date,
+        duration_minutes: int = 30
+    ) -> Dict[date, List[TimeSlot]]:
+        """
+        Get available time slots for every day in a date range
+        Demonstrates: One range query, per-day computation in memory
+        """
+        if end_date < start_date:
+            raise ValueError("end_date must be on or after start_date")
+        if duration_minutes <= 0:
+            raise ValueError("duration_minutes must be positive")
         
-        # Generate possible slots
-        current_time = working_start
+        schedule = await self.schedule_cache.get(doctor_id)
         
-        while current_time < working_end:
-            # Calculate end time for this slot
-            end_minutes = current_time.hour * 60 + current_time.minute + duration_minutes
-            end_hour = end_minutes // 60
-            end_minute = end_minutes % 60
-            
-            # Skip if goes beyond working hours
-            if end_hour >= 18:
-                break
-            
-            slot_end = time(end_hour, end_minute)
-            
-            # Skip lunch break
-            if (current_time < lunch_end and slot_end > lunch_start):
-                current_time = lunch_end
-                continue
-            
-            # Create potential slot
-            potential_slot = TimeSlot(current_time, slot_end)
-            
-            # Check if slot is available
-            is_available = True
-            for booked_slot in booked_slots:
-                if potential_slot.overlaps_with(booked_slot):
-                    is_available = False
-                    break
+        booked = await self.appointment_repository.find_booked_intervals(
+            doctor_id, start_date, end_date
+        )
+        
+        occupancy_by_day: Dict[date, DayOccupancy] = {}
+        for booked_date, start_time, end_time in booked:
+            occupancy_by_day.setdefault(booked_date, DayOccupancy()).book(
+                minute_of_day(start_time), minute_of_day(end_time)
+            )
+        
+        slots_by_day = {}
+        current_date = start_date
+        while current_date <= end_date:
+            occupancy = occupancy_by_day.get(current_date) or DayOccupancy()
+            slots_by_day[current_date] = self._free_slots(
+                occupancy, schedule.working_mask(current_date), duration_minutes
+            )
+            current_date = current_date + timedelta(days=1)
+        
+        return slots_by_day
+    
+    def summarize_free_days(
+        self,
+        doctor: Dict[str, Any],
+        booked: List[Tuple[date, time, time]],
+        start_date: date,
+        end_date: date,
+        duration_minutes: int = 30
+    ) -> List[Dict[str, Any]]:
+        """
+        Free slot count and first free slot of every day with free slots
+        Demonstrates: One pass over already loaded data - bookings sorted
+        by date are consumed while walking the days, with no query and no
+        TimeSlot built per slot
+        
+        doctor is the doctor row (schedule columns), booked its active
+        (date, start, end) intervals in the range, ordered by date.
+        """
+        schedule = self.schedule_cache.from_doctor(doctor)
+        summaries = []
+        position = 0
+        day = start_date
+        while day <= end_date:
+            occupancy = DayOccupancy()
+            while position < len(booked) and booked[position][0] <= day:
+                booked_date, start_time, end_time = booked[position]
+                if booked_date == day:
+                    occupancy.book(minute_of_day(start_time), minute_of_day(end_time))
+                position += 1
             
-            if is_available:
-                available_slots.append(potential_slot)
+            # Non-working days have no slots in the doctor's schedule template
+            working_mask = schedule.working_mask(day)
+            if working_mask:
+                slots_count, first_start = occupancy.free_summary(duration_minutes, working_mask)
+                if slots_count:
+                    summaries.append({
+                        "date": day.isoformat(),
+                        "day": day.strftime("%A"),
+                        "slots_count": slots_count,
+                        "first_slot": time_of_minute(first_start).isoformat()
+                    })
+            day = day + timedelta(days=1)
+        
+        return summaries
+    
+    async def check_slots(
+        self,
+        doctor_id: DoctorId,
+        slots: List[Tuple[date, TimeSlot]]
+    ) -> List[bool]:
+        """
+        Check many (date, time slot) pairs for one doctor at once
+        Demonstrates: One range query for any number of slots
+        A slot is available when it lies inside the doctor's working
+        windows and overlaps no booking (nor an earlier slot in the list)
+        """
+        if not slots:
+            return []
+        
+        schedule = await self.schedule_cache.get(doctor_id)
+        
+        booked = await self.appointment_repository.find_booked_intervals(
+            doctor_id,
+            min(slot_date for slot_date, _ in slots),
+            max(slot_date for slot_date, _ in slots)
+        )
+        
+        occupancy_by_day: Dict[date, DayOccupancy] = {}
+        for booked_date, start_time, end_time in booked:
+            occupancy_by_day.setdefault(booked_date, DayOccupancy()).book(
+                minute_of_day(start_time), minute_of_day(end_time)
+            )
+        
+        results = []
+        for slot_date, time_slot in slots:
+            start_minute = time_slot.start_minute
+            end_minute = time_slot.end_minute
+            slot_mask = interval_mask(start_minute, end_minute)
+            occupancy = occupancy_by_day.setdefault(slot_date, DayOccupancy())
             
-            # Move to next slot (15-minute increments)
-            next_minutes = current_time.hour * 60 + current_time.minute + 15
-            current_time = time(next_minutes // 60, next_minutes % 60)
+            available = (
+                schedule.working_mask(slot_date) & slot_mask == slot_mask
+                and occupancy.is_free(start_minute, end_minute)
+            )
+            if available:
+                occupancy.book(start_minute, end_minute)
+            results.append(available)
         
-        return available_slots
+        return results
+    
+    async def search_available_slots(
+        self,
+        specialty: Optional[str],
+        start_date: date,
+        end_date: date,
+        duration_minutes: int = 30,
+        limit: int = 50
+    ) -> List[Dict[str, Any]]:
+        """
+        Search free slots across every doctor of a specialty
+        Demonstrates: Batched loading - one doctor query and one booking
+        query regardless of how many doctors match
+        Slots are ranked by date and start time, earliest first
+        """
+        if end_date < start_date:
+            raise ValueError("end_date must be on or after start_date")
+        if duration_minutes <= 0:
+            raise ValueError("duration_minutes must be positive")
+        if self.doctor_repository is None:
+            raise RuntimeError("Doctor repository is required for availability search")
+        
+        doctors = await self.doctor_repository.find_by_specialty(specialty)
+        if not doctors:
+            return []
+        
+        booked = await self.appointment_repository.find_booked_intervals_for_doctors(
+            [doctor['id'] for doctor in doctors], start_date, end_date
+        )
+        
+        occupancy: Dict[tuple, DayOccupancy] = {}
+        for doctor_id, booked_date, start_time, end_time in booked:
+            occupancy.setdefault((doctor_id, booked_date), DayOccupancy()).book(
+                minute_of_day(start_time), minute_of_day(end_time)
+            )
+        
+        candidates = []
+        for doctor in doctors:
+            schedule = self.schedule_cache.from_doctor(doctor)
+            current_date = start_date
+            while current_date <= end_date:
+                working_mask = schedule.working_mask(current_date)
+                if working_mask:
+                    day_occupancy = occupancy.get((doctor['id'], current_date)) or DayOccupancy()
+                    for start in day_occupancy.free_starts(duration_minutes, working_mask):
+                        candidates.append((current_date, start, doctor['name'], doctor))
+                current_date = current_date + timedelta(days=1)
+        
+        ranked = heapq.nsmallest(limit, candidates, key=lambda c: (c[0], c[1], c[2]))
+        
+        return [
+            {
+                'doctor_id': doctor['id'],
+                'doctor_name': doctor['name'],
+                'specialty': doctor['specialty'],
+                'date': slot_date,
+                'time_slot': TimeSlot.from_minutes(start, start + duration_minutes)
+            }
+            for slot_date, start, _, doctor in ranked
+        ]
     
     async def get_next_available_slot(
         self,
@@ -130,23 +721,16 @@ class AvailabilityService:
         """
         Find the next available slot for a doctor
         """
-        current_date = starting_date
         end_date = starting_date + timedelta(days=max_days_ahead)
         
-        while current_date <= end_date:
-            # Skip weekends
-            if current_date.weekday() >= 5:  # Saturday = 5, Sunday = 6
-                current_date = current_date + timedelta(days=1)
-                continue
-            
-            available_slots = await self.get_available_slots(
-                doctor_id, current_date, duration_minutes
-            )
-            
+        slots_by_day = await self.get_available_slots_range(
+            doctor_id, starting_date, end_date, duration_minutes
+        )
+        
+        # Non-working days have no slots (doctor's schedule)
+        for current_date, available_slots in slots_by_day.items():
             if available_slots:
                 return current_date, available_slots[0]
-            
-            current_date = current_date + timedelta(days=1)
         
         return None
 
@@ -154,8 +738,20 @@ class ValidationService:
     """
     Domain Service for validating appointments
     Demonstrates: Business Rules Validation, Specification Pattern
+    
+    Working days and hours are the doctor's compiled schedule (the one
+    the slot engine offers), loaded through the schedule cache.
     """
     
+    def __init__(self, schedule_cache: Optional[DoctorScheduleCache] = None):
+        self.schedule_cache = schedule_cache
+    
+    async def get_schedule(self, doctor_id) -> ScheduleTemplate:
+        """Compiled working schedule of a doctor (clinic default without a cache)"""
+        if self.schedule_cache is None:
+            return DEFAULT_SCHEDULE
+        return await self.schedule_cache.get(doctor_id)
+    
     def validate_appointment_data(self, data: Dict[str, Any]) -> bool:
         """
         Validate appointment data structure and required fields
@@ -208,15 +804,23 @@ class ValidationService:
             return False
         return True
     
-    def validate_business_rules(self, appointment: Appointment) -> bool:
+    def validate_business_rules(
+        self,
+        appointment: Appointment,
+        schedule: Optional[ScheduleTemplate] = None
+    ) -> bool:
         """
         Validate appointment against business rules
         Business Rules:
         1. Cannot book appointments in the past
         2. Cannot book more than 90 days in advance
-        3. Appointments must be during working hours
+        3. Appointments must be within the doctor's working hours
         4. Minimum appointment duration is 15 minutes
+        5. Appointments must be on one of the doctor's working days
+        schedule is the doctor's template (see get_schedule); the clinic
+        default when not given
         """
+        schedule = schedule or DEFAULT_SCHEDULE
         
         # Rule 1: No past appointments
         if appointment.appointment_date < date.today():
@@ -229,10 +833,11 @@ class ValidationService:
             logger.error("Cannot book appointments more than 90 days in advance")
             return False
         
-        # Rule 3: Working hours only (8 AM to 6 PM)
-        if appointment.time_slot.start_time < time(8, 0) or \
-           appointment.time_slot.end_time > time(18, 0):
-            logger.error("Appointments must be during working hours (8 AM to 6 PM)")
+        # Rule 3: Working hours only (inside one of the day's windows)
+        slot_mask = interval_mask(appointment.time_slot.start_minute, appointment.time_slot.end_minute)
+        if schedule.works_on(appointment.appointment_date) and \
+           slot_mask & ~schedule.working_mask(appointment.appointment_date):
+            logger.error("Appointments must be during the doctor's working hours")
             return False
         
         # Rule 4: Minimum duration
@@ -240,9 +845,9 @@ class ValidationService:
             logger.error("Minimum appointment duration is 15 minutes")
             return False
         
-        # Rule 5: No appointments on weekends
-        if appointment.appointment_date.weekday() >= 5:
-            logger.error("No appointments on weekends")
+        # Rule 5: Doctor's working days only
+        if not schedule.works_on(appointment.appointment_date):
+            logger.error("The doctor does not work on that day")
             return False
         
         return True
@@ -273,7 +878,8 @@ class ValidationService:
         self, 
         appointment: Appointment, 
         new_date: date, 
-        new_time_slot: TimeSlot
+        new_time_slot: TimeSlot,
+        schedule: Optional[ScheduleTemplate] = None
     ) -> bool:
         """
         Validate if an appointment can be rescheduled
@@ -312,7 +918,7 @@ class ValidationService:
             notes=appointment.notes
         )
         
-        return self.validate_business_rules(temp_appointment)
+        return self.validate_business_rules(temp_appointment, schedule)
 
 class ConflictResolutionService:
     """
@@ -395,12 +1001,16 @@ class ReminderService:
         reminder_time = datetime.now() + timedelta(hours=hours_before)
         reminder_date = reminder_time.date()
         
-        # This would need a more sophisticated query in real implementation
-        # For now, simplified logic
+        # Streamed in keyset batches; only appointments needing a reminder are kept
+        # Reminder bookkeeping (already sent) is still handled downstream
         appointments = []
-        
-        # Would query appointments for the specific date/time range
-        # that haven't been reminded yet
+        async for appointment in self.appointment_repository.iter_by_date_range(
+            start_date=reminder_date,
+            end_date=reminder_date,
+            status=list(ACTIVE_STATUSES)
+        ):
+            if self.should_send_reminder(appointment):
+                appointments.append(appointment)
         
         return appointments
     
@@ -2,7 +2,8 @@
 # Demonstrates: Clean Architecture, Use Case Pattern, Dependency Injection
 
 from abc import ABC, abstractmethod
-from typing import List, Optional, Dict, Any
+from dataclasses import dataclass, field
+from typing import AsyncIterator, List, Optional, Dict, Any, Tuple
 from datetime import datetime, date, time
 import logging
 
@@ -12,12 +13,102 @@ from domain.entities import (
     AppointmentId,
     PatientId,
     DoctorId,
-    TimeSlot
+    TimeSlot,
+    AppointmentSeries,
+    SlotUnavailableError
 )
+from domain.recurrence import RecurrenceRule
 from domain.value_objects import Email, Phone, TelegramId
+from domain.availability import DayOccupancy, ScheduleTemplate, minute_of_day
 
 logger = logging.getLogger(__name__)
 
+@dataclass
+class AppointmentPage:
+    """
+    One page of a filtered appointment query
+    Demonstrates: Keyset pagination result (opaque next_cursor)
+    """
+    appointments: List[Appointment] = field(default_factory=list)
+    total: int = 0
+    next_cursor: Optional[str] = None
+
+@dataclass(slots=True)
+class DoctorStatsDelta:
+    """
+    Change to one doctor's statistics caused by appointment events
+    Demonstrates: Additive deltas - applied with +=, so deltas from any
+    number of processes commute
+    """
+    doctor_id: str
+    status_counts: Dict[str, int] = field(default_factory=dict)
+    duration_minutes: int = 0
+    completion_seconds: float = 0
+    first_date: Optional[date] = None
+    last_date: Optional[date] = None
+    
+    def count(
+        self,
+        status: str,
+        appointment_date: date,
+        duration_minutes: int,
+        sign: int = 1
+    ) -> None:
+        """Add (sign=1) or remove (sign=-1) one appointment"""
+        self.status_counts[status] = self.status_counts.get(status, 0) + sign
+        self.duration_minutes += sign * duration_minutes
+        # First/last dates only widen here; reconciliation narrows them
+        if sign > 0:
+            if self.first_date is None or appointment_date < self.first_date:
+                self.first_date = appointment_date
+            if self.last_date is None or appointment_date > self.last_date:
+                self.last_date = appointment_date
+    
+    def __bool__(self) -> bool:
+        return bool(
+            any(self.status_counts.values())
+            or self.duration_minutes
+            or self.completion_seconds
+            or self.first_date
+        )
+
+# (doctor_id, appointment_date, hour, status) of one rollup row
+RollupKey = Tuple[str, date, int, str]
+
+@dataclass(slots=True)
+class AppointmentRollupDelta:
+    """
+    Change to the daily appointment rollups caused by appointment events
+    Demonstrates: Additive deltas over a grouping key - the rollup row of
+    each key gets count and duration added
+    """
+    cells: Dict[RollupKey, List[int]] = field(default_factory=dict)
+    
+    def count(
+        self,
+        doctor_id: str,
+        appointment_date: date,
+        hour: int,
+        status: str,
+        duration_minutes: int,
+        sign: int = 1
+    ) -> None:
+        """Add (sign=1) or remove (sign=-1) one appointment"""
+        cell = self.cells.setdefault((doctor_id, appointment_date, hour, status), [0, 0])
+        cell[0] += sign
+        cell[1] += sign * duration_minutes
+    
+    def changes(self) -> List[Tuple[RollupKey, int, int]]:
+        """(key, count, duration minutes) of every changed row"""
+        return [
+            (key, count, minutes)
+            for key, (count, minutes) in self.cells.items()
+            if count or minutes
+        ]
+    
+    def __bool__(self) -> bool:
+        return bool(self.changes())
+
 # Abstract Repository Interface (Dependency Inversion Principle)
 class IAppointmentRepository(ABC):
     """
@@ -31,12 +122,38 @@ class IAppointmentRepository(ABC):
         pass
     
     @abstractmethod
-    async def find_by_id(self, appointment_id: AppointmentId) -> Optional[Appointment]:
-        """Find appointment by ID"""
+    async def save_many(self, appointments: List[Appointment]) -> List[Appointment]:
+        """Save several new appointments atomically"""
+        pass
+    
+    @abstractmethod
+    async def save_series(
+        self,
+        series: AppointmentSeries,
+        appointments: List[Appointment]
+    ) -> AppointmentSeries:
+        """Save a recurring series and its occurrences atomically"""
+        pass
+    
+    @abstractmethod
+    async def find_by_id(
+        self,
+        appointment_id: AppointmentId,
+        primary: bool = False
+    ) -> Optional[Appointment]:
+        """
+        Find appointment by ID
+        primary=True reads the latest committed state (no cache, no
+        replica), as read-modify-write changes need
+        """
         pass
     
     @abstractmethod
-    async def find_by_patient(self, patient_id: PatientId) -> List[Appointment]:
+    async def find_by_patient(
+        self,
+        patient_id: PatientId,
+        primary: bool = False
+    ) -> List[Appointment]:
         """Find all appointments for a patient"""
         pass
     
@@ -44,14 +161,93 @@ class IAppointmentRepository(ABC):
     async def find_by_doctor_and_date(
         self, 
         doctor_id: DoctorId, 
-        appointment_date: date
+        appointment_date: date,
+        primary: bool = False
     ) -> List[Appointment]:
         """Find appointments for a doctor on a specific date"""
         pass
     
     @abstractmethod
-    async def update(self, appointment: Appointment) -> Appointment:
-        """Update an appointment"""
+    async def find_page(
+        self,
+        filters: Dict[str, Any],
+        limit: int = 20,
+        cursor: Optional[str] = None,
+        offset: int = 0,
+        views: bool = False
+    ) -> AppointmentPage:
+        """
+        Find one page of appointments matching filters
+        views=True may return read-only appointment views (same
+        attributes, no behaviour) instead of entities
+        """
+        pass
+    
+    @abstractmethod
+    async def find_by_date_range(
+        self,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        status: Optional[AppointmentStatus] = None,
+        doctor_id: Optional[DoctorId] = None,
+        after: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> List[Appointment]:
+        """Find appointments in an (optionally open) date range"""
+        pass
+    
+    @abstractmethod
+    def iter_by_date_range(
+        self,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        status: Optional[AppointmentStatus] = None,
+        doctor_id: Optional[DoctorId] = None,
+        batch_size: int = 500
+    ) -> AsyncIterator[Appointment]:
+        """Stream appointments in an (optionally open) date range"""
+        pass
+    
+    @abstractmethod
+    def stream_rows(
+        self,
+        filters: Dict[str, Any],
+        prefetch: int = 1000
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Stream raw appointment rows (for exports)"""
+        pass
+    
+    @abstractmethod
+    async def find_booked_intervals(
+        self,
+        doctor_id: DoctorId,
+        start_date: date,
+        end_date: date
+    ) -> List[Tuple[date, time, time]]:
+        """Find active (date, start, end) bookings for a doctor in a date range"""
+        pass
+    
+    @abstractmethod
+    async def find_booked_intervals_for_doctors(
+        self,
+        doctor_ids: List[str],
+        start_date: date,
+        end_date: date
+    ) -> List[Tuple[str, date, time, time]]:
+        """Find active (doctor_id, date, start, end) bookings for many doctors"""
+        pass
+    
+    @abstractmethod
+    async def update(
+        self,
+        appointment: Appointment,
+        previous_date: Optional[date] = None
+    ) -> Appointment:
+        """
+        Update an appointment
+        previous_date is the stored date of a rescheduled appointment,
+        for implementations that keep per-day data (caches)
+        """
         pass
     
     @abstractmethod
@@ -59,6 +255,107 @@ class IAppointmentRepository(ABC):
         """Delete an appointment"""
         pass
 
+# Doctor Repository Interface
+class IDoctorRepository(ABC):
+    """
+    Repository interface for doctors (read-only in this service)
+    Demonstrates: Interface Segregation
+    """
+    
+    @abstractmethod
+    async def find_by_id(self, doctor_id: DoctorId) -> Optional[Dict[str, Any]]:
+        """Find a doctor by ID"""
+        pass
+    
+    @abstractmethod
+    async def find_by_specialty(self, specialty: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Find doctors whose specialty matches (all doctors if None)"""
+        pass
+    
+    @abstractmethod
+    async def find_page(
+        self,
+        specialty: Optional[str] = None,
+        available_day: Optional[str] = None,
+        limit: int = 20,
+        offset: int = 0
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """Find one page of the doctor directory and the total match count"""
+        pass
+    
+    @abstractmethod
+    async def find_profile(
+        self,
+        doctor_id: DoctorId,
+        start_date: date,
+        end_date: date
+    ) -> Optional[Dict[str, Any]]:
+        """Find a doctor with its aggregates and bookings in a date range"""
+        pass
+    
+    @abstractmethod
+    async def find_all(self) -> List[Dict[str, Any]]:
+        """Load every doctor, in directory order"""
+        pass
+    
+    @abstractmethod
+    async def get_version(self) -> Tuple[int, Optional[datetime]]:
+        """Fingerprint that changes whenever any doctor changes"""
+        pass
+
+# Doctor Statistics Repository Interface
+class IDoctorStatsRepository(ABC):
+    """
+    Repository interface for the per-doctor statistics summary
+    Demonstrates: Materialized aggregate behind an interface
+    """
+    
+    @abstractmethod
+    async def find_by_doctor(self, doctor_id: DoctorId) -> Optional[Dict[str, Any]]:
+        """Stats of a doctor (zeros if none yet), None if the doctor does not exist"""
+        pass
+    
+    @abstractmethod
+    async def apply(self, *deltas: DoctorStatsDelta) -> None:
+        """Add deltas (one per doctor) to the doctors' stats"""
+        pass
+    
+    @abstractmethod
+    async def reconcile(self) -> int:
+        """Recompute every doctor's stats from the appointments table"""
+        pass
+
+class IAppointmentRollupRepository(ABC):
+    """
+    Repository interface for the daily appointment rollups
+    (counts per doctor x day x hour x status)
+    Demonstrates: Materialized aggregate behind an interface
+    """
+    
+    @abstractmethod
+    async def summarize(
+        self,
+        date_from: date,
+        date_to: date,
+        doctor_id: Optional[DoctorId] = None
+    ) -> Dict[str, Any]:
+        """
+        Rollup totals over a date range: 'by_status' maps status to
+        (count, duration minutes), 'by_weekday' ISO weekday to count and
+        'by_hour' hour to count (the last two without cancellations)
+        """
+        pass
+    
+    @abstractmethod
+    async def apply(self, delta: AppointmentRollupDelta) -> None:
+        """Add a delta to the rollups"""
+        pass
+    
+    @abstractmethod
+    async def reconcile(self) -> int:
+        """Rebuild the rollups from the appointments table"""
+        pass
+
 # Event Publisher Interface
 class IEventPublisher(ABC):
     """
@@ -94,6 +391,15 @@ class IAvailabilityService(ABC):
     ) -> List[TimeSlot]:
         """Get all available slots for a doctor on a date"""
         pass
+    
+    @abstractmethod
+    async def check_slots(
+        self,
+        doctor_id: DoctorId,
+        slots: List[Tuple[date, TimeSlot]]
+    ) -> List[bool]:
+        """Check many (date, time slot) pairs in one batch"""
+        pass
 
 class IValidationService(ABC):
     """Service for validations"""
@@ -104,10 +410,93 @@ class IValidationService(ABC):
         pass
     
     @abstractmethod
-    def validate_business_rules(self, appointment: Appointment) -> bool:
-        """Validate business rules"""
+    def validate_business_rules(
+        self,
+        appointment: Appointment,
+        schedule: Optional[ScheduleTemplate] = None
+    ) -> bool:
+        """Validate business rules (working days/hours from schedule)"""
+        pass
+    
+    @abstractmethod
+    async def get_schedule(self, doctor_id: DoctorId) -> ScheduleTemplate:
+        """Compiled working schedule of a doctor"""
         pass
 
+def _slot_snapshot(appointment: Appointment) -> Dict[str, Any]:
+    """Date, times and status of an appointment, for event payloads"""
+    return {
+        'appointment_date': appointment.appointment_date.isoformat(),
+        'start_time': appointment.time_slot.start_time.isoformat(),
+        'end_time': appointment.time_slot.end_time.isoformat(),
+        'status': appointment.status.value
+    }
+
+def _status_change(appointment: Appointment, previous: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Event payload fields shared by status and schedule changes
+    previous is the _slot_snapshot taken before the change
+    """
+    return {
+        'doctor_id': str(appointment.doctor_id),
+        'previous': previous,
+        'current': _slot_snapshot(appointment),
+        'created_at': appointment.created_at.isoformat(),
+        'updated_at': appointment.updated_at.isoformat()
+    }
+
+async def _build_appointment(
+    data: Dict[str, Any],
+    validation_service: IValidationService
+) -> Appointment:
+    """
+    Build and validate a new appointment entity from request data
+    Shared by the single and bulk creation use cases
+    """
+    # Step 1: Validate input data
+    if not validation_service.validate_appointment_data(data):
+        raise ValueError("Invalid appointment data")
+    
+    # Step 2: Create domain entities
+    appointment_id = AppointmentId("")  # Will auto-generate
+    patient_id = PatientId(data['patient_id'])
+    doctor_id = DoctorId(data['doctor_id'])
+    #appointment_date = date.fromisoformat(data['appointment_date'])
+    
+    #start_time = time.fromisoformat(data['appointment_time'])
+    # Handle date - can be string or date object
+    appointment_date = data['appointment_date']
+    if isinstance(appointment_date, str):
+        appointment_date = date.fromisoformat(appointment_date)
+
+    # Handle time - can be string or time object
+    start_time = data['appointment_time']
+    if isinstance(start_time, str):
+        start_time = time.fromisoformat(start_time)
+    duration = data.get('duration_minutes', 30)
+    end_minutes = start_time.hour * 60 + start_time.minute + duration
+    end_time = time(hour=(end_minutes // 60) % 24, minute=end_minutes % 60)
+    time_slot = TimeSlot(start_time, end_time)
+    
+    # Step 3: Create appointment entity
+    appointment = Appointment(
+        id=appointment_id,
+        patient_id=patient_id,
+        doctor_id=doctor_id,
+        appointment_date=appointment_date,
+        time_slot=time_slot,
+        status=AppointmentStatus.SCHEDULED,
+        reason=data.get('reason'),
+        notes=data.get('notes')
+    )
+    
+    # Step 4: Validate business rules against the doctor's schedule
+    schedule = await validation_service.get_schedule(doctor_id)
+    if not validation_service.validate_business_rules(appointment, schedule):
+        raise ValueError("Business rules validation failed")
+    
+    return appointment
+
 # Use Case: Create Appointment
 class CreateAppointmentUseCase:
     """
@@ -134,68 +523,230 @@ class CreateAppointmentUseCase:
         """
         logger.info(f"Creating appointment with data: {data}")
         
-        # Step 1: Validate input data
-        if not self.validation_service.validate_appointment_data(data):
-            raise ValueError("Invalid appointment data")
-        
-        # Step 2: Create domain entities
-        appointment_id = AppointmentId("")  # Will auto-generate
-        patient_id = PatientId(data['patient_id'])
-        doctor_id = DoctorId(data['doctor_id'])
-        #appointment_date = date.fromisoformat(data['appointment_date'])
-        
-        #start_time = time.fromisoformat(data['appointment_time'])
-        # Handle date - can be string or date object
-        appointment_date = data['appointment_date']
-        if isinstance(appointment_date, str):
-            appointment_date = date.fromisoformat(appointment_date)
+        # Steps 1-4: Validate input, build the entity, check business rules
+        appointment = await _build_appointment(data, self.validation_service)
+        
+        # Step 5: Save to repository
+        # Availability is enforced atomically by the insert itself
+        # (raises SlotUnavailableError on overlap), so there is no separate
+        # check-then-insert round trip that could race
+        saved_appointment = await self.repository.save(appointment)
+        
+        # Step 6: Publish event
+        await self.event_publisher.publish(
+            'appointment.created',
+            saved_appointment.to_dict()
+        )
+        
+        logger.info(f"Appointment created successfully: {saved_appointment.id}")
+        return saved_appointment
 
-        # Handle time - can be string or time object
-        start_time = data['appointment_time']
-        if isinstance(start_time, str):
-            start_time = time.fromisoformat(start_time)
-        duration = data.get('duration_minutes', 30)
-        end_time = time(
-            hour=(start_time.hour + duration // 60) % 24,
-            minute=(start_time.minute + duration % 60) % 60
+# Use Case: Bulk Create Appointments
+class BulkCreateAppointmentsUseCase:
+    """
+    Use Case for creating many appointments at once
+    Demonstrates: Batch processing - one occupancy query and one insert
+    transaction regardless of the number of items
+    """
+    
+    def __init__(
+        self,
+        repository: IAppointmentRepository,
+        validation_service: IValidationService,
+        event_publisher: IEventPublisher
+    ):
+        self.repository = repository
+        self.validation_service = validation_service
+        self.event_publisher = event_publisher
+    
+    async def execute(self, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Create appointments, reporting a result per item
+        Each result has index, status ('created' or 'failed') and either
+        appointment or error
+        """
+        logger.info(f"Bulk creating {len(items)} appointments")
+        results: List[Optional[Dict[str, Any]]] = [None] * len(items)
+        
+        # Step 1: Validate and build every item
+        built: List[Tuple[int, Appointment]] = []
+        for index, data in enumerate(items):
+            try:
+                built.append((index, await _build_appointment(data, self.validation_service)))
+            except ValueError as e:
+                results[index] = {'index': index, 'status': 'failed', 'error': str(e)}
+        
+        # Step 2: Preload occupancy for every doctor/day in the batch
+        occupancy = await self._load_occupancy([apt for _, apt in built])
+        
+        # Step 3: Check conflicts against existing bookings and earlier items
+        accepted: List[Tuple[int, Appointment]] = []
+        for index, appointment in built:
+            day = occupancy.setdefault(
+                (str(appointment.doctor_id), appointment.appointment_date),
+                DayOccupancy()
+            )
+            start_minute = appointment.time_slot.start_minute
+            end_minute = appointment.time_slot.end_minute
+            
+            if not day.is_free(start_minute, end_minute):
+                results[index] = {
+                    'index': index,
+                    'status': 'failed',
+                    'error': "Time slot is not available"
+                }
+                continue
+            
+            day.book(start_minute, end_minute)
+            accepted.append((index, appointment))
+        
+        # Step 4: Insert all accepted appointments in one transaction
+        if accepted:
+            try:
+                await self.repository.save_many([apt for _, apt in accepted])
+            except SlotUnavailableError as e:
+                # A concurrent booking took one of the slots after the
+                # occupancy check; the transaction wrote nothing
+                for index, _ in accepted:
+                    results[index] = {'index': index, 'status': 'failed', 'error': str(e)}
+                accepted = []
+        
+        # Step 5: Publish one event for the whole batch, so handlers
+        # apply one combined change instead of one per appointment
+        for index, appointment in accepted:
+            results[index] = {'index': index, 'status': 'created', 'appointment': appointment}
+        if accepted:
+            await self.event_publisher.publish(
+                'appointment.bulk_created',
+                {
+                    'appointments': [apt.to_dict() for _, apt in accepted],
+                    'appointment_ids': [str(apt.id) for _, apt in accepted]
+                }
+            )
+        
+        logger.info(f"Bulk create finished: {len(accepted)}/{len(items)} created")
+        return results
+    
+    async def _load_occupancy(
+        self,
+        appointments: List[Appointment]
+    ) -> Dict[Tuple[str, date], DayOccupancy]:
+        """Occupancy bitmaps for every doctor/day touched by the batch"""
+        if not appointments:
+            return {}
+        
+        booked = await self.repository.find_booked_intervals_for_doctors(
+            sorted({str(apt.doctor_id) for apt in appointments}),
+            min(apt.appointment_date for apt in appointments),
+            max(apt.appointment_date for apt in appointments)
         )
-        time_slot = TimeSlot(start_time, end_time)
         
-        # Step 3: Check availability
-        is_available = await self.availability_service.is_slot_available(
-            doctor_id, appointment_date, time_slot
+        occupancy: Dict[Tuple[str, date], DayOccupancy] = {}
+        for doctor_id, booked_date, start_time, end_time in booked:
+            occupancy.setdefault((doctor_id, booked_date), DayOccupancy()).book(
+                minute_of_day(start_time), minute_of_day(end_time)
+            )
+        return occupancy
+
+# Use Case: Create Recurring Series
+class CreateRecurringSeriesUseCase:
+    """
+    Use Case for booking a recurring appointment series
+    Demonstrates: Lazy expansion, batched availability check and a
+    constant number of round trips whatever the occurrence count
+    """
+    
+    def __init__(
+        self,
+        repository: IAppointmentRepository,
+        availability_service: IAvailabilityService,
+        validation_service: IValidationService,
+        event_publisher: IEventPublisher
+    ):
+        self.repository = repository
+        self.availability_service = availability_service
+        self.validation_service = validation_service
+        self.event_publisher = event_publisher
+    
+    async def execute(
+        self,
+        data: Dict[str, Any],
+        skip_conflicts: bool = False
+    ) -> Tuple[AppointmentSeries, List[Appointment], List[date]]:
+        """
+        Create the series and all its occurrences
+        data holds the CreateAppointmentUseCase fields plus 'recurrence'
+        (see RecurrenceRule.from_dict); appointment_date is the first date
+        
+        Returns (series, created appointments, skipped conflict dates).
+        Unless skip_conflicts is set, any unavailable occurrence rejects
+        the whole series.
+        """
+        logger.info(f"Creating recurring series for patient: {data.get('patient_id')}")
+        
+        # Step 1: Build the first occurrence and the recurrence rule
+        first = await _build_appointment(data, self.validation_service)
+        rule = RecurrenceRule.from_dict(data.get('recurrence') or {})
+        
+        series = AppointmentSeries(
+            id=AppointmentId(""),  # Will auto-generate
+            patient_id=first.patient_id,
+            doctor_id=first.doctor_id,
+            rule=rule,
+            start_date=first.appointment_date,
+            time_slot=first.time_slot,
+            reason=first.reason,
+            notes=first.notes
         )
         
-        if not is_available:
-            raise ValueError("Time slot is not available")
-        
-        # Step 4: Create appointment entity
-        appointment = Appointment(
-            id=appointment_id,
-            patient_id=patient_id,
-            doctor_id=doctor_id,
-            appointment_date=appointment_date,
-            time_slot=time_slot,
-            status=AppointmentStatus.SCHEDULED,
-            reason=data.get('reason'),
-            notes=data.get('notes')
+        # Step 2: Expand occurrences lazily, validating each one
+        occurrences = []
+        for occurrence_date in series.occurrence_dates():
+            try:
+                appointment = await _build_appointment(
+                    {**data, 'appointment_date': occurrence_date},
+                    self.validation_service
+                )
+            except ValueError as e:
+                raise ValueError(f"Occurrence on {occurrence_date.isoformat()}: {e}")
+            appointment.series_id = str(series.id)
+            occurrences.append(appointment)
+        
+        # Step 3: Check every occurrence in one batched availability query
+        available = await self.availability_service.check_slots(
+            series.doctor_id,
+            [(apt.appointment_date, apt.time_slot) for apt in occurrences]
         )
         
-        # Step 5: Validate business rules
-        if not self.validation_service.validate_business_rules(appointment):
-            raise ValueError("Business rules validation failed")
+        appointments = [apt for apt, ok in zip(occurrences, available) if ok]
+        skipped_dates = [apt.appointment_date for apt, ok in zip(occurrences, available) if not ok]
         
-        # Step 6: Save to repository
-        saved_appointment = await self.repository.save(appointment)
+        if skipped_dates and not skip_conflicts:
+            raise SlotUnavailableError(
+                "Time slot is not available on: "
+                + ", ".join(day.isoformat() for day in skipped_dates)
+            )
+        if not appointments:
+            raise SlotUnavailableError("No occurrence of the series is available")
+        
+        # Step 4: Persist series and occurrences atomically
+        await self.repository.save_series(series, appointments)
         
-        # Step 7: Publish event
+        # Step 5: Publish one event for the whole series
         await self.event_publisher.publish(
-            'appointment.created',
-            saved_appointment.to_dict()
+            'appointment.series_created',
+            {
+                **series.to_dict(),
+                'appointment_ids': [str(apt.id) for apt in appointments],
+                'appointment_dates': [apt.appointment_date.isoformat() for apt in appointments]
+            }
         )
         
-        logger.info(f"Appointment created successfully: {saved_appointment.id}")
-        return saved_appointment
+        logger.info(
+            f"Series created successfully: {series.id} "
+            f"({len(appointments)} occurrences, {len(skipped_dates)} skipped)"
+        )
+        return series, appointments, skipped_dates
 
 # Use Case: Update Appointment
 class UpdateAppointmentUseCase:
@@ -222,15 +773,19 @@ class UpdateAppointmentUseCase:
         """Update an existing appointment"""
         logger.info(f"Updating appointment {appointment_id}")
         
-        # Step 1: Find existing appointment
+        # Step 1: Find existing appointment (latest state: it is modified below)
         appointment = await self.repository.find_by_id(
-            AppointmentId(appointment_id)
+            AppointmentId(appointment_id),
+            primary=True
         )
         
         if not appointment:
             logger.warning(f"Appointment not found: {appointment_id}")
             return None
         
+        previous = _slot_snapshot(appointment)
+        previous_date = appointment.appointment_date
+        
         # Step 2: Apply updates
         if 'status' in updates:
             new_status = AppointmentStatus(updates['status'])
@@ -245,10 +800,8 @@ class UpdateAppointmentUseCase:
             if 'appointment_time' in updates:
                 start_time = time.fromisoformat(updates['appointment_time'])
                 duration = updates.get('duration_minutes', 30)
-                end_time = time(
-                    hour=(start_time.hour + duration // 60) % 24,
-                    minute=(start_time.minute + duration % 60) % 60
-                )
+                end_minutes = start_time.hour * 60 + start_time.minute + duration
+                end_time = time(hour=(end_minutes // 60) % 24, minute=end_minutes % 60)
                 new_time_slot = TimeSlot(start_time, end_time)
             else:
                 new_time_slot = appointment.time_slot
@@ -259,18 +812,20 @@ class UpdateAppointmentUseCase:
             appointment.notes = updates['notes']
         
         # Step 3: Validate updated appointment
-        if not self.validation_service.validate_business_rules(appointment):
+        schedule = await self.validation_service.get_schedule(appointment.doctor_id)
+        if not self.validation_service.validate_business_rules(appointment, schedule):
             raise ValueError("Updated appointment violates business rules")
         
         # Step 4: Save changes
-        updated_appointment = await self.repository.update(appointment)
+        updated_appointment = await self.repository.update(appointment, previous_date)
         
         # Step 5: Publish event
         await self.event_publisher.publish(
             'appointment.updated',
             {
                 'appointment_id': str(appointment_id),
-                'updates': updates
+                'updates': updates,
+                **_status_change(appointment, previous)
             }
         )
         
@@ -299,9 +854,10 @@ class CancelAppointmentUseCase:
         """Cancel an appointment"""
         logger.info(f"Cancelling appointment {appointment_id}")
         
-        # Step 1: Find appointment
+        # Step 1: Find appointment (latest state: it is modified below)
         appointment = await self.repository.find_by_id(
-            AppointmentId(appointment_id)
+            AppointmentId(appointment_id),
+            primary=True
         )
         
         if not appointment:
@@ -309,6 +865,7 @@ class CancelAppointmentUseCase:
             return False
         
         # Step 2: Cancel the appointment
+        previous = _slot_snapshot(appointment)
         reason = cancellation_reason or "Cancelled by user"
         appointment.cancel(reason)
         
@@ -320,8 +877,14 @@ class CancelAppointmentUseCase:
             'appointment.cancelled',
             {
                 'appointment_id': str(appointment_id),
+                'patient_id': str(appointment.patient_id),
+                'doctor_id': str(appointment.doctor_id),
+                'appointment_date': appointment.appointment_date.isoformat(),
+                'start_time': appointment.time_slot.start_time.isoformat(),
+                'end_time': appointment.time_slot.end_time.isoformat(),
                 'reason': reason,
-                'cancelled_at': appointment.cancelled_at.isoformat()
+                'cancelled_at': appointment.cancelled_at.isoformat(),
+                **_status_change(appointment, previous)
             }
         )
         
@@ -357,51 +920,37 @@ class ListAppointmentsUseCase:
         self,
         filters: Dict[str, Any],
         page: int = 1,
-        page_size: int = 20
-    ) -> List[Appointment]:
-        """List appointments with filters"""
-        appointments = []
+        page_size: int = 20,
+        cursor: Optional[str] = None
+    ) -> AppointmentPage:
+        """
+        List appointments with filters
+        Filtering and pagination run in SQL; a cursor (keyset pagination)
+        takes precedence over the page number
+        """
+        query_filters = {
+            key: value for key, value in filters.items()
+            if key in ('patient_id', 'doctor_id', 'status', 'date_from', 'date_to')
+            and value
+        }
         
-        # Apply filters based on what's provided
-        if 'patient_id' in filters and filters['patient_id']:
-            appointments = await self.repository.find_by_patient(
-                PatientId(filters['patient_id'])
-            )
-        elif 'doctor_id' in filters and filters['doctor_id']:
-            # For simplicity, we'll need to add this method to repository
-            # This demonstrates how use cases orchestrate repository calls
-            if 'date' in filters and filters['date']:
-                appointments = await self.repository.find_by_doctor_and_date(
-                    DoctorId(filters['doctor_id']),
-                    filters['date']
-                )
+        # A single day is a date range of one day
+        if filters.get('date'):
+            query_filters['date_from'] = filters['date']
+            query_filters['date_to'] = filters['date']
+        
+        if 'status' in query_filters:
+            query_filters['status'] = AppointmentStatus(query_filters['status'])
+        
+        offset = 0 if cursor else (page - 1) * page_size
         
-        # Apply status filter if provided
-        if 'status' in filters and filters['status']:
-            status = AppointmentStatus(filters['status'])
-            appointments = [
-                apt for apt in appointments 
-                if apt.status == status
-            ]
-        
-        # Apply date range filter
-        if 'date_from' in filters and filters['date_from']:
-            appointments = [
-                apt for apt in appointments
-                if apt.appointment_date >= filters['date_from']
-            ]
-        
-        if 'date_to' in filters and filters['date_to']:
-            appointments = [
-                apt for apt in appointments
-                if apt.appointment_date <= filters['date_to']
-            ]
-        
-        # Apply pagination
-        start_idx = (page - 1) * page_size
-        end_idx = start_idx + page_size
-        
-        return appointments[start_idx:end_idx]
+        return await self.repository.find_page(
+            query_filters,
+            limit=page_size,
+            cursor=cursor,
+            offset=offset,
+            views=True  # only rendered, never modified
+        )
 
 # Use Case: Confirm Appointment
 class ConfirmAppointmentUseCase:
@@ -421,9 +970,10 @@ class ConfirmAppointmentUseCase:
         """Confirm an appointment"""
         logger.info(f"Confirming appointment {appointment_id}")
         
-        # Step 1: Find appointment
+        # Step 1: Find appointment (latest state: it is modified below)
         appointment = await self.repository.find_by_id(
-            AppointmentId(appointment_id)
+            AppointmentId(appointment_id),
+            primary=True
         )
         
         if not appointment:
@@ -431,6 +981,7 @@ class ConfirmAppointmentUseCase:
             return None
         
         # Step 2: Confirm the appointment
+        previous = _slot_snapshot(appointment)
         appointment.confirm()
         
         # Step 3: Save changes
@@ -441,7 +992,9 @@ class ConfirmAppointmentUseCase:
             'appointment.confirmed',
             {
                 'appointment_id': str(appointment_id),
-                'confirmed_at': datetime.utcnow().isoformat()
+                'patient_id': str(appointment.patient_id),
+                'confirmed_at': datetime.utcnow().isoformat(),
+                **_status_change(appointment, previous)
             }
         )
         
@@ -470,9 +1023,10 @@ class CompleteAppointmentUseCase:
         """Complete an appointment"""
         logger.info(f"Completing appointment {appointment_id}")
         
-        # Step 1: Find appointment
+        # Step 1: Find appointment (latest state: it is modified below)
         appointment = await self.repository.find_by_id(
-            AppointmentId(appointment_id)
+            AppointmentId(appointment_id),
+            primary=True
         )
         
         if not appointment:
@@ -480,6 +1034,7 @@ class CompleteAppointmentUseCase:
             return None
         
         # Step 2: Complete the appointment
+        previous = _slot_snapshot(appointment)
         appointment.complete()
         
         if notes:
@@ -494,7 +1049,8 @@ class CompleteAppointmentUseCase:
             {
                 'appointment_id': str(appointment_id),
                 'completed_at': datetime.utcnow().isoformat(),
-                'notes': notes
+                'notes': notes,
+                **_status_change(appointment, previous)
             }
         )
         
@@ -0,0 +1,2 @@
+# Benchmarks
+# Standalone performance measurements, not imported by the service
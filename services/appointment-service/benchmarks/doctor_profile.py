@@ -0,0 +1,160 @@
+# Doctor Page Benchmark
+# Demonstrates: Measuring round trips - GET /doctors/{id} before and
+# after collapsing it into one CTE query
+#
+# Run from services/appointment-service against a populated database
+# (DATABASE_URL, default pool settings from DB_* variables):
+#     python -m benchmarks.doctor_profile [doctor_id] [runs]
+#
+# Without doctor_id the first doctor by name is used. Every variant runs
+# once untimed first, so statements are prepared and the doctor's
+# schedule template is cached, as in steady state:
+#   per-day  the original handler: aggregate, upcoming count and one
+#            booking query per day of the week (9 round trips)
+#   range    the same with a single booking range query (3 round trips)
+#   single   find_profile + summarize_free_days (1 round trip)
+
+import asyncio
+import os
+import statistics
+import sys
+from datetime import date, timedelta
+from time import perf_counter
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from application.services import AvailabilityService
+from infrastructure.database import Database
+from infrastructure.repositories import (
+    PostgreSQLAppointmentRepository,
+    PostgreSQLDoctorRepository
+)
+
+# Queries of the former handler
+DOCTOR_QUERY = """
+    SELECT
+        d.id,
+        d.name,
+        d.email,
+        d.phone,
+        d.specialty,
+        d.license_number,
+        d.available_days,
+        d.available_hours,
+        d.created_at,
+        d.updated_at,
+        COUNT(a.id) as total_appointments,
+        AVG(EXTRACT(EPOCH FROM (a.updated_at - a.created_at))) as avg_appointment_duration
+    FROM doctors d
+    LEFT JOIN appointments a ON a.doctor_id = d.id
+        AND a.status = 'completed'
+    WHERE d.id = $1
+    GROUP BY d.id
+"""
+
+UPCOMING_QUERY = """
+    SELECT COUNT(*) as upcoming_count
+    FROM appointments
+    WHERE doctor_id = $1
+        AND appointment_date >= CURRENT_DATE
+        AND status IN ('scheduled', 'confirmed')
+"""
+
+def summary(day: date, slots) -> Dict[str, Any]:
+    return {
+        "date": day.isoformat(),
+        "day": day.strftime("%A"),
+        "slots_count": len(slots),
+        "first_slot": slots[0].start_time.isoformat()
+    }
+
+async def before(database: Database, doctor_id: str) -> Dict[str, Any]:
+    """Doctor row with aggregates and upcoming count (2 round trips)"""
+    doctor_data = dict(await database.fetchrow(DOCTOR_QUERY, doctor_id))
+    upcoming = await database.fetchrow(UPCOMING_QUERY, doctor_id)
+    doctor_data["upcoming_appointments"] = upcoming["upcoming_count"]
+    return doctor_data
+
+async def per_day(database: Database, availability: AvailabilityService, doctor_id: str):
+    doctor_data = await before(database, doctor_id)
+    start_date = date.today()
+    doctor_data["next_available_slots"] = []
+    for offset in range(7):
+        check_date = start_date + timedelta(days=offset)
+        slots = await availability.get_available_slots(doctor_id, check_date, 30)
+        if slots:
+            doctor_data["next_available_slots"].append(summary(check_date, slots))
+    return doctor_data
+
+async def by_range(database: Database, availability: AvailabilityService, doctor_id: str):
+    doctor_data = await before(database, doctor_id)
+    start_date = date.today()
+    slots_by_day = await availability.get_available_slots_range(
+        doctor_id, start_date, start_date + timedelta(days=6), 30
+    )
+    doctor_data["next_available_slots"] = [
+        summary(check_date, slots) for check_date, slots in slots_by_day.items() if slots
+    ]
+    return doctor_data
+
+async def single(
+    doctor_repository: PostgreSQLDoctorRepository,
+    availability: AvailabilityService,
+    doctor_id: str
+):
+    start_date = date.today()
+    end_date = start_date + timedelta(days=6)
+    doctor_data = await doctor_repository.find_profile(doctor_id, start_date, end_date)
+    booked = doctor_data.pop("booked")
+    doctor_data["next_available_slots"] = availability.summarize_free_days(
+        doctor_data, booked, start_date, end_date, 30
+    )
+    return doctor_data
+
+async def latencies_ms(run: Callable[[], Awaitable[Any]], runs: int) -> List[float]:
+    """Wall time of each sequential run, in milliseconds"""
+    await run()
+    timings = []
+    for _ in range(runs):
+        started = perf_counter()
+        await run()
+        timings.append((perf_counter() - started) * 1000)
+    return timings
+
+async def main(doctor_id: Optional[str] = None, runs: int = 200):
+    database = Database.from_env(os.getenv("DATABASE_URL"))
+    await database.connect()
+    try:
+        doctor_repository = PostgreSQLDoctorRepository(database)
+        availability = AvailabilityService(
+            PostgreSQLAppointmentRepository(database),
+            doctor_repository
+        )
+        if doctor_id is None:
+            doctor_id = str(await database.fetchval(
+                "SELECT id FROM doctors ORDER BY name LIMIT 1"
+            ))
+
+        variants = {
+            'per-day': lambda: per_day(database, availability, doctor_id),
+            'range': lambda: by_range(database, availability, doctor_id),
+            'single': lambda: single(doctor_repository, availability, doctor_id)
+        }
+
+        print(f"doctor {doctor_id}, {runs} runs each")
+        print(f"{'variant':<8} {'mean ms':>8} {'p50 ms':>7} {'p95 ms':>7}")
+        for name, run in variants.items():
+            timings = await latencies_ms(run, runs)
+            print(
+                f"{name:<8}"
+                f" {statistics.fmean(timings):>8.2f}"
+                f" {statistics.median(timings):>7.2f}"
+                f" {statistics.quantiles(timings, n=20)[-1]:>7.2f}"
+            )
+    finally:
+        await database.disconnect()
+
+if __name__ == "__main__":
+    asyncio.run(main(
+        sys.argv[1] if len(sys.argv) > 1 else None,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    ))
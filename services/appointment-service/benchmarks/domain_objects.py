@@ -0,0 +1,123 @@
+# Domain Object Benchmark
+# Demonstrates: Measuring the cost of slotted vs dict-backed objects
+#
+# Run from services/appointment-service:
+#     python -m benchmarks.domain_objects [count]
+#
+# Each slotted domain class is compared with a dict-backed twin built
+# from the same fields and the same __post_init__, so the difference is
+# only the per-instance __dict__. TimeSlot is compared with its former
+# dataclass form holding two datetime.time fields.
+
+import sys
+import timeit
+import tracemalloc
+from dataclasses import MISSING, dataclass, field, fields, make_dataclass
+from datetime import date, datetime, time, timedelta
+
+from domain.entities import (
+    Appointment,
+    AppointmentStatus,
+    AppointmentId,
+    PatientId,
+    DoctorId,
+    TimeSlot
+)
+
+@dataclass
+class TimeOfDaySlot:
+    """TimeSlot as it was before minute offsets"""
+    start_time: time
+    end_time: time
+    
+    def __post_init__(self):
+        if self.start_time >= self.end_time:
+            raise ValueError("Start time must be before end time")
+
+def dict_backed(cls):
+    """Same dataclass without slots=True"""
+    params = cls.__dataclass_params__
+    # Hand-written methods only; dataclass regenerates the rest
+    namespace = {
+        name: value for name, value in cls.__dict__.items()
+        if callable(value) or isinstance(value, (staticmethod, classmethod, property))
+        if not name.startswith('__') or name in ('__post_init__', '__str__')
+    }
+    return make_dataclass(
+        f"{cls.__name__}WithDict",
+        [
+            (f.name, f.type, field(default=f.default, default_factory=f.default_factory))
+            if f.default is not MISSING or f.default_factory is not MISSING
+            else (f.name, f.type)
+            for f in fields(cls)
+        ],
+        namespace=namespace,
+        frozen=params.frozen
+    )
+
+def builders(appointment_cls, time_slot_cls, id_classes):
+    """Factories building one object of each benchmarked type"""
+    appointment_id_cls, patient_id_cls, doctor_id_cls = id_classes
+    day = date.today() + timedelta(days=1)
+    now = datetime.utcnow()
+    
+    def build_time_slot():
+        return time_slot_cls(time(9, 0), time(9, 30))
+    
+    def build_id():
+        return patient_id_cls("123e4567-e89b-12d3-a456-426614174000")
+    
+    def build_appointment():
+        return appointment_cls(
+            id=appointment_id_cls("550e8400-e29b-41d4-a716-446655440000"),
+            patient_id=patient_id_cls("123e4567-e89b-12d3-a456-426614174000"),
+            doctor_id=doctor_id_cls("987f6543-e21b-12d3-a456-426614174000"),
+            appointment_date=day,
+            time_slot=time_slot_cls(time(9, 0), time(9, 30)),
+            status=AppointmentStatus.SCHEDULED,
+            reason="Control",
+            created_at=now,
+            updated_at=now
+        )
+    
+    return {
+        'PatientId': build_id,
+        'TimeSlot': build_time_slot,
+        'Appointment': build_appointment
+    }
+
+def bytes_per_object(build, count: int) -> float:
+    """Average traced allocation of one built object (with its parts)"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = [build() for _ in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    # Discount the list holding them
+    return (after - before - sys.getsizeof(objects)) / len(objects)
+
+def construction_micros(build, count: int) -> float:
+    """Best-of-5 construction time of one object, in microseconds"""
+    return min(timeit.repeat(build, number=count, repeat=5)) / count * 1e6
+
+def main(count: int = 10000):
+    slotted = builders(Appointment, TimeSlot, (AppointmentId, PatientId, DoctorId))
+    with_dict = builders(
+        dict_backed(Appointment),
+        TimeOfDaySlot,
+        tuple(dict_backed(cls) for cls in (AppointmentId, PatientId, DoctorId))
+    )
+    
+    print(f"{count} objects each")
+    print(f"{'object':<12} {'bytes dict':>10} {'bytes slots':>11} {'us dict':>8} {'us slots':>9}")
+    for name in slotted:
+        print(
+            f"{name:<12}"
+            f" {bytes_per_object(with_dict[name], count):>10.0f}"
+            f" {bytes_per_object(slotted[name], count):>11.0f}"
+            f" {construction_micros(with_dict[name], count):>8.2f}"
+            f" {construction_micros(slotted[name], count):>9.2f}"
+        )
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
@@ -4,7 +4,9 @@
 from .entities import (
     Appointment,
     AppointmentStatus,
-    AppointmentAggregate
+    AppointmentAggregate,
+    AppointmentSeries,
+    SlotUnavailableError
 )
 
 from .value_objects import (
@@ -20,11 +22,16 @@ from .value_objects import (
     Specialty
 )
 
+from .availability import DayOccupancy
+from .recurrence import RecurrenceFrequency, RecurrenceRule
+
 __all__ = [
     # Entities
     'Appointment',
     'AppointmentStatus',
     'AppointmentAggregate',
+    'AppointmentSeries',
+    'SlotUnavailableError',
     # Value Objects
     'AppointmentId',
     'PatientId', 
@@ -35,5 +42,10 @@ __all__ = [
     'DateRange',
     'Money',
     'TelegramId',
-    'Specialty'
+    'Specialty',
+    # Availability
+    'DayOccupancy',
+    # Recurrence
+    'RecurrenceFrequency',
+    'RecurrenceRule'
 ]
@@ -0,0 +1,281 @@
+# Availability Engine
+# Demonstrates: Bitmap indexing, Vectorized set operations on minute offsets
+
+from datetime import date, time
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+MINUTES_PER_DAY = 24 * 60
+SLOT_STEP_MINUTES = 15
+
+# Default clinic schedule (minute offsets from midnight)
+# Working hours: 8:00 AM to 6:00 PM, lunch break: 1:00 PM to 2:00 PM
+DEFAULT_WORKING_WINDOWS: Tuple[Tuple[int, int], ...] = (
+    (8 * 60, 13 * 60),
+    (14 * 60, 18 * 60),
+)
+DEFAULT_WORKING_HOURS: Tuple[int, int] = (8 * 60, 18 * 60)
+DEFAULT_BREAKS: Tuple[Tuple[int, int], ...] = ((13 * 60, 14 * 60),)
+
+WEEKDAY_NAMES = (
+    "Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"
+)
+DEFAULT_WORKING_DAYS = WEEKDAY_NAMES[:5]
+
+
+def minute_of_day(value: time) -> int:
+    """Convert a time to its minute offset from midnight"""
+    return value.hour * 60 + value.minute
+
+
+# Shared time objects, one per minute of the day
+_MINUTE_TIMES = tuple(time(minute // 60, minute % 60) for minute in range(MINUTES_PER_DAY))
+
+
+def time_of_minute(minute: int) -> time:
+    """Convert a minute offset from midnight back to a time"""
+    return _MINUTE_TIMES[minute]
+
+
+def interval_mask(start_minute: int, end_minute: int) -> int:
+    """
+    Bitmask with bits [start_minute, end_minute) set
+    Bit N represents minute N of the day
+    """
+    if end_minute <= start_minute:
+        return 0
+    return ((1 << (end_minute - start_minute)) - 1) << start_minute
+
+
+def windows_mask(windows: Iterable[Tuple[int, int]]) -> int:
+    """Bitmask covering every minute of the given windows"""
+    mask = 0
+    for start_minute, end_minute in windows:
+        mask |= interval_mask(start_minute, end_minute)
+    return mask
+
+
+@lru_cache(maxsize=16)
+def grid_mask(step_minutes: int = SLOT_STEP_MINUTES) -> int:
+    """Bitmask with one bit set every step_minutes (valid slot starts)"""
+    mask = 0
+    for minute in range(0, MINUTES_PER_DAY, step_minutes):
+        mask |= 1 << minute
+    return mask
+
+
+DEFAULT_WORKING_MASK = windows_mask(DEFAULT_WORKING_WINDOWS)
+
+# Serialized bitmaps are MSB-first per byte (the layout of Redis SETBIT);
+# this table reverses the bits of each byte to convert to and from the
+# LSB-first integer used in memory
+BITMAP_BYTES = MINUTES_PER_DAY // 8
+_REVERSED_BITS = bytes(int(f"{byte:08b}"[::-1], 2) for byte in range(256))
+
+
+class DayOccupancy:
+    """
+    Occupancy bitmap for one doctor on one day
+    Demonstrates: Bitmap index - one bit per minute, booked minutes set
+
+    Python integers are arbitrary precision, so a 1440-bit day fits in a
+    single int and every set operation (overlap, free runs, masking) is a
+    handful of machine-word operations instead of a per-slot object loop.
+    """
+
+    __slots__ = ('bits',)
+
+    def __init__(self, bits: int = 0):
+        self.bits = bits
+
+    @classmethod
+    def from_intervals(cls, intervals: Iterable[Tuple[int, int]]) -> 'DayOccupancy':
+        """Build occupancy from (start_minute, end_minute) intervals"""
+        return cls(windows_mask(intervals))
+
+    def book(self, start_minute: int, end_minute: int) -> None:
+        """Mark an interval as occupied"""
+        self.bits |= interval_mask(start_minute, end_minute)
+
+    def release(self, start_minute: int, end_minute: int) -> None:
+        """Mark an interval as free"""
+        self.bits &= ~interval_mask(start_minute, end_minute)
+
+    def is_free(self, start_minute: int, end_minute: int) -> bool:
+        """Check if no minute of the interval is occupied"""
+        return not self.bits & interval_mask(start_minute, end_minute)
+
+    def free_starts(
+        self,
+        duration_minutes: int,
+        working_mask: int = DEFAULT_WORKING_MASK,
+        step_minutes: int = SLOT_STEP_MINUTES
+    ) -> List[int]:
+        """
+        Start offsets of every free slot of duration_minutes
+        Business Rules:
+        - The whole slot must fall inside working minutes
+        - The slot must not overlap any booked minute
+        - Slots start on the step_minutes grid
+        """
+        runs = self._free_runs(duration_minutes, working_mask, step_minutes)
+
+        starts = []
+        while runs:
+            lowest = runs & -runs
+            starts.append(lowest.bit_length() - 1)
+            runs ^= lowest
+        return starts
+
+    def free_summary(
+        self,
+        duration_minutes: int,
+        working_mask: int = DEFAULT_WORKING_MASK,
+        step_minutes: int = SLOT_STEP_MINUTES
+    ) -> Tuple[int, Optional[int]]:
+        """
+        Number of free slots and the first free start (None if none)
+        Same rules as free_starts, without listing every start
+        """
+        runs = self._free_runs(duration_minutes, working_mask, step_minutes)
+        if not runs:
+            return 0, None
+        return runs.bit_count(), (runs & -runs).bit_length() - 1
+
+    def _free_runs(self, duration_minutes: int, working_mask: int, step_minutes: int) -> int:
+        """Bitmask with bit N set when a free slot can start at minute N"""
+        if duration_minutes <= 0:
+            return 0
+
+        free = working_mask & ~self.bits
+
+        # Bit N of `runs` ends up set only if minutes N..N+duration-1 are all
+        # free. Doubling the shift keeps this at O(log duration) operations.
+        runs = free
+        covered = 1
+        while covered < duration_minutes:
+            shift = min(covered, duration_minutes - covered)
+            runs &= runs >> shift
+            covered += shift
+
+        return runs & grid_mask(step_minutes)
+
+    def to_bitmap(self) -> bytes:
+        """Serialize as a bitmap where bit offset N is minute N"""
+        return self.bits.to_bytes(BITMAP_BYTES, 'little').translate(_REVERSED_BITS)
+
+    @classmethod
+    def from_bitmap(cls, data: bytes) -> 'DayOccupancy':
+        """Deserialize a bitmap written by to_bitmap (or by SETBIT)"""
+        return cls(int.from_bytes(bytes(data).translate(_REVERSED_BITS), 'little'))
+
+    def __repr__(self) -> str:
+        return f"DayOccupancy(booked_minutes={self.bits.bit_count()})"
+
+
+class ScheduleTemplate:
+    """
+    Compiled weekly working schedule for one doctor
+    Demonstrates: Precomputation - JSONB schedule parsed once into
+    per-weekday minute-offset windows and bitmasks
+
+    Built from the doctors.available_days / available_hours columns:
+        available_days:  ["Monday", "Wednesday", ...]
+        available_hours: {"start": "09:00", "end": "17:00",
+                          "breaks": [{"start": "13:00", "end": "14:00"}],
+                          "Friday": {"start": "09:00", "end": "13:00"}}
+    Missing values fall back to the clinic defaults (Monday to Friday,
+    8:00 AM to 6:00 PM, lunch break 1:00 PM to 2:00 PM); an explicit empty
+    "breaks" list disables the lunch break. Only available_days=None means
+    the default days: an empty list (the column default) is a doctor who
+    works no day, as in the /doctors available_date filter.
+    """
+
+    __slots__ = ('windows', 'masks')
+
+    def __init__(
+        self,
+        windows: Tuple[Tuple[Tuple[int, int], ...], ...],
+        masks: Tuple[int, ...]
+    ):
+        self.windows = windows  # indexed by date.weekday()
+        self.masks = masks
+
+    @classmethod
+    def compile(
+        cls,
+        available_days: Optional[Iterable[str]] = None,
+        available_hours: Optional[Dict[str, Any]] = None
+    ) -> 'ScheduleTemplate':
+        """Compile a template from the doctor's schedule columns"""
+        working_days = set(
+            available_days if available_days is not None else DEFAULT_WORKING_DAYS
+        )
+        hours = available_hours or {}
+
+        windows = []
+        for day_name in WEEKDAY_NAMES:
+            if day_name not in working_days:
+                windows.append(())
+                continue
+            day_hours = hours.get(day_name)
+            day_windows = cls._compile_day(
+                day_hours if isinstance(day_hours, dict) else hours
+            )
+            windows.append(day_windows)
+
+        return cls(
+            tuple(windows),
+            tuple(windows_mask(day_windows) for day_windows in windows)
+        )
+
+    @staticmethod
+    def _compile_day(hours: Dict[str, Any]) -> Tuple[Tuple[int, int], ...]:
+        """Working windows of one day: [start, end) minus breaks"""
+        start_minute = _parse_minute(hours.get('start'), DEFAULT_WORKING_HOURS[0])
+        end_minute = _parse_minute(hours.get('end'), DEFAULT_WORKING_HOURS[1])
+
+        if 'breaks' in hours:
+            breaks = sorted(
+                (_parse_minute(b.get('start')), _parse_minute(b.get('end')))
+                for b in hours['breaks'] or []
+            )
+        else:
+            breaks = list(DEFAULT_BREAKS)
+
+        day_windows = []
+        cursor = start_minute
+        for break_start, break_end in breaks:
+            if break_start is None or break_end is None:
+                continue
+            if break_start > cursor:
+                day_windows.append((cursor, min(break_start, end_minute)))
+            cursor = max(cursor, break_end)
+        if cursor < end_minute:
+            day_windows.append((cursor, end_minute))
+
+        return tuple(w for w in day_windows if w[0] < w[1])
+
+    def works_on(self, day: date) -> bool:
+        """Check if the doctor has any working window on a date"""
+        return self.masks[day.weekday()] != 0
+
+    def working_mask(self, day: date) -> int:
+        """Bitmask of working minutes on a date"""
+        return self.masks[day.weekday()]
+
+    def __repr__(self) -> str:
+        return f"ScheduleTemplate(windows={self.windows})"
+
+
+def _parse_minute(value: Optional[str], default: Optional[int] = None) -> Optional[int]:
+    """Parse an "HH:MM" string into a minute offset"""
+    if not value:
+        return default
+    try:
+        return minute_of_day(time.fromisoformat(value))
+    except (TypeError, ValueError):
+        return default
+
+
+DEFAULT_SCHEDULE = ScheduleTemplate.compile()
@@ -3,9 +3,18 @@
 
 from dataclasses import dataclass, field
 from datetime import datetime, date, time
-from typing import Optional, List
+from typing import Iterator, Optional, List
 from enum import Enum
-import uuid
+
+from domain.recurrence import RecurrenceRule
+from domain.value_objects import AppointmentId, PatientId, DoctorId, TimeSlot
+
+class SlotUnavailableError(ValueError):
+    """
+    Raised when a time slot overlaps an active appointment
+    Subclasses ValueError so existing validation handling still applies
+    """
+    pass
 
 class AppointmentStatus(Enum):
     """
@@ -39,67 +48,7 @@ class AppointmentStatus(Enum):
         }
         return new_status in transitions.get(self, [])
 
-@dataclass(frozen=True)
-class AppointmentId:
-    """
-    Value Object for Appointment ID
-    Demonstrates: Value Object pattern - immutable, no identity
-    """
-    value: str
-    
-    def __post_init__(self):
-        if not self.value:
-            object.__setattr__(self, 'value', str(uuid.uuid4()))
-    
-    def __str__(self) -> str:
-        return self.value
-
-@dataclass(frozen=True)
-class PatientId:
-    """Value Object for Patient ID"""
-    value: str
-    
-    def __str__(self) -> str:
-        return self.value
-
-@dataclass(frozen=True)
-class DoctorId:
-    """Value Object for Doctor ID"""
-    value: str
-    
-    def __str__(self) -> str:
-        return self.value
-
-@dataclass
-class TimeSlot:
-    """
-    Value Object representing a time slot
-    Demonstrates: Value Object pattern with business logic
-    """
-    start_time: time
-    end_time: time
-    
-    def __post_init__(self):
-        if self.start_time >= self.end_time:
-            raise ValueError("Start time must be before end time")
-    
-    @property
-    def duration_minutes(self) -> int:
-        """Calculate duration in minutes"""
-        start_minutes = self.start_time.hour * 60 + self.start_time.minute
-        end_minutes = self.end_time.hour * 60 + self.end_time.minute
-        return end_minutes - start_minutes
-    
-    def overlaps_with(self, other: 'TimeSlot') -> bool:
-        """Check if this time slot overlaps with another"""
-        return not (self.end_time <= other.start_time or 
-                   self.start_time >= other.end_time)
-    
-    def contains(self, check_time: time) -> bool:
-        """Check if a time is within this slot"""
-        return self.start_time <= check_time < self.end_time
-
-@dataclass
+@dataclass(slots=True)
 class Appointment:
     """
     Appointment Entity
@@ -118,6 +67,7 @@ class Appointment:
     updated_at: datetime = field(default_factory=datetime.utcnow)
     cancelled_at: Optional[datetime] = None
     cancellation_reason: Optional[str] = None
+    series_id: Optional[str] = None  # set for occurrences of a recurring series
     
     def __post_init__(self):
         """Validate entity invariants"""
@@ -134,6 +84,45 @@ class Appointment:
         if self.status == AppointmentStatus.CANCELLED and not self.cancellation_reason:
             raise ValueError("Cancellation reason is required for cancelled appointments")
     
+    @classmethod
+    def restore(
+        cls,
+        id: AppointmentId,
+        patient_id: PatientId,
+        doctor_id: DoctorId,
+        appointment_date: date,
+        time_slot: TimeSlot,
+        status: AppointmentStatus,
+        created_at: datetime,
+        updated_at: datetime,
+        reason: Optional[str] = None,
+        notes: Optional[str] = None,
+        cancelled_at: Optional[datetime] = None,
+        cancellation_reason: Optional[str] = None,
+        series_id: Optional[str] = None
+    ) -> 'Appointment':
+        """
+        Rebuild an already persisted appointment
+        Skips _validate_invariants: those rules apply to new appointments
+        (and would reject every appointment in the past). Persisted rows
+        always carry created_at and updated_at, so both are required.
+        """
+        appointment = object.__new__(cls)
+        appointment.id = id
+        appointment.patient_id = patient_id
+        appointment.doctor_id = doctor_id
+        appointment.appointment_date = appointment_date
+        appointment.time_slot = time_slot
+        appointment.status = status
+        appointment.reason = reason
+        appointment.notes = notes
+        appointment.created_at = created_at
+        appointment.updated_at = updated_at
+        appointment.cancelled_at = cancelled_at
+        appointment.cancellation_reason = cancellation_reason
+        appointment.series_id = series_id
+        return appointment
+    
     def update_status(self, new_status: AppointmentStatus) -> None:
         """
         Update appointment status with validation
@@ -211,18 +200,22 @@ class Appointment:
             'created_at': self.created_at.isoformat(),
             'updated_at': self.updated_at.isoformat(),
             'cancelled_at': self.cancelled_at.isoformat() if self.cancelled_at else None,
-            'cancellation_reason': self.cancellation_reason
+            'cancellation_reason': self.cancellation_reason,
+            'series_id': self.series_id
         }
     
     @classmethod
     def from_dict(cls, data: dict) -> 'Appointment':
-        """Create from dictionary"""
-        return cls(
-            id=AppointmentId(data.get('id', '')),
-            patient_id=PatientId(data['patient_id']),
-            doctor_id=DoctorId(data['doctor_id']),
+        """
+        Create from a dictionary written by to_dict
+        Persisted data is trusted: rebuilt with restore, not revalidated
+        """
+        return cls.restore(
+            id=AppointmentId.restore(data['id']) if data.get('id') else AppointmentId(''),
+            patient_id=PatientId.restore(data['patient_id']),
+            doctor_id=DoctorId.restore(data['doctor_id']),
             appointment_date=date.fromisoformat(data['appointment_date']),
-            time_slot=TimeSlot(
+            time_slot=TimeSlot.restore(
                 start_time=time.fromisoformat(data['start_time']),
                 end_time=time.fromisoformat(data['end_time'])
             ),
@@ -232,9 +225,46 @@ class Appointment:
             created_at=datetime.fromisoformat(data['created_at']) if 'created_at' in data else datetime.utcnow(),
             updated_at=datetime.fromisoformat(data['updated_at']) if 'updated_at' in data else datetime.utcnow(),
             cancelled_at=datetime.fromisoformat(data['cancelled_at']) if data.get('cancelled_at') else None,
-            cancellation_reason=data.get('cancellation_reason')
+            cancellation_reason=data.get('cancellation_reason'),
+            series_id=data.get('series_id')
         )
 
+@dataclass(slots=True)
+class AppointmentSeries:
+    """
+    Recurring Appointment Series Entity
+    Demonstrates: Entity owning a recurrence rule; occurrences are
+    ordinary appointments pointing back through series_id
+    """
+    id: AppointmentId
+    patient_id: PatientId
+    doctor_id: DoctorId
+    rule: RecurrenceRule
+    start_date: date
+    time_slot: TimeSlot
+    reason: Optional[str] = None
+    notes: Optional[str] = None
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    
+    def occurrence_dates(self) -> Iterator[date]:
+        """Lazily expand the occurrence dates of the series"""
+        return self.rule.occurrences(self.start_date)
+    
+    def to_dict(self) -> dict:
+        """Convert to dictionary for persistence"""
+        return {
+            'id': str(self.id),
+            'patient_id': str(self.patient_id),
+            'doctor_id': str(self.doctor_id),
+            'recurrence': self.rule.to_dict(),
+            'start_date': self.start_date.isoformat(),
+            'start_time': self.time_slot.start_time.isoformat(),
+            'end_time': self.time_slot.end_time.isoformat(),
+            'reason': self.reason,
+            'notes': self.notes,
+            'created_at': self.created_at.isoformat()
+        }
+
 @dataclass
 class AppointmentAggregate:
     """
@@ -0,0 +1,129 @@
+# Recurrence Rules
+# Demonstrates: Value Object, Lazy expansion with generators
+
+from dataclasses import dataclass
+from datetime import date, timedelta
+from enum import Enum
+from itertools import islice
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from domain.availability import WEEKDAY_NAMES
+
+# Hard cap on the occurrences of one series, whatever the rule says
+MAX_SERIES_OCCURRENCES = 52
+
+
+class RecurrenceFrequency(Enum):
+    """Repetition unit of a recurrence rule"""
+    DAILY = "daily"
+    WEEKLY = "weekly"
+    MONTHLY = "monthly"
+
+
+@dataclass(frozen=True, slots=True)
+class RecurrenceRule:
+    """
+    RRULE-like recurrence rule
+    Demonstrates: Value Object pattern - immutable, validated on creation
+
+    Examples:
+        every 2 weeks on Monday and Thursday, 10 times:
+            RecurrenceRule(WEEKLY, interval=2, weekdays=(0, 3), count=10)
+        monthly on the start date's day until a date:
+            RecurrenceRule(MONTHLY, until=date(2025, 6, 30))
+    """
+    frequency: RecurrenceFrequency
+    interval: int = 1
+    weekdays: Tuple[int, ...] = ()  # date.weekday() values, weekly rules only
+    until: Optional[date] = None
+    count: Optional[int] = None
+
+    def __post_init__(self):
+        if self.interval < 1:
+            raise ValueError("Recurrence interval must be at least 1")
+        if self.until is None and self.count is None:
+            raise ValueError("Recurrence needs an until date or a count")
+        if self.count is not None and not 1 <= self.count <= MAX_SERIES_OCCURRENCES:
+            raise ValueError(
+                f"Recurrence count must be between 1 and {MAX_SERIES_OCCURRENCES}"
+            )
+        if any(not 0 <= day <= 6 for day in self.weekdays):
+            raise ValueError("Recurrence weekdays must be between 0 and 6")
+        if self.weekdays and self.frequency != RecurrenceFrequency.WEEKLY:
+            raise ValueError("Recurrence weekdays only apply to weekly rules")
+        object.__setattr__(self, 'weekdays', tuple(sorted(set(self.weekdays))))
+
+    def occurrences(self, start: date) -> Iterator[date]:
+        """
+        Lazily yield occurrence dates from start (inclusive)
+        Stops at until, count or MAX_SERIES_OCCURRENCES, whichever comes first
+        """
+        limit = min(self.count or MAX_SERIES_OCCURRENCES, MAX_SERIES_OCCURRENCES)
+        for occurrence in islice(self._candidates(start), limit):
+            if self.until is not None and occurrence > self.until:
+                return
+            yield occurrence
+
+    def _candidates(self, start: date) -> Iterator[date]:
+        """Unbounded stream of dates matching the rule"""
+        if self.frequency == RecurrenceFrequency.DAILY:
+            step = timedelta(days=self.interval)
+            current = start
+            while True:
+                yield current
+                current += step
+
+        elif self.frequency == RecurrenceFrequency.WEEKLY:
+            weekdays = self.weekdays or (start.weekday(),)
+            week_start = start - timedelta(days=start.weekday())
+            step = timedelta(weeks=self.interval)
+            while True:
+                for weekday in weekdays:
+                    current = week_start + timedelta(days=weekday)
+                    if current >= start:
+                        yield current
+                week_start += step
+
+        else:
+            # Months without the start day (e.g. the 31st) are skipped
+            months = 0
+            while True:
+                year, month = divmod(start.month - 1 + months, 12)
+                try:
+                    yield start.replace(year=start.year + year, month=month + 1)
+                except ValueError:
+                    pass
+                months += self.interval
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for persistence"""
+        return {
+            'frequency': self.frequency.value,
+            'interval': self.interval,
+            'weekdays': [WEEKDAY_NAMES[day] for day in self.weekdays],
+            'until': self.until.isoformat() if self.until else None,
+            'count': self.count
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'RecurrenceRule':
+        """Create from dictionary; weekdays may be names or numbers"""
+        until = data.get('until')
+        if isinstance(until, str):
+            until = date.fromisoformat(until)
+
+        weekdays = []
+        for day in data.get('weekdays') or []:
+            if isinstance(day, str):
+                if day.capitalize() not in WEEKDAY_NAMES:
+                    raise ValueError(f"Invalid weekday: {day}")
+                day = WEEKDAY_NAMES.index(day.capitalize())
+            weekdays.append(day)
+
+        return cls(
+            frequency=RecurrenceFrequency(data['frequency']),
+            interval=data.get('interval') or 1,
+            weekdays=tuple(weekdays),
+            until=until,
+            count=data.get('count')
+        )
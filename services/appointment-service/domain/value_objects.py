@@ -3,15 +3,37 @@
 
 from dataclasses import dataclass
 from datetime import time, date, datetime
-from typing import Optional
+from typing import Any, Dict, Optional
 import re
 import uuid
 
-@dataclass(frozen=True)
+from domain.availability import minute_of_day, time_of_minute
+
+# Interned PatientId / DoctorId instances from trusted sources; the same
+# few hundred doctors and patients appear in every listing
+_INTERN_MAX_ENTRIES = 10000
+_PATIENT_IDS: Dict[str, 'PatientId'] = {}
+_DOCTOR_IDS: Dict[str, 'DoctorId'] = {}
+
+def _interned(cls, value: str, table: Dict[str, Any]):
+    """Shared instance of cls for value, built without validation"""
+    instance = table.get(value)
+    if instance is None:
+        if len(table) >= _INTERN_MAX_ENTRIES:
+            table.clear()
+        instance = object.__new__(cls)
+        object.__setattr__(instance, 'value', value)
+        table[value] = instance
+    return instance
+
+@dataclass(frozen=True, slots=True)
 class AppointmentId:
     """
     Value Object for Appointment ID
     Immutable and self-validating
+    
+    An empty value generates a new id. Ids read back from storage are
+    already known to be valid: build those with restore().
     """
     value: str
     
@@ -21,6 +43,13 @@ class AppointmentId:
         elif not self._is_valid_uuid(self.value):
             raise ValueError(f"Invalid appointment ID format: {self.value}")
     
+    @classmethod
+    def restore(cls, value: str) -> 'AppointmentId':
+        """Build a stored id without re-validating it"""
+        instance = object.__new__(cls)
+        object.__setattr__(instance, 'value', value)
+        return instance
+    
     @staticmethod
     def _is_valid_uuid(value: str) -> bool:
         try:
@@ -32,7 +61,7 @@ class AppointmentId:
     def __str__(self) -> str:
         return self.value
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class PatientId:
     """Value Object for Patient ID"""
     value: str
@@ -41,10 +70,15 @@ class PatientId:
         if not self.value:
             raise ValueError("Patient ID cannot be empty")
     
+    @classmethod
+    def restore(cls, value: str) -> 'PatientId':
+        """Shared (interned) instance of a stored id, not re-validated"""
+        return _interned(cls, value, _PATIENT_IDS)
+    
     def __str__(self) -> str:
         return self.value
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class DoctorId:
     """Value Object for Doctor ID"""
     value: str
@@ -53,45 +87,88 @@ class DoctorId:
         if not self.value:
             raise ValueError("Doctor ID cannot be empty")
     
+    @classmethod
+    def restore(cls, value: str) -> 'DoctorId':
+        """Shared (interned) instance of a stored id, not re-validated"""
+        return _interned(cls, value, _DOCTOR_IDS)
+    
     def __str__(self) -> str:
         return self.value
 
-@dataclass(frozen=True)
 class TimeSlot:
     """
     Value Object representing a time slot
-    Encapsulates time slot logic and validations
+    Demonstrates: Value Object pattern with business logic
+    
+    Stored as minute offsets from midnight (seconds are dropped), so
+    overlap and containment checks are integer compares. start_time and
+    end_time are the equivalent datetime.time values. Slots are values:
+    never reassign their attributes, build a new slot instead.
     """
-    start_time: time
-    end_time: time
     
-    def __post_init__(self):
-        if self.start_time >= self.end_time:
+    __slots__ = ('start_minute', 'end_minute')
+    
+    def __init__(self, start_time: time, end_time: time):
+        start_minute = start_time.hour * 60 + start_time.minute
+        end_minute = end_time.hour * 60 + end_time.minute
+        if start_minute >= end_minute:
             raise ValueError("Start time must be before end time")
-        if self.start_time.minute % 15 != 0 or self.end_time.minute % 15 != 0:
-            raise ValueError("Times must be in 15-minute intervals")
+        self.start_minute = start_minute
+        self.end_minute = end_minute
+    
+    @classmethod
+    def from_minutes(cls, start_minute: int, end_minute: int) -> 'TimeSlot':
+        """
+        Build a slot from minute offsets without validation
+        For trusted callers such as the availability engine
+        """
+        time_slot = object.__new__(cls)
+        time_slot.start_minute = start_minute
+        time_slot.end_minute = end_minute
+        return time_slot
+    
+    @classmethod
+    def restore(cls, start_time: time, end_time: time) -> 'TimeSlot':
+        """Rebuild a stored time slot without re-validating it"""
+        return cls.from_minutes(minute_of_day(start_time), minute_of_day(end_time))
+    
+    @property
+    def start_time(self) -> time:
+        return time_of_minute(self.start_minute)
+    
+    @property
+    def end_time(self) -> time:
+        return time_of_minute(self.end_minute)
     
     @property
     def duration_minutes(self) -> int:
         """Calculate duration in minutes"""
-        start_minutes = self.start_time.hour * 60 + self.start_time.minute
-        end_minutes = self.end_time.hour * 60 + self.end_time.minute
-        return end_minutes - start_minutes
+        return self.end_minute - self.start_minute
     
     def overlaps_with(self, other: 'TimeSlot') -> bool:
         """Check if this time slot overlaps with another"""
-        return not (self.end_time <= other.start_time or 
-                   self.start_time >= other.end_time)
+        return self.start_minute < other.end_minute and other.start_minute < self.end_minute
     
     def contains(self, check_time: time) -> bool:
         """Check if a time is within this slot"""
-        return self.start_time <= check_time < self.end_time
+        return self.start_minute <= minute_of_day(check_time) < self.end_minute
     
     def to_string(self) -> str:
         """Human-readable format"""
         return f"{self.start_time.strftime('%H:%M')} - {self.end_time.strftime('%H:%M')}"
+    
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, TimeSlot):
+            return NotImplemented
+        return (self.start_minute, self.end_minute) == (other.start_minute, other.end_minute)
+    
+    def __hash__(self) -> int:
+        return hash((self.start_minute, self.end_minute))
+    
+    def __repr__(self) -> str:
+        return f"TimeSlot(start_time={self.start_time!r}, end_time={self.end_time!r})"
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Email:
     """
     Value Object for Email
@@ -116,7 +193,7 @@ class Email:
         """Extract domain from email"""
         return self.value.split('@')[1]
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Phone:
     """
     Value Object for Phone Number
@@ -155,7 +232,7 @@ class Phone:
             return f"({local[:3]}) {local[3:6]}-{local[6:]}"
         return local
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class DateRange:
     """
     Value Object for Date Range
@@ -191,7 +268,7 @@ class DateRange:
             current = date.fromordinal(current.toordinal() + 1)
         return dates
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Money:
     """
     Value Object for Money
@@ -220,7 +297,7 @@ class Money:
         """Format for display"""
         return f"${self.amount:,.2f} {self.currency}"
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class TelegramId:
     """
     Value Object for Telegram User ID
@@ -234,7 +311,7 @@ class TelegramId:
     def __str__(self) -> str:
         return self.value
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Specialty:
     """
     Value Object for Medical Specialty
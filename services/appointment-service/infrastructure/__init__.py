@@ -2,8 +2,10 @@
 # Makes infrastructure classes importable
 
 from .database import Database
+from .cache import RedisCache, InMemoryCache, LocalCache, create_cache
 from .repositories import (
     PostgreSQLAppointmentRepository,
+    PostgreSQLDoctorRepository,
     CachedAppointmentRepository
 )
 from .messaging import (
@@ -14,14 +16,21 @@ from .messaging import (
     EventStore,
     IEventHandler,
     NotificationEventHandler,
+    OccupancyEventHandler,
     AuditEventHandler
 )
 
 __all__ = [
     # Database
     'Database',
+    # Cache
+    'RedisCache',
+    'InMemoryCache',
+    'LocalCache',
+    'create_cache',
     # Repositories
     'PostgreSQLAppointmentRepository',
+    'PostgreSQLDoctorRepository',
     'CachedAppointmentRepository',
     # Events and Messaging
     'Event',
@@ -31,5 +40,6 @@ __all__ = [
     'EventStore',
     'IEventHandler',
     'NotificationEventHandler',
+    'OccupancyEventHandler',
     'AuditEventHandler'
 ]
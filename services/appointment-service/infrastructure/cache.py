@@ -0,0 +1,504 @@
+# Cache Backends
+# Demonstrates: Adapter Pattern, Connection Pooling, Test Doubles
+
+import asyncio
+import time
+import logging
+import uuid
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import redis.asyncio as redis
+
+logger = logging.getLogger(__name__)
+
+# Pub/sub channel carrying cache keys every process must drop from its
+# local cache (see CachedAppointmentRepository._invalidate_cache)
+CACHE_INVALIDATION_CHANNEL = "appointment_cache_invalidation"
+
+# Pub/sub reconnect backoff, in seconds
+SUBSCRIBER_RETRY_INITIAL = 0.5
+SUBSCRIBER_RETRY_MAX = 30
+
+# Seconds a fill claim (see begin_fill) stays valid
+FILL_CLAIM_TTL = 30
+
+def fill_claim_key(key: str) -> str:
+    """Key holding the token of the fill in progress for key"""
+    return f"{key}:fill"
+
+# Set bits [ARGV[1], ARGV[2]) of an existing bitmap to ARGV[3]; a missing
+# key is left missing so a partial patch never poses as a full bitmap,
+# and a fill in progress (KEYS[2]) is voided as it may predate the patch
+SET_BITS_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    redis.call('DEL', KEYS[2])
+    return 0
+end
+for offset = tonumber(ARGV[1]), tonumber(ARGV[2]) - 1 do
+    redis.call('SETBIT', KEYS[1], offset, ARGV[3])
+end
+return 1
+"""
+
+# Store ARGV[3] at KEYS[1] for ARGV[2] seconds if the fill claim KEYS[2]
+# still holds token ARGV[1]
+COMPLETE_FILL_SCRIPT = """
+if redis.call('GET', KEYS[2]) ~= ARGV[1] then
+    return 0
+end
+redis.call('DEL', KEYS[2])
+redis.call('SETEX', KEYS[1], ARGV[2], ARGV[3])
+return 1
+"""
+
+class RedisCache:
+    """
+    Redis cache backend
+    Demonstrates: Adapter over redis.asyncio with a shared connection pool
+    """
+    
+    def __init__(self, connection_url: str, max_connections: int = 20):
+        self.connection_url = connection_url
+        self.max_connections = max_connections
+        self.pool: Optional[redis.ConnectionPool] = None
+        self.client: Optional[redis.Redis] = None
+        self._pubsub = None
+        self._subscribers: Dict[str, Callable[[str], None]] = {}
+        self._gap_callbacks: List[Callable[[], None]] = []
+        self._listener_task: Optional[asyncio.Task] = None
+        self._set_bits_script = None
+        self._complete_fill_script = None
+    
+    async def connect(self):
+        """
+        Create connection pool
+        Demonstrates: Resource initialization
+        """
+        try:
+            self.pool = redis.ConnectionPool.from_url(
+                self.connection_url,
+                max_connections=self.max_connections
+            )
+            self.client = redis.Redis(connection_pool=self.pool)
+            await self.client.ping()
+            self._set_bits_script = self.client.register_script(SET_BITS_SCRIPT)
+            self._complete_fill_script = self.client.register_script(COMPLETE_FILL_SCRIPT)
+            logger.info("Redis connection pool created successfully")
+        except Exception as e:
+            logger.error(f"Failed to connect to Redis: {e}")
+            raise
+    
+    async def disconnect(self):
+        """
+        Close connection pool
+        Demonstrates: Resource cleanup
+        """
+        if self._listener_task:
+            self._listener_task.cancel()
+            self._listener_task = None
+        if self._pubsub:
+            await self._pubsub.aclose()
+            self._pubsub = None
+        
+        if self.client:
+            await self.client.aclose()
+            self.client = None
+        if self.pool:
+            await self.pool.disconnect()
+            self.pool = None
+            logger.info("Redis connection pool closed")
+    
+    async def get(self, key: str) -> Optional[bytes]:
+        """Get a value, None if missing or expired"""
+        return await self.client.get(key)
+    
+    async def setex(self, key: str, ttl: int, value) -> None:
+        """Set a value that expires after ttl seconds"""
+        await self.client.setex(key, ttl, value)
+    
+    async def delete(self, *keys: str) -> int:
+        """Delete keys, returning how many existed"""
+        if not keys:
+            return 0
+        return await self.client.delete(*keys)
+    
+    async def get_with_ttl(self, key: str) -> Tuple[Optional[bytes], Optional[float]]:
+        """
+        Get a value and its remaining TTL in seconds in one round trip
+        TTL is None when the key is missing or never expires
+        """
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.get(key)
+            pipe.pttl(key)
+            value, ttl_ms = await pipe.execute()
+        return value, (ttl_ms / 1000 if ttl_ms >= 0 else None)
+    
+    async def set_bits(self, key: str, start: int, end: int, value: int) -> bool:
+        """
+        Set bits [start, end) of an existing bitmap in one round trip
+        Returns False (and writes nothing) if the key does not exist; a
+        fill of that key in progress is then voided
+        """
+        return bool(await self._set_bits_script(
+            keys=[key, fill_claim_key(key)],
+            args=[start, end, value]
+        ))
+    
+    async def set_bits_many(self, patches: List[Tuple[str, int, int, int]]) -> None:
+        """
+        Apply several set_bits (key, start, end, value) patches
+        Demonstrates: Pipelining - one round trip whatever the patch count
+        """
+        if not patches:
+            return
+        async with self.client.pipeline(transaction=False) as pipe:
+            for key, start, end, value in patches:
+                await self._set_bits_script(
+                    keys=[key, fill_claim_key(key)],
+                    args=[start, end, value],
+                    client=pipe
+                )
+            await pipe.execute()
+    
+    async def begin_fill(self, key: str) -> str:
+        """
+        Claim the fill of a missing key, before reading its source
+        Returns the token complete_fill needs
+        Demonstrates: Guarded fill - a set_bits patch on the missing key,
+        or a newer claim, makes complete_fill a no-op, so a value computed
+        from data read before the patch is never stored
+        """
+        token = uuid.uuid4().hex
+        await self.client.setex(fill_claim_key(key), FILL_CLAIM_TTL, token)
+        return token
+    
+    async def complete_fill(self, key: str, token: str, ttl: int, value) -> bool:
+        """Set a value claimed by begin_fill; False if the claim was voided"""
+        return bool(await self._complete_fill_script(
+            keys=[key, fill_claim_key(key)],
+            args=[token, ttl, value]
+        ))
+    
+    async def invalidate(
+        self,
+        keys: List[str],
+        channel: Optional[str] = None,
+        message: Optional[str] = None
+    ) -> None:
+        """
+        Delete keys and optionally publish a message
+        Fills of the keys in progress (see begin_fill) are voided too
+        Demonstrates: Pipelining - one round trip whatever the key count
+        """
+        async with self.client.pipeline(transaction=False) as pipe:
+            if keys:
+                pipe.delete(*keys, *map(fill_claim_key, keys))
+            if channel:
+                pipe.publish(channel, message)
+            await pipe.execute()
+    
+    async def publish(self, channel: str, message: str) -> None:
+        """Publish a message to every subscriber of a channel"""
+        await self.client.publish(channel, message)
+    
+    async def subscribe(
+        self,
+        channel: str,
+        callback: Callable[[str], None],
+        on_gap: Optional[Callable[[], None]] = None
+    ):
+        """
+        Subscribe to a pub/sub channel
+        Uses one dedicated connection read by a background task
+        
+        Pub/sub does not replay messages: on_gap is called when some may
+        have been missed - when the connection drops and again once the
+        subscriptions are restored
+        """
+        if self._pubsub is None:
+            self._pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        
+        self._subscribers[channel] = callback
+        if on_gap is not None:
+            self._gap_callbacks.append(on_gap)
+        await self._pubsub.subscribe(channel)
+        
+        if self._listener_task is None:
+            self._listener_task = asyncio.create_task(self._listen())
+        logger.info(f"Subscribed to cache channel: {channel}")
+    
+    async def _listen(self):
+        """
+        Dispatch pub/sub messages to their callbacks
+        Demonstrates: Resilient subscriber - a lost connection is
+        re-established with exponential backoff instead of ending the task
+        """
+        delay = SUBSCRIBER_RETRY_INITIAL
+        while True:
+            try:
+                async for message in self._pubsub.listen():
+                    delay = SUBSCRIBER_RETRY_INITIAL
+                    self._dispatch(message)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Cache pub/sub connection lost, retrying in {delay}s: {e}")
+            self._notify_gap()
+            
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, SUBSCRIBER_RETRY_MAX)
+            try:
+                await self._resubscribe()
+            except Exception as e:
+                logger.warning(f"Cache pub/sub resubscribe failed: {e}")
+                continue
+            logger.info(f"Resubscribed to cache channels: {', '.join(self._subscribers)}")
+            self._notify_gap()
+    
+    async def _resubscribe(self):
+        """Replace the pub/sub connection and subscribe every channel again"""
+        previous, self._pubsub = self._pubsub, self.client.pubsub(ignore_subscribe_messages=True)
+        try:
+            await previous.aclose()
+        except Exception:
+            pass
+        await self._pubsub.subscribe(*self._subscribers)
+    
+    def _dispatch(self, message):
+        channel = message['channel'].decode()
+        try:
+            self._subscribers[channel](message['data'].decode())
+        except Exception as e:
+            logger.error(f"Error handling message on {channel}: {e}")
+    
+    def _notify_gap(self):
+        for callback in self._gap_callbacks:
+            try:
+                callback()
+            except Exception as e:
+                logger.error(f"Error handling pub/sub gap: {e}")
+
+class InMemoryCache:
+    """
+    In-process cache with the same interface as RedisCache
+    Demonstrates: Test double - used in tests and single-process
+    development instead of a Redis server
+    """
+    
+    def __init__(self):
+        self._data: Dict[str, Tuple[float, object]] = {}  # key -> (expires_at, value)
+        self._subscribers: Dict[str, Callable[[str], None]] = {}
+    
+    async def connect(self):
+        """Nothing to connect"""
+        pass
+    
+    async def disconnect(self):
+        """Drop every entry"""
+        self._data.clear()
+    
+    async def get(self, key: str):
+        """Get a value, None if missing or expired"""
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            return None
+        return value
+    
+    async def setex(self, key: str, ttl: int, value) -> None:
+        """Set a value that expires after ttl seconds"""
+        self._data[key] = (time.monotonic() + ttl, value)
+    
+    async def delete(self, *keys: str) -> int:
+        """Delete keys, returning how many existed"""
+        return sum(1 for key in keys if self._data.pop(key, None) is not None)
+    
+    async def get_with_ttl(self, key: str) -> Tuple[Optional[object], Optional[float]]:
+        """Get a value and its remaining TTL in seconds"""
+        entry = self._data.get(key)
+        if entry is None:
+            return None, None
+        remaining = entry[0] - time.monotonic()
+        if remaining <= 0:
+            del self._data[key]
+            return None, None
+        return entry[1], remaining
+    
+    async def set_bits(self, key: str, start: int, end: int, value: int) -> bool:
+        """Set bits [start, end) of an existing bitmap (MSB-first, like SETBIT)"""
+        entry = self._data.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            self._data.pop(fill_claim_key(key), None)
+            return False
+        bitmap = bytearray(entry[1])
+        for offset in range(start, end):
+            if offset // 8 >= len(bitmap):
+                bitmap.extend(bytes(offset // 8 - len(bitmap) + 1))
+            mask = 0x80 >> (offset % 8)
+            if value:
+                bitmap[offset // 8] |= mask
+            else:
+                bitmap[offset // 8] &= ~mask
+        self._data[key] = (entry[0], bytes(bitmap))
+        return True
+    
+    async def set_bits_many(self, patches: List[Tuple[str, int, int, int]]) -> None:
+        """Apply several set_bits (key, start, end, value) patches"""
+        for key, start, end, value in patches:
+            await self.set_bits(key, start, end, value)
+    
+    async def begin_fill(self, key: str) -> str:
+        """Claim the fill of a missing key (see RedisCache.begin_fill)"""
+        token = uuid.uuid4().hex
+        await self.setex(fill_claim_key(key), FILL_CLAIM_TTL, token)
+        return token
+    
+    async def complete_fill(self, key: str, token: str, ttl: int, value) -> bool:
+        """Set a value claimed by begin_fill; False if the claim was voided"""
+        if await self.get(fill_claim_key(key)) != token:
+            return False
+        self._data.pop(fill_claim_key(key), None)
+        await self.setex(key, ttl, value)
+        return True
+    
+    async def invalidate(
+        self,
+        keys: List[str],
+        channel: Optional[str] = None,
+        message: Optional[str] = None
+    ) -> None:
+        """Delete keys (voiding their fills) and optionally publish a message"""
+        await self.delete(*keys, *map(fill_claim_key, keys))
+        if channel:
+            await self.publish(channel, message)
+    
+    async def publish(self, channel: str, message: str) -> None:
+        """Deliver a message to this process's subscriber"""
+        callback = self._subscribers.get(channel)
+        if callback:
+            callback(message)
+    
+    async def subscribe(
+        self,
+        channel: str,
+        callback: Callable[[str], None],
+        on_gap: Optional[Callable[[], None]] = None
+    ):
+        """Subscribe to a channel (in-process only, no message is ever missed)"""
+        self._subscribers[channel] = callback
+
+class LocalCache:
+    """
+    Bounded in-process LRU cache with TTL
+    Demonstrates: L1 cache of already built objects - a hit costs no
+    I/O, no decoding and no validation
+    
+    Entries are evicted least recently used first once max_entries is
+    reached, and expire after ttl seconds in any case so a missed
+    invalidation message cannot keep stale data alive for long.
+    """
+    
+    def __init__(self, max_entries: int = 10000, ttl: float = 30):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.generation = 0  # bumped on every invalidation
+        self._data: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+    
+    def get(self, key: str) -> Any:
+        """Get a value, None if missing or expired"""
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+    
+    def set(self, key: str, value: Any, generation: Optional[int] = None) -> None:
+        """
+        Store a value
+        If generation is given and an invalidation happened since it was
+        read, the value may be stale and is not stored
+        """
+        if generation is not None and generation != self.generation:
+            return
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+    
+    def invalidate(self, *keys: str) -> None:
+        """Drop keys"""
+        self.generation += 1
+        for key in keys:
+            self._data.pop(key, None)
+    
+    def clear(self) -> None:
+        """Drop every entry"""
+        self.generation += 1
+        self._data.clear()
+    
+    def __len__(self) -> int:
+        return len(self._data)
+
+class SingleFlight:
+    """
+    Request coalescing per cache key
+    Demonstrates: Single-flight - N concurrent misses on one key cause
+    exactly one load; everyone else awaits the same result
+    """
+    
+    def __init__(self):
+        self._in_flight: Dict[str, asyncio.Future] = {}
+    
+    def in_flight(self, key: str) -> bool:
+        """Check if a load for the key is running"""
+        return key in self._in_flight
+    
+    async def do(self, key: str, load: Callable[[], Awaitable[Any]]) -> Any:
+        """Run load() unless one is already running for key, and await it"""
+        # shield: a cancelled caller must not cancel the load other
+        # callers are waiting on
+        return await asyncio.shield(self.spawn(key, load))
+    
+    def spawn(self, key: str, load: Callable[[], Awaitable[Any]]) -> asyncio.Future:
+        """Start load() in the background unless one is already running"""
+        future = self._in_flight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(load())
+            self._in_flight[key] = future
+            future.add_done_callback(lambda done: self._release(key, done))
+        return future
+    
+    def forget(self, *keys: str) -> None:
+        """Let later callers start fresh loads (running ones still finish)"""
+        for key in keys:
+            self._in_flight.pop(key, None)
+    
+    def _release(self, key: str, future: asyncio.Future) -> None:
+        if self._in_flight.get(key) is future:
+            del self._in_flight[key]
+
+def create_cache(backend: str, connection_url: Optional[str] = None):
+    """
+    Build the cache backend selected by configuration
+    Returns None when caching is disabled
+    """
+    backend = (backend or "none").lower()
+    
+    if backend == "redis":
+        if not connection_url:
+            raise ValueError("REDIS_URL is required for the redis cache backend")
+        return RedisCache(connection_url)
+    if backend == "memory":
+        return InMemoryCache()
+    if backend == "none":
+        return None
+    
+    raise ValueError(f"Unknown cache backend: {backend}")
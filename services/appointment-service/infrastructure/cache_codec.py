@@ -0,0 +1,273 @@
+# Cache Codecs
+# Demonstrates: Strategy Pattern, Columnar binary serialization
+
+import json
+import struct
+import uuid
+from abc import ABC, abstractmethod
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Dict, List, Optional, Type
+
+from domain.entities import (
+    Appointment,
+    AppointmentStatus,
+    AppointmentId,
+    PatientId,
+    DoctorId,
+    TimeSlot
+)
+
+class CacheCodec(ABC):
+    """
+    Serialization of cached appointments
+    Demonstrates: Strategy Pattern - CachedAppointmentRepository does not
+    know how entries are laid out
+    """
+    
+    @abstractmethod
+    def encode_appointments(self, appointments: List[Appointment]) -> bytes:
+        """Encode a list of appointments as one cache value"""
+        pass
+    
+    @abstractmethod
+    def decode_appointments(self, data) -> List[Appointment]:
+        """Decode a value written by encode_appointments"""
+        pass
+    
+    def encode_appointment(self, appointment: Appointment) -> bytes:
+        """Encode one appointment"""
+        return self.encode_appointments([appointment])
+    
+    def decode_appointment(self, data) -> Appointment:
+        """Decode one appointment"""
+        return self.decode_appointments(data)[0]
+
+class JsonCodec(CacheCodec):
+    """
+    JSON codec (Appointment.to_dict / from_dict)
+    Readable with redis-cli, but large and slow to decode
+    """
+    
+    def encode_appointments(self, appointments: List[Appointment]) -> bytes:
+        return json.dumps([apt.to_dict() for apt in appointments]).encode()
+    
+    def decode_appointments(self, data) -> List[Appointment]:
+        decoded = json.loads(data)
+        if isinstance(decoded, dict):  # single entries written by older versions
+            decoded = [decoded]
+        return [Appointment.from_dict(item) for item in decoded]
+
+# Binary layout, little-endian:
+#   header   magic (2s) | version (B) | row count (I) | string count (I)
+#   strings  per entry: kind (B) then 16 UUID bytes, or length (I) + UTF-8
+#   columns  one packed array per field, in _COLUMNS order
+# String fields hold indexes into the deduplicated string table
+# (_NULL_INDEX for None); dates are days since 1970-01-01, times are
+# seconds since midnight and datetimes are microseconds since the epoch.
+_MAGIC = b"AP"
+_VERSION = 1
+_HEADER = struct.Struct("<2sBII")
+_STRING_UUID = 0
+_STRING_TEXT = 1
+_NULL_INDEX = 0xFFFFFFFF
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_NAIVE_EPOCH = datetime(1970, 1, 1)
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+_STATUSES = list(AppointmentStatus)
+_STATUS_CODES = {status: code for code, status in enumerate(_STATUSES)}
+
+# Row flags
+_CREATED_AWARE = 1
+_UPDATED_AWARE = 2
+_CANCELLED_SET = 4
+_CANCELLED_AWARE = 8
+
+_STRING_COLUMNS = (
+    'id', 'patient_id', 'doctor_id', 'reason', 'notes',
+    'cancellation_reason', 'series_id'
+)
+# (name, struct format code) of every column, in blob order
+_COLUMNS = tuple((name, "I") for name in _STRING_COLUMNS) + (
+    ('appointment_date', "i"),
+    ('start_time', "I"),
+    ('end_time', "I"),
+    ('status', "B"),
+    ('flags', "B"),
+    ('created_at', "q"),
+    ('updated_at', "q"),
+    ('cancelled_at', "q"),
+)
+
+def _seconds_of_day(value: time) -> int:
+    return value.hour * 3600 + value.minute * 60 + value.second
+
+def _time_of_seconds(seconds: int) -> time:
+    return time(seconds // 3600, seconds // 60 % 60, seconds % 60)
+
+def _micros(value: datetime) -> int:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return (value - _EPOCH) // timedelta(microseconds=1)
+
+def _datetime(micros: int, aware: bool) -> datetime:
+    return (_EPOCH if aware else _NAIVE_EPOCH) + timedelta(microseconds=micros)
+
+def _uuid_text(raw: bytes) -> str:
+    # Same text as str(uuid.UUID(bytes=raw)) without building a UUID
+    h = raw.hex()
+    return f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
+
+class BinaryCodec(CacheCodec):
+    """
+    Compact columnar codec
+    Demonstrates: Struct-packed columns, dictionary-encoded strings
+    
+    A whole list is one blob with one packed array per field, so decoding
+    is a handful of struct.unpack_from calls plus integer arithmetic - no
+    isoformat parsing and no invariant checks (entities are rebuilt with
+    Appointment.restore). Values that are not binary (entries written by
+    the JSON codec before a switch) are decoded as JSON; blobs of another
+    version raise ValueError, which CachedAppointmentRepository reloads
+    as a miss.
+    """
+    
+    _json = JsonCodec()
+    
+    def encode_appointments(self, appointments: List[Appointment]) -> bytes:
+        strings: Dict[str, int] = {}
+        
+        def index(value: Optional[str]) -> int:
+            if value is None:
+                return _NULL_INDEX
+            return strings.setdefault(value, len(strings))
+        
+        columns: Dict[str, list] = {name: [] for name, _ in _COLUMNS}
+        for apt in appointments:
+            columns['id'].append(index(str(apt.id)))
+            columns['patient_id'].append(index(str(apt.patient_id)))
+            columns['doctor_id'].append(index(str(apt.doctor_id)))
+            columns['reason'].append(index(apt.reason))
+            columns['notes'].append(index(apt.notes))
+            columns['cancellation_reason'].append(index(apt.cancellation_reason))
+            columns['series_id'].append(index(apt.series_id))
+            columns['appointment_date'].append(apt.appointment_date.toordinal() - _EPOCH_ORDINAL)
+            columns['start_time'].append(_seconds_of_day(apt.time_slot.start_time))
+            columns['end_time'].append(_seconds_of_day(apt.time_slot.end_time))
+            columns['status'].append(_STATUS_CODES[apt.status])
+            
+            flags = 0
+            if apt.created_at.tzinfo is not None:
+                flags |= _CREATED_AWARE
+            if apt.updated_at.tzinfo is not None:
+                flags |= _UPDATED_AWARE
+            if apt.cancelled_at is not None:
+                flags |= _CANCELLED_SET
+                if apt.cancelled_at.tzinfo is not None:
+                    flags |= _CANCELLED_AWARE
+            columns['flags'].append(flags)
+            columns['created_at'].append(_micros(apt.created_at))
+            columns['updated_at'].append(_micros(apt.updated_at))
+            columns['cancelled_at'].append(
+                _micros(apt.cancelled_at) if apt.cancelled_at is not None else 0
+            )
+        
+        parts = [_HEADER.pack(_MAGIC, _VERSION, len(appointments), len(strings))]
+        for value in strings:
+            try:
+                parsed = uuid.UUID(value)
+            except ValueError:
+                parsed = None
+            if parsed is not None and str(parsed) == value:
+                parts.append(struct.pack("<B16s", _STRING_UUID, parsed.bytes))
+            else:
+                encoded = value.encode()
+                parts.append(struct.pack(f"<BI{len(encoded)}s", _STRING_TEXT, len(encoded), encoded))
+        
+        count = len(appointments)
+        for name, code in _COLUMNS:
+            parts.append(struct.pack(f"<{count}{code}", *columns[name]))
+        
+        return b"".join(parts)
+    
+    def decode_appointments(self, data) -> List[Appointment]:
+        data = bytes(data)
+        if not data.startswith(_MAGIC):
+            return self._json.decode_appointments(data)
+        
+        _, version, count, string_count = _HEADER.unpack_from(data, 0)
+        if version != _VERSION:
+            raise ValueError(f"Unsupported cache entry version: {version}")
+        offset = _HEADER.size
+        
+        strings = []
+        for _ in range(string_count):
+            kind = data[offset]
+            if kind == _STRING_UUID:
+                strings.append(_uuid_text(data[offset + 1:offset + 17]))
+                offset += 17
+            else:
+                (length,) = struct.unpack_from("<I", data, offset + 1)
+                strings.append(data[offset + 5:offset + 5 + length].decode())
+                offset += 5 + length
+        
+        columns = {}
+        for name, code in _COLUMNS:
+            column_format = f"<{count}{code}"
+            columns[name] = struct.unpack_from(column_format, data, offset)
+            offset += struct.calcsize(column_format)
+        
+        # string index -> value, None for _NULL_INDEX
+        text = dict(enumerate(strings))
+        text[_NULL_INDEX] = None
+        
+        # Dates, times and ids repeat across rows (one doctor, one day):
+        # build each distinct value once and share the immutable object
+        dates = {
+            days: date.fromordinal(days + _EPOCH_ORDINAL)
+            for days in set(columns['appointment_date'])
+        }
+        times = {
+            seconds: _time_of_seconds(seconds)
+            for seconds in set(columns['start_time'] + columns['end_time'])
+        }
+        patient_ids = {index: PatientId.restore(strings[index]) for index in set(columns['patient_id'])}
+        doctor_ids = {index: DoctorId.restore(strings[index]) for index in set(columns['doctor_id'])}
+        
+        appointments = []
+        for (
+            id_index, patient_index, doctor_index, reason, notes,
+            cancellation_reason, series_id, days, start, end, status, flags,
+            created_at, updated_at, cancelled_at
+        ) in zip(*(columns[name] for name, _ in _COLUMNS)):
+            appointments.append(Appointment.restore(
+                id=AppointmentId.restore(text[id_index]),
+                patient_id=patient_ids[patient_index],
+                doctor_id=doctor_ids[doctor_index],
+                appointment_date=dates[days],
+                time_slot=TimeSlot.restore(times[start], times[end]),
+                status=_STATUSES[status],
+                reason=text[reason],
+                notes=text[notes],
+                created_at=_datetime(created_at, flags & _CREATED_AWARE),
+                updated_at=_datetime(updated_at, flags & _UPDATED_AWARE),
+                cancelled_at=(
+                    _datetime(cancelled_at, flags & _CANCELLED_AWARE)
+                    if flags & _CANCELLED_SET else None
+                ),
+                cancellation_reason=text[cancellation_reason],
+                series_id=text[series_id]
+            ))
+        return appointments
+
+CACHE_CODECS: Dict[str, Type[CacheCodec]] = {
+    "json": JsonCodec,
+    "binary": BinaryCodec
+}
+
+def create_codec(name: str) -> CacheCodec:
+    """Build the codec selected by configuration"""
+    try:
+        return CACHE_CODECS[(name or "binary").lower()]()
+    except KeyError:
+        raise ValueError(f"Unknown cache codec: {name}")
@@ -1,59 +1,609 @@
 # Database Connection Management
 # Demonstrates: Connection Pooling, Resource Management
 
+import asyncio
 import asyncpg
 import os
 import logging
-from typing import Optional
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from time import monotonic, perf_counter
+from typing import AsyncIterator, Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from infrastructure.metrics import (
+    record_pool_acquire,
+    record_pool_release,
+    record_pool_wait,
+    record_read_route,
+    record_replica_health,
+    record_statement,
+    record_statement_prepare
+)
 
 logger = logging.getLogger(__name__)
 
+@dataclass(frozen=True)
+class NamedQuery:
+    """
+    A registered SQL statement with a stable name (the metrics label)
+    read_only marks statements a replica can run, and so prepare
+    """
+    name: str
+    sql: str
+    read_only: bool = False
+
+class QueryRegistry:
+    """
+    Registry of hot statements
+    Demonstrates: Prepared statements - every registered statement is
+    prepared once per pooled connection, when the connection is opened,
+    so requests never pay for parsing and planning it
+    """
+    
+    def __init__(self):
+        self._queries: Dict[str, NamedQuery] = {}
+    
+    def register(self, name: str, sql: str, read_only: bool = False) -> NamedQuery:
+        """
+        Register a statement under a unique name
+        read_only must be set explicitly for statements that never write
+        (whatever their SQL starts with, e.g. WITH ... SELECT)
+        """
+        query = NamedQuery(name, sql, read_only)
+        existing = self._queries.get(name)
+        if existing is not None and existing != query:
+            raise ValueError(f"Query already registered with a different statement: {name}")
+        self._queries[name] = query
+        return query
+    
+    def __iter__(self) -> Iterator[NamedQuery]:
+        return iter(list(self._queries.values()))
+    
+    def __len__(self) -> int:
+        return len(self._queries)
+
+# Statements registered by the repositories at import time
+QUERIES = QueryRegistry()
+
+class PreparedConnection(asyncpg.Connection):
+    """
+    Pool connection holding the registry's prepared statements
+    Demonstrates: asyncpg connection_class extension point
+    
+    Statements that could not be prepared up front (or were registered
+    later) are prepared on first use.
+    """
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._prepared: Dict[str, "asyncpg.prepared_stmt.PreparedStatement"] = {}
+    
+    async def prepare_registered(self, registry: QueryRegistry, read_only: bool = False) -> None:
+        """
+        Prepare every registered statement on this connection
+        With read_only=True (replica connections) only read-only
+        statements are prepared
+        """
+        for query in registry:
+            if read_only and not query.read_only:
+                continue
+            try:
+                await self._statement(query)
+            except Exception as e:
+                logger.warning(f"Could not prepare {query.name}: {e}")
+    
+    async def _statement(self, query: NamedQuery):
+        statement = self._prepared.get(query.name)
+        if statement is None:
+            statement = await self.prepare(query.sql)
+            self._prepared[query.name] = statement
+            record_statement_prepare(query.name)
+        return statement
+    
+    async def fetch_named(self, query: NamedQuery, *args):
+        """Fetch multiple rows with a registered statement"""
+        statement = await self._statement(query)
+        started = perf_counter()
+        try:
+            return await statement.fetch(*args)
+        finally:
+            record_statement(query.name, perf_counter() - started)
+    
+    async def fetchrow_named(self, query: NamedQuery, *args):
+        """Fetch a single row with a registered statement"""
+        statement = await self._statement(query)
+        started = perf_counter()
+        try:
+            return await statement.fetchrow(*args)
+        finally:
+            record_statement(query.name, perf_counter() - started)
+    
+    async def fetchval_named(self, query: NamedQuery, *args):
+        """Fetch a single value with a registered statement"""
+        statement = await self._statement(query)
+        started = perf_counter()
+        try:
+            return await statement.fetchval(*args)
+        finally:
+            record_statement(query.name, perf_counter() - started)
+
+class _Replica:
+    """
+    One read replica: its pool and what the router needs to know about it
+    outstanding counts connections checked out of this pool right now
+    """
+    
+    __slots__ = ('name', 'url', 'pool', 'healthy', 'outstanding')
+    
+    def __init__(self, name: str, url: str):
+        self.name = name
+        self.url = url
+        self.pool: Optional[asyncpg.Pool] = None
+        self.healthy = False
+        self.outstanding = 0
+
+class _RequestScope:
+    """The connections shared by everything one request task runs"""
+    
+    __slots__ = ('task', 'connection', 'replica', 'replica_connection')
+    
+    def __init__(self, task: Optional[asyncio.Task]):
+        self.task = task
+        # Primary connection: every write, and every read after a write
+        self.connection: Optional[PreparedConnection] = None
+        # Replica connection for reads issued before the first write
+        self.replica: Optional[_Replica] = None
+        self.replica_connection: Optional[PreparedConnection] = None
+
+_REQUEST_SCOPE: ContextVar[Optional[_RequestScope]] = ContextVar(
+    "database_request_scope", default=None
+)
+
+class _ConnectionContext:
+    """
+    async with database.acquire() as connection
+    Inside a request scope, and in the task that opened it, this is the
+    scope's connection (checked out on first use, released with the
+    scope); anywhere else it is a pool checkout for the block.
+    
+    Read-only acquires may be routed to a replica (see Database.acquire).
+    Once the request holds a primary connection its reads stay there, so
+    a request always reads its own writes.
+    """
+    
+    __slots__ = ('_database', '_scoped', '_read_only', '_keys', '_connection', '_replica')
+    
+    def __init__(
+        self,
+        database: 'Database',
+        scoped: bool,
+        read_only: bool,
+        keys: Sequence[str]
+    ):
+        self._database = database
+        self._scoped = scoped
+        self._read_only = read_only
+        self._keys = keys
+        self._connection: Optional[PreparedConnection] = None
+        self._replica: Optional[_Replica] = None
+    
+    async def __aenter__(self) -> PreparedConnection:
+        database = self._database
+        scope = _REQUEST_SCOPE.get() if self._scoped else None
+        # Tasks spawned by the request (event handlers, cache refreshes,
+        # streamed responses) inherit the context but not the connection:
+        # an asyncpg connection runs one operation at a time
+        if scope is not None and scope.task is asyncio.current_task():
+            if scope.connection is not None:
+                return scope.connection
+            if self._read_only and scope.replica_connection is not None \
+                    and not database._pinned(self._keys):
+                return scope.replica_connection
+            connection, replica = await database._checkout_routed(self._read_only, self._keys)
+            if replica is None:
+                scope.connection = connection
+            else:
+                scope.replica_connection, scope.replica = connection, replica
+            return connection
+        
+        self._connection, self._replica = await database._checkout_routed(
+            self._read_only, self._keys
+        )
+        return self._connection
+    
+    async def __aexit__(self, *exc_info):
+        if self._connection is not None:
+            connection, self._connection = self._connection, None
+            await self._database._release(connection, self._replica)
+
+# Replay lag of a standby in seconds: 0 when it has replayed everything
+# it received (an idle primary makes pg_last_xact_replay_timestamp() old
+# without the replica being behind) and for a server that is not a
+# standby at all, such as a second standalone instance in development
+REPLICA_LAG_QUERY = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END::float8
+"""
+
 class Database:
     """
     Database connection manager
-    Demonstrates: Single Responsibility (manages DB connections only)
+    Demonstrates: Single Responsibility (manages DB connections only),
+    Read/write splitting across a primary and read replicas
+    
+    Writes always go to the primary pool. Read-only acquires go to the
+    healthy replica with the fewest outstanding checkouts, unless one of
+    their consistency keys was written within read_your_writes_seconds
+    (see mark_written) - then they read from the primary, which has the
+    write. Without replica_urls everything uses the primary.
     """
     
-    def __init__(self, connection_url: str):
+    def __init__(
+        self,
+        connection_url: str,
+        statement_cache_size: int = 100,
+        queries: QueryRegistry = QUERIES,
+        min_size: int = 5,
+        max_size: int = 20,
+        max_queries: int = 50000,
+        max_inactive_connection_lifetime: float = 300,
+        command_timeout: float = 60,
+        replica_urls: Sequence[str] = (),
+        read_your_writes_seconds: float = 5,
+        replica_max_lag_seconds: float = 10,
+        replica_check_interval: float = 5
+    ):
         self.connection_url = connection_url
+        # asyncpg's per-connection LRU of ad-hoc (unregistered) statements
+        self.statement_cache_size = statement_cache_size
+        self.queries = queries
+        self.min_size = min_size
+        self.max_size = max_size
+        self.max_queries = max_queries
+        self.max_inactive_connection_lifetime = max_inactive_connection_lifetime
+        self.command_timeout = command_timeout
+        self.read_your_writes_seconds = read_your_writes_seconds
+        self.replica_max_lag_seconds = replica_max_lag_seconds
+        self.replica_check_interval = replica_check_interval
         self.pool: Optional[asyncpg.Pool] = None
+        self._replicas: List[_Replica] = [
+            _Replica(f"replica{index}", url) for index, url in enumerate(replica_urls)
+        ]
+        self._rotation = 0
+        self._written: Dict[str, float] = {}  # consistency key -> pinned until (monotonic)
+        self._health_task: Optional[asyncio.Task] = None
+        self._listener_connection: Optional[asyncpg.Connection] = None
+    
+    @classmethod
+    def from_env(cls, connection_url: str) -> 'Database':
+        """Build with the pool settings from DB_* environment variables"""
+        replica_urls = os.getenv("DATABASE_REPLICA_URLS", "")
+        return cls(
+            connection_url,
+            statement_cache_size=int(os.getenv("DB_STATEMENT_CACHE_SIZE", "100")),
+            min_size=int(os.getenv("DB_POOL_MIN_SIZE", "5")),
+            max_size=int(os.getenv("DB_POOL_MAX_SIZE", "20")),
+            max_queries=int(os.getenv("DB_POOL_MAX_QUERIES", "50000")),
+            max_inactive_connection_lifetime=float(
+                os.getenv("DB_POOL_MAX_INACTIVE_SECONDS", "300")
+            ),
+            command_timeout=float(os.getenv("DB_COMMAND_TIMEOUT_SECONDS", "60")),
+            replica_urls=[url.strip() for url in replica_urls.split(",") if url.strip()],
+            read_your_writes_seconds=float(os.getenv("DB_READ_YOUR_WRITES_SECONDS", "5")),
+            replica_max_lag_seconds=float(os.getenv("DB_REPLICA_MAX_LAG_SECONDS", "10")),
+            replica_check_interval=float(os.getenv("DB_REPLICA_CHECK_INTERVAL_SECONDS", "5"))
+        )
     
     async def connect(self):
         """
         Create connection pool
         Demonstrates: Resource initialization
+        
+        A replica that cannot be reached does not stop startup: it stays
+        out of rotation and the health check keeps retrying it.
         """
         try:
-            self.pool = await asyncpg.create_pool(
-                self.connection_url,
-                min_size=5,
-                max_size=20,
-                max_queries=50000,
-                max_inactive_connection_lifetime=300,
-                command_timeout=60
+            self.pool = await self._create_pool(self.connection_url, self._init_connection)
+            logger.info(
+                f"Database connection pool created successfully "
+                f"(size {self.min_size}-{self.max_size}, "
+                f"{len(self.queries)} prepared statements per connection)"
             )
-            logger.info("Database connection pool created successfully")
         except Exception as e:
             logger.error(f"Failed to create database connection pool: {e}")
             raise
+        
+        if self._replicas:
+            await asyncio.gather(*(self._check_replica(replica) for replica in self._replicas))
+            self._health_task = asyncio.create_task(self._monitor_replicas())
+            logger.info(
+                f"Read replicas: {sum(r.healthy for r in self._replicas)} of "
+                f"{len(self._replicas)} healthy"
+            )
+    
+    async def _create_pool(self, url: str, init) -> asyncpg.Pool:
+        """One pool with the configured settings"""
+        return await asyncpg.create_pool(
+            url,
+            min_size=self.min_size,
+            max_size=self.max_size,
+            max_queries=self.max_queries,
+            max_inactive_connection_lifetime=self.max_inactive_connection_lifetime,
+            command_timeout=self.command_timeout,
+            statement_cache_size=self.statement_cache_size,
+            connection_class=PreparedConnection,
+            init=init
+        )
+    
+    async def _init_connection(self, connection: PreparedConnection):
+        """Pool init hook: runs once for every new connection"""
+        await connection.prepare_registered(self.queries)
+    
+    async def _init_replica_connection(self, connection: PreparedConnection):
+        """Replica pool init hook: a standby can only prepare reads"""
+        await connection.prepare_registered(self.queries, read_only=True)
+    
+    async def warm_up(self, size: Optional[int] = None) -> None:
+        """
+        Open size connections (default min_size) and prepare their statements
+        Demonstrates: Warm-up - the first requests after a deploy find
+        ready connections instead of paying for connect + prepare
+        
+        Healthy replica pools are warmed the same way.
+        """
+        size = min(self.min_size if size is None else size, self.max_size)
+        if size <= 0:
+            return
+        started = perf_counter()
+        await asyncio.gather(
+            self._warm_up_pool(None, size),
+            *(self._warm_up_pool(r, size) for r in self._replicas if r.healthy)
+        )
+        logger.info(
+            f"Database pool warmed up: {size} connections "
+            f"in {perf_counter() - started:.2f}s"
+        )
+    
+    async def _warm_up_pool(self, replica: Optional[_Replica], size: int) -> None:
+        connections = await asyncio.gather(
+            *(self._checkout(replica) for _ in range(size)), return_exceptions=True
+        )
+        
+        for connection in connections:
+            if isinstance(connection, BaseException):
+                logger.warning(f"Database warm-up connection failed: {connection}")
+                continue
+            try:
+                await connection.prepare_registered(self.queries, read_only=replica is not None)
+            finally:
+                await self._release(connection, replica)
     
     async def disconnect(self):
         """
         Close connection pool
         Demonstrates: Resource cleanup
         """
+        if self._health_task:
+            self._health_task.cancel()
+            self._health_task = None
+        
+        if self._listener_connection:
+            await self._listener_connection.close()
+            self._listener_connection = None
+        
+        for replica in self._replicas:
+            replica.healthy = False
+            if replica.pool:
+                await replica.pool.close()
+                replica.pool = None
+        
         if self.pool:
             await self.pool.close()
             logger.info("Database connection pool closed")
     
-    def acquire(self):
+    async def _monitor_replicas(self):
+        """Background task: re-check every replica periodically"""
+        while True:
+            await asyncio.sleep(self.replica_check_interval)
+            await asyncio.gather(*(self._check_replica(replica) for replica in self._replicas))
+    
+    async def _check_replica(self, replica: _Replica) -> None:
+        """
+        Health check: reachable and at most replica_max_lag_seconds behind
+        Opens the replica's pool first if it does not exist yet
+        """
+        timeout = self.replica_check_interval
+        lag = None
+        try:
+            if replica.pool is None:
+                replica.pool = await asyncio.wait_for(
+                    self._create_pool(replica.url, self._init_replica_connection),
+                    timeout
+                )
+            async with replica.pool.acquire(timeout=timeout) as connection:
+                lag = await connection.fetchval(REPLICA_LAG_QUERY, timeout=timeout)
+            healthy = lag <= self.replica_max_lag_seconds
+        except Exception as e:
+            if replica.healthy:
+                logger.warning(f"Database {replica.name} failed its health check: {e}")
+            healthy = False
+        
+        if healthy != replica.healthy:
+            if healthy:
+                logger.info(f"Database {replica.name} back in rotation")
+            elif lag is not None:
+                logger.warning(f"Database {replica.name} is {lag:.1f}s behind, out of rotation")
+        replica.healthy = healthy
+        record_replica_health(replica.name, healthy, lag)
+    
+    async def listen(self, channel: str, callback: Callable[[str], None]):
+        """
+        Subscribe to a PostgreSQL LISTEN/NOTIFY channel
+        Uses one dedicated connection so pooled connections stay free
+        """
+        if self._listener_connection is None:
+            self._listener_connection = await asyncpg.connect(self.connection_url)
+            self._listener_connection.add_termination_listener(
+                lambda connection: logger.warning("Database listener connection closed")
+            )
+        
+        def _on_notification(connection, pid, notified_channel, payload):
+            try:
+                callback(payload)
+            except Exception as e:
+                logger.error(f"Error handling notification on {notified_channel}: {e}")
+        
+        await self._listener_connection.add_listener(channel, _on_notification)
+        logger.info(f"Listening on database channel: {channel}")
+    
+    def acquire(
+        self,
+        scoped: bool = True,
+        read_only: bool = False,
+        keys: Sequence[str] = ()
+    ) -> _ConnectionContext:
         """
         Acquire a connection from the pool
         Used with async context manager
+        
+        Inside request_scope() every acquire of the request task gets the
+        same connection; pass scoped=False for work that must not hold
+        it (or outlives the request), such as streaming exports.
+        
+        read_only=True marks work that may run on a replica. keys are the
+        consistency keys it reads (e.g. "patient:<id>"): if any of them
+        was passed to mark_written recently the read uses the primary.
         """
-        if not self.pool:
+        return _ConnectionContext(self, scoped, read_only, keys)
+    
+    def mark_written(self, keys: Iterable[str]) -> None:
+        """
+        Pin reads of keys to the primary for read_your_writes_seconds
+        Demonstrates: Read-your-writes consistency over asynchronous
+        replication - call after committing a write
+        
+        The window is per process; it should exceed typical replica lag.
+        """
+        if not self._replicas:
+            return
+        until = monotonic() + self.read_your_writes_seconds
+        written = self._written
+        for key in keys:
+            written[key] = until
+        if len(written) > 10000:
+            now = monotonic()
+            self._written = {key: t for key, t in written.items() if t > now}
+    
+    def _pinned(self, keys: Sequence[str]) -> bool:
+        """Check if any key was written within the read-your-writes window"""
+        if not keys or not self._written:
+            return False
+        now = monotonic()
+        written = self._written
+        return any(written.get(key, 0) > now for key in keys)
+    
+    def _route(self, read_only: bool, keys: Sequence[str]) -> Optional[_Replica]:
+        """
+        Pick the replica for an acquire, None for the primary
+        Least outstanding checkouts wins; ties rotate between replicas
+        """
+        if not read_only or not self._replicas:
+            return None
+        if self._pinned(keys):
+            record_read_route("sticky")
+            return None
+        
+        replicas = self._replicas
+        count = len(replicas)
+        self._rotation = (self._rotation + 1) % count
+        best = None
+        for step in range(count):
+            replica = replicas[(self._rotation + step) % count]
+            if replica.healthy and (best is None or replica.outstanding < best.outstanding):
+                best = replica
+        
+        record_read_route("primary" if best is None else "replica")
+        return best
+    
+    async def _checkout_routed(self, read_only: bool, keys: Sequence[str]):
+        """
+        Checkout from wherever _route sends the acquire
+        Returns (connection, replica) - replica is None for the primary.
+        A replica that fails the checkout is taken out of rotation and
+        the primary serves the read.
+        """
+        replica = self._route(read_only, keys)
+        if replica is not None:
+            try:
+                return await self._checkout(replica), replica
+            except Exception as e:
+                logger.warning(f"Database {replica.name} unavailable, using primary: {e}")
+                replica.healthy = False
+                record_replica_health(replica.name, False, None)
+        return await self._checkout(), None
+    
+    @asynccontextmanager
+    async def request_scope(self) -> AsyncIterator[None]:
+        """
+        Share one pooled connection across a request
+        Demonstrates: Unit of work connection - a request issuing ten
+        statements checks the pool out once, and only if it queries
+        
+        A request that reads before it writes may also hold one replica
+        connection for those reads.
+        """
+        scope = _RequestScope(asyncio.current_task())
+        token = _REQUEST_SCOPE.set(scope)
+        try:
+            yield
+        finally:
+            _REQUEST_SCOPE.reset(token)
+            if scope.replica_connection is not None:
+                await self._release(scope.replica_connection, scope.replica)
+            if scope.connection is not None:
+                await self._release(scope.connection)
+    
+    async def _checkout(self, replica: Optional[_Replica] = None) -> PreparedConnection:
+        """Take a connection from the primary (or a replica) pool, recording wait time"""
+        pool = self.pool if replica is None else replica.pool
+        if not pool:
             raise RuntimeError("Database pool not initialized. Call connect() first.")
-        return self.pool.acquire()
+        name = "primary" if replica is None else replica.name
+        
+        record_pool_wait(1, name)
+        if replica is not None:
+            replica.outstanding += 1
+        started = perf_counter()
+        try:
+            connection = await pool.acquire()
+        except BaseException:
+            if replica is not None:
+                replica.outstanding -= 1
+            raise
+        finally:
+            record_pool_wait(-1, name)
+        record_pool_acquire(perf_counter() - started, pool.get_size(), name)
+        return connection
+    
+    async def _release(
+        self,
+        connection: PreparedConnection,
+        replica: Optional[_Replica] = None
+    ) -> None:
+        """Return a connection to the pool it came from"""
+        if replica is None:
+            pool, name = self.pool, "primary"
+        else:
+            pool, name = replica.pool, replica.name
+            replica.outstanding -= 1
+        try:
+            await pool.release(connection)
+        finally:
+            record_pool_release(name)
     
     async def execute(self, query: str, *args):
         """
@@ -62,25 +612,25 @@ class Database:
         async with self.acquire() as connection:
             return await connection.execute(query, *args)
     
-    async def fetch(self, query: str, *args):
+    async def fetch(self, query: str, *args, read_only: bool = False):
         """
         Fetch multiple rows
         """
-        async with self.acquire() as connection:
+        async with self.acquire(read_only=read_only) as connection:
             return await connection.fetch(query, *args)
     
-    async def fetchrow(self, query: str, *args):
+    async def fetchrow(self, query: str, *args, read_only: bool = False):
         """
         Fetch a single row
         """
-        async with self.acquire() as connection:
+        async with self.acquire(read_only=read_only) as connection:
             return await connection.fetchrow(query, *args)
     
-    async def fetchval(self, query: str, *args):
+    async def fetchval(self, query: str, *args, read_only: bool = False):
         """
         Fetch a single value
         """
-        async with self.acquire() as connection:
+        async with self.acquire(read_only=read_only) as connection:
             return await connection.fetchval(query, *args)
     
     async def fetch_all(self, query: str, args: list = None):
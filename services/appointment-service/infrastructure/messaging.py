@@ -4,12 +4,15 @@
 import json
 import asyncio
 import aiohttp
-from typing import Dict, Any, List, Callable
-from datetime import datetime
+from typing import Dict, Any, List, Callable, Optional, Tuple
+from datetime import date, datetime, time, timezone
 import logging
 from abc import ABC, abstractmethod
 from enum import Enum
 
+from domain.entities import TimeSlot
+from application.use_cases import AppointmentRollupDelta, DoctorStatsDelta
+
 logger = logging.getLogger(__name__)
 
 class EventType(Enum):
@@ -23,6 +26,8 @@ class EventType(Enum):
     APPOINTMENT_CONFIRMED = "appointment.confirmed"
     APPOINTMENT_COMPLETED = "appointment.completed"
     APPOINTMENT_RESCHEDULED = "appointment.rescheduled"
+    APPOINTMENT_SERIES_CREATED = "appointment.series_created"
+    APPOINTMENTS_BULK_CREATED = "appointment.bulk_created"
     PATIENT_REGISTERED = "patient.registered"
     NOTIFICATION_SENT = "notification.sent"
     REMINDER_SCHEDULED = "reminder.scheduled"
@@ -267,6 +272,230 @@ class NotificationEventHandler(IEventHandler):
             message="Your appointment has been confirmed"
         )
 
+class OccupancyEventHandler(IEventHandler):
+    """
+    Handler keeping materialized availability bitmaps up to date
+    Demonstrates: Incremental view maintenance driven by domain events
+    
+    Subscribed to every event that can change an appointment's slot or
+    status: a slot is occupied while its appointment is scheduled or
+    confirmed, so completing, cancelling or marking a no-show (an
+    update) frees it, and confirming keeps it.
+    """
+    
+    ACTIVE_STATUSES = ("scheduled", "confirmed")
+    
+    EVENT_TYPES = (
+        EventType.APPOINTMENT_CREATED,
+        EventType.APPOINTMENT_SERIES_CREATED,
+        EventType.APPOINTMENTS_BULK_CREATED,
+        EventType.APPOINTMENT_UPDATED,
+        EventType.APPOINTMENT_CANCELLED,
+        EventType.APPOINTMENT_CONFIRMED,
+        EventType.APPOINTMENT_COMPLETED
+    )
+    
+    def __init__(self, occupancy_cache):
+        self.occupancy_cache = occupancy_cache
+    
+    async def handle(self, event: Event) -> None:
+        """Flip the minutes touched by the event"""
+        bookings = []
+        for doctor_id, previous, current in appointment_transitions(event):
+            if previous is None:
+                if current['status'] in self.ACTIVE_STATUSES:
+                    bookings.append((
+                        doctor_id,
+                        date.fromisoformat(current['appointment_date']),
+                        self._time_slot(current)
+                    ))
+                continue
+            
+            was_active = previous['status'] in self.ACTIVE_STATUSES
+            is_active = current['status'] in self.ACTIVE_STATUSES
+            if was_active and is_active and self._same_slot(previous, current):
+                continue
+            if was_active:
+                await self._release(doctor_id, previous)
+            if is_active:
+                await self._book(doctor_id, current)
+        
+        if bookings:
+            # Every new booking in one round trip
+            await self.occupancy_cache.book_many(bookings)
+    
+    def can_handle(self, event_type: EventType) -> bool:
+        """Check if this handler can handle the event"""
+        return event_type in self.EVENT_TYPES
+    
+    @staticmethod
+    def _same_slot(previous: Dict[str, Any], current: Dict[str, Any]) -> bool:
+        return all(
+            previous[name] == current[name]
+            for name in ('appointment_date', 'start_time', 'end_time')
+        )
+    
+    async def _book(self, doctor_id: str, slot: Dict[str, Any]):
+        await self.occupancy_cache.book(
+            doctor_id, date.fromisoformat(slot['appointment_date']), self._time_slot(slot)
+        )
+    
+    async def _release(self, doctor_id: str, slot: Dict[str, Any]):
+        await self.occupancy_cache.release(
+            doctor_id, date.fromisoformat(slot['appointment_date']), self._time_slot(slot)
+        )
+    
+    @staticmethod
+    def _time_slot(slot: Dict[str, Any]) -> TimeSlot:
+        return TimeSlot(
+            time.fromisoformat(slot['start_time']),
+            time.fromisoformat(slot['end_time'])
+        )
+
+def appointment_transitions(
+    event: Event
+) -> List[Tuple[str, Optional[Dict[str, Any]], Dict[str, Any]]]:
+    """
+    (doctor_id, before, after) of every appointment an event touched
+    Snapshots hold appointment_date, start_time, end_time and status as
+    ISO strings; before is None for new appointments. Events carrying no
+    snapshots yield nothing.
+    """
+    data = event.data
+    if event.event_type == EventType.APPOINTMENT_CREATED:
+        return [(data['doctor_id'], None, data)]
+    if event.event_type == EventType.APPOINTMENTS_BULK_CREATED:
+        return [(apt['doctor_id'], None, apt) for apt in data['appointments']]
+    if event.event_type == EventType.APPOINTMENT_SERIES_CREATED:
+        return [
+            (data['doctor_id'], None, {**data, 'appointment_date': appointment_date, 'status': 'scheduled'})
+            for appointment_date in data['appointment_dates']
+        ]
+    if 'previous' in data and 'current' in data:
+        return [(data['doctor_id'], data['previous'], data['current'])]
+    return []
+
+class DoctorStatsEventHandler(IEventHandler):
+    """
+    Handler keeping the doctor_stats summary up to date
+    Demonstrates: Incremental aggregate maintenance - each event adds a
+    small delta instead of statistics being recomputed on read
+    
+    A failed or lost delta is corrected by the periodic reconciliation
+    (see SummaryReconciler).
+    """
+    
+    EVENT_TYPES = (
+        EventType.APPOINTMENT_CREATED,
+        EventType.APPOINTMENT_SERIES_CREATED,
+        EventType.APPOINTMENTS_BULK_CREATED,
+        EventType.APPOINTMENT_UPDATED,
+        EventType.APPOINTMENT_CANCELLED,
+        EventType.APPOINTMENT_CONFIRMED,
+        EventType.APPOINTMENT_COMPLETED
+    )
+    
+    def __init__(self, stats_repository):
+        self.stats_repository = stats_repository
+    
+    async def handle(self, event: Event) -> None:
+        """Turn the event into one delta per doctor, applied together"""
+        data = event.data
+        deltas: Dict[str, DoctorStatsDelta] = {}
+        
+        for doctor_id, before, after in appointment_transitions(event):
+            if before == after:
+                continue
+            delta = deltas.get(doctor_id)
+            if delta is None:
+                delta = deltas[doctor_id] = DoctorStatsDelta(doctor_id)
+            if before is not None:
+                delta.count(
+                    before['status'],
+                    date.fromisoformat(before['appointment_date']),
+                    _slot_minutes(before),
+                    sign=-1
+                )
+            delta.count(
+                after['status'],
+                date.fromisoformat(after['appointment_date']),
+                _slot_minutes(after)
+            )
+            # Lead time of completed appointments (creation to completion)
+            if after['status'] == 'completed' and (before is None or before['status'] != 'completed'):
+                delta.completion_seconds += (
+                    _utc(data['updated_at']) - _utc(data['created_at'])
+                ).total_seconds()
+        
+        changed = [delta for delta in deltas.values() if delta]
+        if changed:
+            await self.stats_repository.apply(*changed)
+    
+    def can_handle(self, event_type: EventType) -> bool:
+        """Check if this handler can handle the event"""
+        return event_type in self.EVENT_TYPES
+
+class AppointmentRollupEventHandler(IEventHandler):
+    """
+    Handler keeping the daily appointment rollups up to date
+    Demonstrates: Incremental aggregate maintenance - a status change
+    moves one appointment between two rollup rows, a reschedule between
+    two days or hours
+    
+    Lost deltas are corrected by the periodic rebuild
+    (see SummaryReconciler).
+    """
+    
+    EVENT_TYPES = DoctorStatsEventHandler.EVENT_TYPES
+    
+    def __init__(self, rollup_repository):
+        self.rollup_repository = rollup_repository
+    
+    async def handle(self, event: Event) -> None:
+        """Turn the event into one delta over the touched rollup rows"""
+        delta = AppointmentRollupDelta()
+        
+        for doctor_id, before, after in appointment_transitions(event):
+            if before == after:
+                continue
+            if before is not None:
+                delta.count(doctor_id, *_rollup_cell(before), sign=-1)
+            delta.count(doctor_id, *_rollup_cell(after))
+        
+        if delta:
+            await self.rollup_repository.apply(delta)
+    
+    def can_handle(self, event_type: EventType) -> bool:
+        """Check if this handler can handle the event"""
+        return event_type in self.EVENT_TYPES
+
+def _rollup_cell(slot: Dict[str, Any]) -> Tuple[date, int, str, int]:
+    """(date, start hour, status, duration minutes) of a snapshot"""
+    return (
+        date.fromisoformat(slot['appointment_date']),
+        time.fromisoformat(slot['start_time']).hour,
+        slot['status'],
+        _slot_minutes(slot)
+    )
+
+def _utc(value: str) -> datetime:
+    """
+    Aware UTC datetime from an ISO string
+    Timestamps read back from the database are aware, the ones the
+    entity sets (datetime.utcnow) are naive UTC
+    """
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        return parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+def _slot_minutes(slot: Dict[str, Any]) -> int:
+    """Duration of a snapshot's time slot"""
+    return TimeSlot(
+        time.fromisoformat(slot['start_time']),
+        time.fromisoformat(slot['end_time'])
+    ).duration_minutes
+
 class AuditEventHandler(IEventHandler):
     """
     Handler for audit logging
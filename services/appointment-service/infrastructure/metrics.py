@@ -0,0 +1,125 @@
+# Service Metrics
+# Demonstrates: Observability with Prometheus counters
+
+from typing import Optional
+
+from prometheus_client import Counter, Gauge, Histogram
+
+# Cache lookups by tier ("local" in-process or "shared" Redis), key type
+# ("appointment", "doctor_appointments", ...) and result ("hit" or "miss")
+CACHE_REQUESTS = Counter(
+    "appointment_cache_requests_total",
+    "Appointment cache lookups",
+    ["tier", "key_type", "result"]
+)
+
+def record_cache_lookup(key_type: str, hit: bool, tier: str = "shared") -> None:
+    """Count one cache lookup"""
+    CACHE_REQUESTS.labels(
+        tier=tier, key_type=key_type, result="hit" if hit else "miss"
+    ).inc()
+
+# Cache behaviour: "coalesced" misses that joined a running load,
+# "early_refresh" reloads started before expiry, "stale_fill" loads
+# not stored because a write invalidated the key meanwhile and
+# "undecodable" entries reloaded as misses
+CACHE_EVENTS = Counter(
+    "appointment_cache_events_total",
+    "Appointment cache coalescing and refresh events",
+    ["event"]
+)
+
+def record_cache_event(event: str) -> None:
+    """Count one cache event"""
+    CACHE_EVENTS.labels(event=event).inc()
+
+# Execution time of registered (prepared) statements, by statement name
+DB_STATEMENT_SECONDS = Histogram(
+    "appointment_db_statement_seconds",
+    "Execution time of prepared database statements",
+    ["statement"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+)
+
+# Server-side prepares; once every connection is warm this stops growing
+DB_STATEMENT_PREPARES = Counter(
+    "appointment_db_statement_prepares_total",
+    "Prepared statements created on pooled connections",
+    ["statement"]
+)
+
+def record_statement(statement: str, seconds: float) -> None:
+    """Record one execution of a prepared statement"""
+    DB_STATEMENT_SECONDS.labels(statement=statement).observe(seconds)
+
+def record_statement_prepare(statement: str) -> None:
+    """Count one server-side prepare"""
+    DB_STATEMENT_PREPARES.labels(statement=statement).inc()
+
+# Connection pool saturation per pool ("primary", "replica0", ...): time
+# spent waiting for a connection, connections checked out, callers queued
+# and current pool size
+DB_POOL_ACQUIRE_SECONDS = Histogram(
+    "appointment_db_pool_acquire_seconds",
+    "Time spent waiting for a pooled database connection",
+    ["pool"],
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+)
+DB_POOL_IN_USE = Gauge(
+    "appointment_db_pool_in_use",
+    "Database connections checked out of the pool",
+    ["pool"]
+)
+DB_POOL_WAITING = Gauge(
+    "appointment_db_pool_waiting",
+    "Callers waiting for a database connection",
+    ["pool"]
+)
+DB_POOL_SIZE = Gauge(
+    "appointment_db_pool_size",
+    "Open database connections (idle or in use)",
+    ["pool"]
+)
+
+def record_pool_wait(delta: int, pool: str = "primary") -> None:
+    """A caller started (+1) or stopped (-1) waiting for a connection"""
+    DB_POOL_WAITING.labels(pool=pool).inc(delta)
+
+def record_pool_acquire(seconds: float, pool_size: int, pool: str = "primary") -> None:
+    """Record one checkout and how long it waited"""
+    DB_POOL_ACQUIRE_SECONDS.labels(pool=pool).observe(seconds)
+    DB_POOL_IN_USE.labels(pool=pool).inc()
+    DB_POOL_SIZE.labels(pool=pool).set(pool_size)
+
+def record_pool_release(pool: str = "primary") -> None:
+    """Record one connection returned to the pool"""
+    DB_POOL_IN_USE.labels(pool=pool).dec()
+
+# Read routing: where read-only acquires went ("replica", "primary" when
+# no replica is configured or healthy, "sticky" when a recent write to
+# the same key pinned the read to the primary)
+DB_READ_ROUTES = Counter(
+    "appointment_db_read_routes_total",
+    "Read-only connection acquires by destination",
+    ["route"]
+)
+DB_REPLICA_HEALTHY = Gauge(
+    "appointment_db_replica_healthy",
+    "1 while a read replica passes health checks",
+    ["pool"]
+)
+DB_REPLICA_LAG_SECONDS = Gauge(
+    "appointment_db_replica_lag_seconds",
+    "Replay lag of a read replica at its last health check",
+    ["pool"]
+)
+
+def record_read_route(route: str) -> None:
+    """Count one read-only acquire"""
+    DB_READ_ROUTES.labels(route=route).inc()
+
+def record_replica_health(pool: str, healthy: bool, lag: Optional[float]) -> None:
+    """Record the result of one replica health check"""
+    DB_REPLICA_HEALTHY.labels(pool=pool).set(1 if healthy else 0)
+    if lag is not None:
+        DB_REPLICA_LAG_SECONDS.labels(pool=pool).set(lag)
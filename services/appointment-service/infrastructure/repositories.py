@@ -2,9 +2,15 @@
 # Demonstrates: Repository Pattern, Dependency Inversion, Data Access Layer
 
 import asyncpg
+import base64
+import copy
 import json
-from typing import List, Optional, Dict, Any
+import math
+import random
+import uuid
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
 from datetime import date, time, datetime
+from time import perf_counter
 import logging
 
 from domain.entities import (
@@ -13,12 +19,390 @@ from domain.entities import (
     AppointmentId,
     PatientId,
     DoctorId,
-    TimeSlot
+    AppointmentSeries,
+    SlotUnavailableError
+)
+from infrastructure.cache import CACHE_INVALIDATION_CHANNEL, LocalCache, SingleFlight
+from infrastructure.cache_codec import BinaryCodec, CacheCodec
+from infrastructure.database import QUERIES
+from infrastructure.metrics import record_cache_event, record_cache_lookup
+from infrastructure.row_mapping import AppointmentRowView, appointment_from_row
+from application.use_cases import (
+    AppointmentPage,
+    AppointmentRollupDelta,
+    DoctorStatsDelta,
+    IAppointmentRepository,
+    IAppointmentRollupRepository,
+    IDoctorRepository,
+    IDoctorStatsRepository
 )
-from application.use_cases import IAppointmentRepository
 
 logger = logging.getLogger(__name__)
 
+# Columns included in appointment exports (see stream_rows)
+EXPORT_COLUMNS = (
+    'id', 'patient_id', 'doctor_id', 'appointment_date',
+    'start_time', 'end_time', 'duration_minutes', 'status',
+    'reason', 'notes', 'created_at', 'updated_at',
+    'cancelled_at', 'cancellation_reason'
+)
+
+# Read-your-writes consistency keys (see Database.mark_written): writes
+# mark the appointment, its patient and its doctor; reads name the keys
+# they depend on. Unfiltered listings name none and may lag by up to
+# DB_REPLICA_MAX_LAG_SECONDS.
+def _written_keys(appointment_id, patient_id, doctor_id) -> Tuple[str, ...]:
+    return (
+        f"appointment:{appointment_id}",
+        f"patient:{patient_id}",
+        f"doctor:{doctor_id}"
+    )
+
+def _filter_keys(filters: Dict[str, Any]) -> Tuple[str, ...]:
+    keys = []
+    if filters.get('patient_id'):
+        keys.append(f"patient:{filters['patient_id']}")
+    if filters.get('doctor_id'):
+        keys.append(f"doctor:{filters['doctor_id']}")
+    return tuple(keys)
+
+# Hot statements, prepared on every pooled connection (see QueryRegistry).
+# Dynamic filters (find_page, ranges, exports) build their SQL from a
+# fixed set of shapes instead and rely on asyncpg's statement cache.
+INSERT_APPOINTMENT = QUERIES.register("appointments.insert", """
+    INSERT INTO appointments (
+        id, patient_id, doctor_id, 
+        appointment_date, appointment_time, start_time, end_time,
+        duration_minutes, status, reason, notes,
+        created_at, updated_at
+    ) VALUES (
+        $1, $2, $3, $4, $5, $6, $7,
+        EXTRACT(EPOCH FROM $7::time - $6::time)::int / 60,
+        $8, $9, $10, $11, $12
+    )
+    RETURNING *
+""")
+
+FIND_APPOINTMENT_BY_ID = QUERIES.register("appointments.find_by_id", """
+    SELECT * FROM appointments WHERE id = $1
+""", read_only=True)
+
+FIND_APPOINTMENTS_BY_PATIENT = QUERIES.register("appointments.find_by_patient", """
+    SELECT * FROM appointments 
+    WHERE patient_id = $1
+    ORDER BY appointment_date, start_time
+""", read_only=True)
+
+FIND_APPOINTMENTS_BY_DOCTOR_AND_DATE = QUERIES.register("appointments.find_by_doctor_and_date", """
+    SELECT * FROM appointments 
+    WHERE doctor_id = $1 AND appointment_date = $2
+    ORDER BY start_time
+""", read_only=True)
+
+FIND_BOOKED_INTERVALS = QUERIES.register("appointments.booked_intervals", """
+    SELECT appointment_date, start_time, end_time FROM appointments
+    WHERE doctor_id = $1
+        AND appointment_date BETWEEN $2 AND $3
+        AND status IN ('scheduled', 'confirmed')
+""", read_only=True)
+
+FIND_BOOKED_INTERVALS_FOR_DOCTORS = QUERIES.register("appointments.booked_intervals_for_doctors", """
+    SELECT doctor_id, appointment_date, start_time, end_time FROM appointments
+    WHERE doctor_id = ANY($1::uuid[])
+        AND appointment_date BETWEEN $2 AND $3
+        AND status IN ('scheduled', 'confirmed')
+""", read_only=True)
+
+UPDATE_APPOINTMENT = QUERIES.register("appointments.update", """
+    UPDATE appointments SET
+        patient_id = $2,
+        doctor_id = $3,
+        appointment_date = $4,
+        appointment_time = $5,
+        start_time = $6,
+        end_time = $7,
+        duration_minutes = EXTRACT(EPOCH FROM $7::time - $6::time)::int / 60,
+        status = $8,
+        reason = $9,
+        notes = $10,
+        updated_at = $11,
+        cancelled_at = $12,
+        cancellation_reason = $13
+    WHERE id = $1
+    RETURNING *
+""")
+
+DELETE_APPOINTMENT = QUERIES.register("appointments.delete", """
+    UPDATE appointments 
+    SET status = 'cancelled', 
+        cancelled_at = $2,
+        cancellation_reason = 'Deleted',
+        updated_at = $3
+    WHERE id = $1
+    RETURNING id, patient_id, doctor_id
+""")
+
+COUNT_APPOINTMENTS_BY_STATUS = QUERIES.register("appointments.count_by_status", """
+    SELECT COUNT(*) FROM appointments WHERE status = $1
+""", read_only=True)
+
+FIND_DOCTOR_BY_ID = QUERIES.register("doctors.find_by_id", """
+    SELECT id, name, specialty, available_days, available_hours, updated_at
+    FROM doctors WHERE id = $1
+""", read_only=True)
+
+FIND_DOCTORS_BY_SPECIALTY = QUERIES.register("doctors.find_by_specialty", """
+    SELECT id, name, specialty, available_days, available_hours, updated_at
+    FROM doctors
+    WHERE $1::text IS NULL OR specialty ILIKE $1
+    ORDER BY name
+""", read_only=True)
+
+# Doctor page in one round trip: the row, lifetime aggregates over
+# completed appointments (from doctor_stats) and, from one scan of the
+# active bookings since $2, the upcoming count plus the bookings up to $3
+# (ordered, as arrays)
+FIND_DOCTOR_PROFILE = QUERIES.register("doctors.profile", """
+    WITH doctor AS (
+        SELECT id, name, email, phone, specialty, license_number,
+            available_days, available_hours, created_at, updated_at
+        FROM doctors
+        WHERE id = $1
+    ),
+    active AS (
+        SELECT
+            COUNT(*) AS upcoming_appointments,
+            ARRAY_AGG(appointment_date ORDER BY appointment_date, start_time)
+                FILTER (WHERE appointment_date <= $3) AS booked_dates,
+            ARRAY_AGG(start_time ORDER BY appointment_date, start_time)
+                FILTER (WHERE appointment_date <= $3) AS booked_starts,
+            ARRAY_AGG(end_time ORDER BY appointment_date, start_time)
+                FILTER (WHERE appointment_date <= $3) AS booked_ends
+        FROM appointments
+        WHERE doctor_id = $1
+            AND appointment_date >= $2
+            AND status IN ('scheduled', 'confirmed')
+    )
+    SELECT
+        doctor.*,
+        COALESCE(s.completed_count, 0) AS total_appointments,
+        s.completion_seconds_sum / NULLIF(s.completed_count, 0) AS avg_appointment_duration,
+        active.*
+    FROM doctor
+    CROSS JOIN active
+    LEFT JOIN doctor_stats s ON s.doctor_id = doctor.id
+""", read_only=True)
+
+# Per-doctor statistics summary (doctor_stats), see DoctorStatsEventHandler
+FIND_DOCTOR_STATS = QUERIES.register("doctor_stats.find_by_doctor", """
+    SELECT
+        d.id AS doctor_id,
+        COALESCE(s.scheduled_count, 0) AS scheduled_count,
+        COALESCE(s.confirmed_count, 0) AS confirmed_count,
+        COALESCE(s.completed_count, 0) AS completed_count,
+        COALESCE(s.cancelled_count, 0) AS cancelled_count,
+        COALESCE(s.no_show_count, 0) AS no_show_count,
+        COALESCE(s.duration_minutes_sum, 0) AS duration_minutes_sum,
+        COALESCE(s.completion_seconds_sum, 0) AS completion_seconds_sum,
+        s.first_appointment_date,
+        s.last_appointment_date,
+        s.reconciled_at
+    FROM doctors d
+    LEFT JOIN doctor_stats s ON s.doctor_id = d.id
+    WHERE d.id = $1
+""", read_only=True)
+
+# One row per doctor (doctor_ids must be distinct)
+APPLY_DOCTOR_STATS_DELTA = QUERIES.register("doctor_stats.apply", """
+    INSERT INTO doctor_stats AS s (
+        doctor_id, scheduled_count, confirmed_count, completed_count,
+        cancelled_count, no_show_count, duration_minutes_sum,
+        completion_seconds_sum, first_appointment_date, last_appointment_date
+    )
+    SELECT * FROM unnest(
+        $1::uuid[], $2::bigint[], $3::bigint[], $4::bigint[], $5::bigint[],
+        $6::bigint[], $7::bigint[], $8::float8[], $9::date[], $10::date[]
+    )
+    ON CONFLICT (doctor_id) DO UPDATE SET
+        scheduled_count = s.scheduled_count + EXCLUDED.scheduled_count,
+        confirmed_count = s.confirmed_count + EXCLUDED.confirmed_count,
+        completed_count = s.completed_count + EXCLUDED.completed_count,
+        cancelled_count = s.cancelled_count + EXCLUDED.cancelled_count,
+        no_show_count = s.no_show_count + EXCLUDED.no_show_count,
+        duration_minutes_sum = s.duration_minutes_sum + EXCLUDED.duration_minutes_sum,
+        completion_seconds_sum = s.completion_seconds_sum + EXCLUDED.completion_seconds_sum,
+        first_appointment_date = LEAST(s.first_appointment_date, EXCLUDED.first_appointment_date),
+        last_appointment_date = GREATEST(s.last_appointment_date, EXCLUDED.last_appointment_date),
+        updated_at = CURRENT_TIMESTAMP
+""")
+
+# Full recomputation; runs rarely, so it is not prepared on every connection
+RECONCILE_DOCTOR_STATS = """
+    INSERT INTO doctor_stats AS s (
+        doctor_id, scheduled_count, confirmed_count, completed_count,
+        cancelled_count, no_show_count, duration_minutes_sum,
+        completion_seconds_sum, first_appointment_date, last_appointment_date,
+        reconciled_at
+    )
+    SELECT
+        d.id,
+        COUNT(a.id) FILTER (WHERE a.status = 'scheduled'),
+        COUNT(a.id) FILTER (WHERE a.status = 'confirmed'),
+        COUNT(a.id) FILTER (WHERE a.status = 'completed'),
+        COUNT(a.id) FILTER (WHERE a.status = 'cancelled'),
+        COUNT(a.id) FILTER (WHERE a.status = 'no_show'),
+        COALESCE(SUM(a.duration_minutes), 0),
+        COALESCE(SUM(EXTRACT(EPOCH FROM (a.updated_at - a.created_at)))
+            FILTER (WHERE a.status = 'completed'), 0),
+        MIN(a.appointment_date),
+        MAX(a.appointment_date),
+        CURRENT_TIMESTAMP
+    FROM doctors d
+    LEFT JOIN appointments a ON a.doctor_id = d.id
+    GROUP BY d.id
+    ON CONFLICT (doctor_id) DO UPDATE SET
+        scheduled_count = EXCLUDED.scheduled_count,
+        confirmed_count = EXCLUDED.confirmed_count,
+        completed_count = EXCLUDED.completed_count,
+        cancelled_count = EXCLUDED.cancelled_count,
+        no_show_count = EXCLUDED.no_show_count,
+        duration_minutes_sum = EXCLUDED.duration_minutes_sum,
+        completion_seconds_sum = EXCLUDED.completion_seconds_sum,
+        first_appointment_date = EXCLUDED.first_appointment_date,
+        last_appointment_date = EXCLUDED.last_appointment_date,
+        reconciled_at = EXCLUDED.reconciled_at,
+        updated_at = CURRENT_TIMESTAMP
+"""
+
+# Daily appointment rollups (appointment_rollups_daily), see
+# AppointmentRollupEventHandler
+APPLY_APPOINTMENT_ROLLUP_DELTA = QUERIES.register("appointment_rollups.apply", """
+    INSERT INTO appointment_rollups_daily AS r (
+        doctor_id, appointment_date, hour, status,
+        appointment_count, duration_minutes_sum
+    )
+    SELECT doctor_id, appointment_date, hour, status::appointment_status, appointment_count, duration_minutes_sum
+    FROM unnest($1::uuid[], $2::date[], $3::smallint[], $4::text[], $5::bigint[], $6::bigint[])
+        AS d(doctor_id, appointment_date, hour, status, appointment_count, duration_minutes_sum)
+    ON CONFLICT (appointment_date, doctor_id, hour, status) DO UPDATE SET
+        appointment_count = r.appointment_count + EXCLUDED.appointment_count,
+        duration_minutes_sum = r.duration_minutes_sum + EXCLUDED.duration_minutes_sum
+""")
+
+# Totals by status, ISO weekday and hour over a date range (optionally
+# one doctor) in one pass over the rollup rows
+SUMMARIZE_APPOINTMENT_ROLLUPS = QUERIES.register("appointment_rollups.summarize", """
+    SELECT
+        GROUPING(status) = 0 AS by_status,
+        GROUPING(weekday) = 0 AS by_weekday,
+        status::text AS status,
+        weekday,
+        hour,
+        SUM(appointment_count) AS appointment_count,
+        COALESCE(SUM(appointment_count) FILTER (WHERE status <> 'cancelled'), 0) AS booked_count,
+        SUM(duration_minutes_sum) AS duration_minutes_sum
+    FROM (
+        SELECT
+            status,
+            EXTRACT(ISODOW FROM appointment_date)::int AS weekday,
+            hour,
+            appointment_count,
+            duration_minutes_sum
+        FROM appointment_rollups_daily
+        WHERE appointment_date BETWEEN $1 AND $2
+            AND ($3::uuid IS NULL OR doctor_id = $3)
+    ) r
+    GROUP BY GROUPING SETS ((status), (weekday), (hour))
+    ORDER BY weekday, hour
+""", read_only=True)
+
+# Rebuild from appointments; runs rarely, so it is not prepared.
+# Rows are upserted (concurrent apply() calls may insert the same keys)
+# and rows with no appointments left are deleted, in one statement.
+REBUILD_APPOINTMENT_ROLLUPS = """
+    WITH rebuilt AS (
+        INSERT INTO appointment_rollups_daily AS r (
+            doctor_id, appointment_date, hour, status,
+            appointment_count, duration_minutes_sum
+        )
+        SELECT
+            doctor_id,
+            appointment_date,
+            EXTRACT(HOUR FROM start_time)::smallint,
+            status,
+            COUNT(*),
+            COALESCE(SUM(duration_minutes), 0)
+        FROM appointments
+        GROUP BY 1, 2, 3, 4
+        ON CONFLICT (appointment_date, doctor_id, hour, status) DO UPDATE SET
+            appointment_count = EXCLUDED.appointment_count,
+            duration_minutes_sum = EXCLUDED.duration_minutes_sum
+        RETURNING appointment_date, doctor_id, hour, status
+    ),
+    removed AS (
+        DELETE FROM appointment_rollups_daily r
+        WHERE NOT EXISTS (
+            SELECT 1 FROM rebuilt b
+            WHERE b.appointment_date = r.appointment_date
+                AND b.doctor_id = r.doctor_id
+                AND b.hour = r.hour
+                AND b.status = r.status
+        )
+        RETURNING 1
+    )
+    SELECT COUNT(*) FROM rebuilt
+"""
+
+# Transaction-level advisory lock: one rebuild at a time across workers
+LOCK_APPOINTMENT_ROLLUPS_REBUILD = """
+    SELECT pg_try_advisory_xact_lock(hashtext('appointment_rollups_daily.rebuild'))
+"""
+
+# Doctor directory columns, as /doctors returns them
+DOCTOR_DIRECTORY_COLUMNS = """
+    d.id,
+    d.name,
+    d.email,
+    d.phone,
+    d.specialty,
+    d.license_number,
+    d.available_days,
+    d.available_hours,
+    d.created_at
+"""
+
+# Doctor directory: one shape whatever filters are set (NULL = no filter);
+# the window count returns the total with the page
+LIST_DOCTORS = QUERIES.register("doctors.list", f"""
+    SELECT {DOCTOR_DIRECTORY_COLUMNS},
+        COUNT(*) OVER() AS total_count
+    FROM doctors d
+    WHERE ($1::text IS NULL OR d.specialty ILIKE $1)
+        AND ($2::jsonb IS NULL OR d.available_days @> $2::jsonb)
+    ORDER BY d.name, d.id
+    LIMIT $3 OFFSET $4
+""", read_only=True)
+
+# Only needed when the page is past the end and carries no window count
+COUNT_DOCTORS = QUERIES.register("doctors.count", """
+    SELECT COUNT(*) FROM doctors d
+    WHERE ($1::text IS NULL OR d.specialty ILIKE $1)
+        AND ($2::jsonb IS NULL OR d.available_days @> $2::jsonb)
+""", read_only=True)
+
+# Whole directory for the in-memory snapshot, in the same order
+LIST_ALL_DOCTORS = QUERIES.register("doctors.list_all", f"""
+    SELECT {DOCTOR_DIRECTORY_COLUMNS}
+    FROM doctors d
+    ORDER BY d.name, d.id
+""", read_only=True)
+
+# Changes whenever a doctor is added, updated or removed
+DOCTORS_VERSION = QUERIES.register("doctors.version", """
+    SELECT COUNT(*) AS doctor_count, MAX(updated_at) AS last_updated
+    FROM doctors
+""", read_only=True)
+
 class PostgreSQLAppointmentRepository(IAppointmentRepository):
     """
     PostgreSQL implementation of the Appointment Repository
@@ -26,6 +410,8 @@ class PostgreSQLAppointmentRepository(IAppointmentRepository):
     - Repository Pattern (encapsulates data access)
     - Dependency Inversion (implements interface)
     - Single Responsibility (only handles persistence)
+    - Read/write splitting (read methods acquire read_only connections,
+      which a replica may serve; writes mark what they wrote)
     """
     
     def __init__(self, database):
@@ -40,20 +426,10 @@ class PostgreSQLAppointmentRepository(IAppointmentRepository):
         Save a new appointment to the database
         Demonstrates: Data mapping between domain and persistence
         """
-        query = """
-            INSERT INTO appointments (
-                id, patient_id, doctor_id, 
-                appointment_date, appointment_time, start_time, end_time,
-                status, reason, notes,
-                created_at, updated_at
-            ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12)
-            RETURNING *
-        """
-        
         try:
             async with self.database.acquire() as connection:
-                row = await connection.fetchrow(
-                    query,
+                row = await connection.fetchrow_named(
+                    INSERT_APPOINTMENT,
                     str(appointment.id),
                     str(appointment.patient_id),
                     str(appointment.doctor_id),
@@ -68,9 +444,17 @@ class PostgreSQLAppointmentRepository(IAppointmentRepository):
                     appointment.updated_at
                 )
                 
+                self.database.mark_written(_written_keys(
+                    appointment.id, appointment.patient_id, appointment.doctor_id
+                ))
                 logger.info(f"Appointment saved successfully: {appointment.id}")
                 return self._map_row_to_appointment(row)
                 
+        except asyncpg.ExclusionViolationError as e:
+            # no_overlapping_doctor_appointments: the INSERT itself is the
+            # availability check, so there is no check-then-insert race
+            logger.info(f"Slot conflict for doctor {appointment.doctor_id}: {e.detail}")
+            raise SlotUnavailableError("Time slot is not available")
         except asyncpg.UniqueViolationError as e:
             logger.error(f"Duplicate appointment: {e}")
             raise ValueError("An appointment already exists for this time slot")
@@ -78,17 +462,134 @@ class PostgreSQLAppointmentRepository(IAppointmentRepository):
             logger.error(f"Error saving appointment: {e}")
             raise
     
-    async def find_by_id(self, appointment_id: AppointmentId) -> Optional[Appointment]:
+    async def save_many(self, appointments: List[Appointment]) -> List[Appointment]:
         """
-        Find an appointment by its ID
+        Save several new appointments in one transaction
+        Demonstrates: Bulk loading with COPY instead of one INSERT per row
+        All or nothing: an overlap anywhere rolls back the whole batch
+        """
+        if not appointments:
+            return []
+        
+        try:
+            async with self.database.acquire() as connection:
+                async with connection.transaction():
+                    await self._copy_appointments(connection, appointments)
+            
+            self._mark_written(appointments)
+            logger.info(f"{len(appointments)} appointments saved in bulk")
+            return appointments
+            
+        except asyncpg.ExclusionViolationError as e:
+            logger.info(f"Slot conflict in bulk save: {e.detail}")
+            raise SlotUnavailableError("Time slot is not available")
+        except Exception as e:
+            logger.error(f"Error saving appointments in bulk: {e}")
+            raise
+    
+    async def save_series(
+        self,
+        series: AppointmentSeries,
+        appointments: List[Appointment]
+    ) -> AppointmentSeries:
+        """
+        Save a recurring series and its occurrences in one transaction
+        Demonstrates: Constant round trips - one INSERT and one COPY
+        whatever the number of occurrences
         """
         query = """
-            SELECT * FROM appointments WHERE id = $1
+            INSERT INTO appointment_series (
+                id, patient_id, doctor_id, recurrence_rule,
+                start_date, start_time, end_time,
+                reason, notes, created_at
+            ) VALUES ($1, $2, $3, $4::jsonb, $5, $6, $7, $8, $9, $10)
         """
         
         try:
             async with self.database.acquire() as connection:
-                row = await connection.fetchrow(query, str(appointment_id))
+                async with connection.transaction():
+                    await connection.execute(
+                        query,
+                        str(series.id),
+                        str(series.patient_id),
+                        str(series.doctor_id),
+                        json.dumps(series.rule.to_dict()),
+                        series.start_date,
+                        series.time_slot.start_time,
+                        series.time_slot.end_time,
+                        series.reason,
+                        series.notes,
+                        series.created_at
+                    )
+                    await self._copy_appointments(connection, appointments)
+            
+            self._mark_written(appointments)
+            logger.info(
+                f"Series {series.id} saved with {len(appointments)} occurrences"
+            )
+            return series
+            
+        except asyncpg.ExclusionViolationError as e:
+            logger.info(f"Slot conflict saving series {series.id}: {e.detail}")
+            raise SlotUnavailableError("Time slot is not available")
+        except Exception as e:
+            logger.error(f"Error saving appointment series: {e}")
+            raise
+    
+    def _mark_written(self, appointments: List[Appointment]) -> None:
+        """Pin reads of the written appointments' keys to the primary"""
+        self.database.mark_written({
+            key
+            for appointment in appointments
+            for key in _written_keys(appointment.id, appointment.patient_id, appointment.doctor_id)
+        })
+    
+    async def _copy_appointments(self, connection, appointments: List[Appointment]):
+        """COPY new appointments into the table on an open transaction"""
+        records = [
+            (
+                appointment.id.value,
+                appointment.patient_id.value,
+                appointment.doctor_id.value,
+                appointment.appointment_date,
+                appointment.time_slot.start_time,  # appointment_time (same as start_time)
+                appointment.time_slot.start_time,
+                appointment.time_slot.end_time,
+                appointment.time_slot.duration_minutes,
+                appointment.status.value,
+                appointment.reason,
+                appointment.notes,
+                appointment.created_at,
+                appointment.updated_at,
+                appointment.series_id
+            )
+            for appointment in appointments
+        ]
+        
+        await connection.copy_records_to_table(
+            'appointments',
+            records=records,
+            columns=[
+                'id', 'patient_id', 'doctor_id',
+                'appointment_date', 'appointment_time', 'start_time', 'end_time',
+                'duration_minutes', 'status', 'reason', 'notes',
+                'created_at', 'updated_at', 'series_id'
+            ]
+        )
+    
+    async def find_by_id(
+        self,
+        appointment_id: AppointmentId,
+        primary: bool = False
+    ) -> Optional[Appointment]:
+        """
+        Find an appointment by its ID
+        """
+        try:
+            async with self.database.acquire(
+                read_only=not primary, keys=(f"appointment:{appointment_id}",)
+            ) as connection:
+                row = await connection.fetchrow_named(FIND_APPOINTMENT_BY_ID, str(appointment_id))
                 
                 if row:
                     return self._map_row_to_appointment(row)
@@ -98,19 +599,19 @@ class PostgreSQLAppointmentRepository(IAppointmentRepository):
             logger.error(f"Error finding appointment by ID: {e}")
             raise
     
-    async def find_by_patient(self, patient_id: PatientId) -> List[Appointment]:
+    async def find_by_patient(
+        self,
+        patient_id: PatientId,
+        primary: bool = False
+    ) -> List[Appointment]:
         """
         Find all appointments for a patient
         """
-        query = """
-            SELECT * FROM appointments 
-            WHERE patient_id = $1
-            ORDER BY appointment_date, start_time
-        """
-        
         try:
-            async with self.database.acquire() as connection:
-                rows = await connection.fetch(query, str(patient_id))
+            async with self.database.acquire(
+                read_only=not primary, keys=(f"patient:{patient_id}",)
+            ) as connection:
+                rows = await connection.fetch_named(FIND_APPOINTMENTS_BY_PATIENT, str(patient_id))
                 
                 return [self._map_row_to_appointment(row) for row in rows]
                 
@@ -121,22 +622,19 @@ class PostgreSQLAppointmentRepository(IAppointmentRepository):
     async def find_by_doctor_and_date(
         self, 
         doctor_id: DoctorId, 
-        appointment_date: date
+        appointment_date: date,
+        primary: bool = False
     ) -> List[Appointment]:
         """
         Find all appointments for a doctor on a specific date
         """
-        query = """
-            SELECT * FROM appointments 
-            WHERE doctor_id = $1 AND appointment_date = $2
-            ORDER BY start_time
-        """
-        
         try:
-            async with self.database.acquire() as connection:
-                rows = await connection.fetch(
-                    query, 
-                    str(doctor_id), 
+            async with self.database.acquire(
+                read_only=not primary, keys=(f"doctor:{doctor_id}",)
+            ) as connection:
+                rows = await connection.fetch_named(
+                    FIND_APPOINTMENTS_BY_DOCTOR_AND_DATE,
+                    str(doctor_id),
                     appointment_date
                 )
                 
@@ -146,32 +644,233 @@ class PostgreSQLAppointmentRepository(IAppointmentRepository):
             logger.error(f"Error finding appointments by doctor and date: {e}")
             raise
     
-    async def update(self, appointment: Appointment) -> Appointment:
+    async def find_page(
+        self,
+        filters: Dict[str, Any],
+        limit: int = 20,
+        cursor: Optional[str] = None,
+        offset: int = 0,
+        views: bool = False
+    ) -> AppointmentPage:
         """
-        Update an existing appointment
+        Find one page of appointments matching filters
+        Demonstrates: Keyset pagination on (appointment_date, start_time, id)
+        
+        Supported filters: patient_id, doctor_id, status, date_from, date_to.
+        The total and the page come back from a single statement; the total
+        is exact when any filter is set and a planner estimate otherwise.
+        With views=True the page holds read-only AppointmentRowView objects
+        instead of entities.
         """
-        query = """
-            UPDATE appointments SET
-                patient_id = $2,
-                doctor_id = $3,
-                appointment_date = $4,
-                appointment_time = $5,
-                start_time = $6,
-                end_time = $7,
-                status = $8,
-                reason = $9,
-                notes = $10,
-                updated_at = $11,
-                cancelled_at = $12,
-                cancellation_reason = $13
-            WHERE id = $1
-            RETURNING *
+        conditions, params = self._build_filter_conditions(filters)
+        where = " AND ".join(conditions) if conditions else "TRUE"
+        
+        page_conditions = list(conditions)
+        if cursor:
+            page_conditions.append(
+                self._keyset_condition(self.decode_cursor(cursor), params)
+            )
+        page_where = " AND ".join(page_conditions) if page_conditions else "TRUE"
+        
+        if conditions:
+            count_query = f"SELECT COUNT(*) AS total_count FROM appointments WHERE {where}"
+        else:
+            # Clinic-wide listing: use the planner estimate instead of a full scan
+            count_query = """
+                SELECT GREATEST(reltuples, 0)::bigint AS total_count
+                FROM pg_class WHERE oid = 'appointments'::regclass
+            """
+        
+        # Fetch one extra row to know whether another page exists
+        params.extend([limit + 1, offset])
+        query = f"""
+            SELECT counts.total_count, page.*
+            FROM ({count_query}) AS counts
+            LEFT JOIN LATERAL (
+                SELECT * FROM appointments
+                WHERE {page_where}
+                ORDER BY appointment_date, start_time, id
+                LIMIT ${len(params) - 1} OFFSET ${len(params)}
+            ) AS page ON TRUE
+        """
+        
+        try:
+            async with self.database.acquire(
+                read_only=True, keys=_filter_keys(filters)
+            ) as connection:
+                rows = await connection.fetch(query, *params)
+                
+                total = rows[0]['total_count'] if rows else 0
+                rows = [row for row in rows if row['id'] is not None]
+                
+                next_cursor = None
+                if len(rows) > limit:
+                    rows = rows[:limit]
+                    next_cursor = self.encode_cursor(rows[-1])
+                
+                mapper = AppointmentRowView if views else self._map_row_to_appointment
+                return AppointmentPage(
+                    appointments=[mapper(row) for row in rows],
+                    total=total,
+                    next_cursor=next_cursor
+                )
+                
+        except Exception as e:
+            logger.error(f"Error finding appointment page: {e}")
+            raise
+    
+    @staticmethod
+    def _build_filter_conditions(filters: Dict[str, Any]) -> Tuple[List[str], List[Any]]:
+        """
+        Translate filters into SQL conditions and positional parameters
+        Conditions always come in the same order and status is always an
+        array, so each combination of set filters is one statement shape
+        """
+        conditions = []
+        params = []
+        
+        if filters.get('patient_id'):
+            params.append(str(filters['patient_id']))
+            conditions.append(f"patient_id = ${len(params)}::uuid")
+        
+        if filters.get('doctor_id'):
+            params.append(str(filters['doctor_id']))
+            conditions.append(f"doctor_id = ${len(params)}::uuid")
+        
+        if filters.get('status'):
+            status = filters['status']
+            if not isinstance(status, (list, tuple, set)):
+                status = [status]
+            params.append([
+                s.value if isinstance(s, AppointmentStatus) else s for s in status
+            ])
+            conditions.append(f"status = ANY(${len(params)}::appointment_status[])")
+        
+        if filters.get('date_from'):
+            params.append(filters['date_from'])
+            conditions.append(f"appointment_date >= ${len(params)}")
+        
+        if filters.get('date_to'):
+            params.append(filters['date_to'])
+            conditions.append(f"appointment_date <= ${len(params)}")
+        
+        return conditions, params
+    
+    @staticmethod
+    def _keyset_condition(position: Tuple[date, time, str], params: List[Any]) -> str:
+        """Condition selecting rows strictly after a keyset position"""
+        params.extend(position)
+        return (
+            f"(appointment_date, start_time, id) > "
+            f"(${len(params) - 2}, ${len(params) - 1}, ${len(params)}::uuid)"
+        )
+    
+    @staticmethod
+    def _keyset_of(row) -> Tuple[date, time, str]:
+        """Keyset position of a row"""
+        return row['appointment_date'], row['start_time'], str(row['id'])
+    
+    @staticmethod
+    def encode_cursor(row) -> str:
+        """Encode the keyset position of a row as an opaque cursor"""
+        raw = f"{row['appointment_date'].isoformat()}|{row['start_time'].isoformat()}|{row['id']}"
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+    
+    @staticmethod
+    def decode_cursor(cursor: str) -> Tuple[date, time, str]:
+        """Decode a cursor produced by encode_cursor"""
+        try:
+            raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+            cursor_date, cursor_time, cursor_id = raw.split("|")
+            return (
+                date.fromisoformat(cursor_date),
+                time.fromisoformat(cursor_time),
+                str(uuid.UUID(cursor_id))
+            )
+        except ValueError:
+            raise ValueError("Invalid pagination cursor")
+    
+    async def find_booked_intervals(
+        self,
+        doctor_id: DoctorId,
+        start_date: date,
+        end_date: date
+    ) -> List[Tuple[date, time, time]]:
+        """
+        Find active bookings for a doctor in a date range
+        Single range scan; returns plain tuples instead of domain entities
+        """
+        try:
+            async with self.database.acquire(
+                read_only=True, keys=(f"doctor:{doctor_id}",)
+            ) as connection:
+                rows = await connection.fetch_named(
+                    FIND_BOOKED_INTERVALS,
+                    str(doctor_id),
+                    start_date,
+                    end_date
+                )
+                
+                return [
+                    (row['appointment_date'], row['start_time'], row['end_time'])
+                    for row in rows
+                ]
+                
+        except Exception as e:
+            logger.error(f"Error finding booked intervals: {e}")
+            raise
+    
+    async def find_booked_intervals_for_doctors(
+        self,
+        doctor_ids: List[str],
+        start_date: date,
+        end_date: date
+    ) -> List[Tuple[str, date, time, time]]:
+        """
+        Find active bookings for several doctors in a date range
+        One query for all doctors instead of one per doctor
         """
+        if not doctor_ids:
+            return []
         
+        try:
+            async with self.database.acquire(
+                read_only=True,
+                keys=[f"doctor:{doctor_id}" for doctor_id in doctor_ids]
+            ) as connection:
+                rows = await connection.fetch_named(
+                    FIND_BOOKED_INTERVALS_FOR_DOCTORS,
+                    [str(doctor_id) for doctor_id in doctor_ids],
+                    start_date,
+                    end_date
+                )
+                
+                return [
+                    (
+                        str(row['doctor_id']),
+                        row['appointment_date'],
+                        row['start_time'],
+                        row['end_time']
+                    )
+                    for row in rows
+                ]
+                
+        except Exception as e:
+            logger.error(f"Error finding booked intervals for doctors: {e}")
+            raise
+    
+    async def update(
+        self,
+        appointment: Appointment,
+        previous_date: Optional[date] = None
+    ) -> Appointment:
+        """
+        Update an existing appointment
+        """
         try:
             async with self.database.acquire() as connection:
-                row = await connection.fetchrow(
-                    query,
+                row = await connection.fetchrow_named(
+                    UPDATE_APPOINTMENT,
                     str(appointment.id),
                     str(appointment.patient_id),
                     str(appointment.doctor_id),
@@ -188,11 +887,17 @@ class PostgreSQLAppointmentRepository(IAppointmentRepository):
                 )
                 
                 if row:
+                    self.database.mark_written(_written_keys(
+                        appointment.id, appointment.patient_id, appointment.doctor_id
+                    ))
                     logger.info(f"Appointment updated successfully: {appointment.id}")
                     return self._map_row_to_appointment(row)
                     
                 raise ValueError(f"Appointment not found: {appointment.id}")
                 
+        except asyncpg.ExclusionViolationError as e:
+            logger.info(f"Slot conflict for doctor {appointment.doctor_id}: {e.detail}")
+            raise SlotUnavailableError("Time slot is not available")
         except Exception as e:
             logger.error(f"Error updating appointment: {e}")
             raise
@@ -201,26 +906,19 @@ class PostgreSQLAppointmentRepository(IAppointmentRepository):
         """
         Delete an appointment (soft delete by setting status)
         """
-        query = """
-            UPDATE appointments 
-            SET status = 'cancelled', 
-                cancelled_at = $2,
-                cancellation_reason = 'Deleted',
-                updated_at = $3
-            WHERE id = $1
-            RETURNING id
-        """
-        
         try:
             async with self.database.acquire() as connection:
-                row = await connection.fetchrow(
-                    query,
+                row = await connection.fetchrow_named(
+                    DELETE_APPOINTMENT,
                     str(appointment_id),
                     datetime.utcnow(),
                     datetime.utcnow()
                 )
                 
                 if row:
+                    self.database.mark_written(_written_keys(
+                        row['id'], row['patient_id'], row['doctor_id']
+                    ))
                     logger.info(f"Appointment deleted successfully: {appointment_id}")
                     return True
                 return False
@@ -231,31 +929,120 @@ class PostgreSQLAppointmentRepository(IAppointmentRepository):
     
     async def find_by_date_range(
         self, 
-        start_date: date, 
-        end_date: date,
-        status: Optional[AppointmentStatus] = None
+        start_date: Optional[date] = None, 
+        end_date: Optional[date] = None,
+        status: Optional[AppointmentStatus] = None,
+        doctor_id: Optional[DoctorId] = None,
+        after: Optional[str] = None,
+        limit: Optional[int] = None
     ) -> List[Appointment]:
         """
         Find appointments within a date range
-        Additional method not in interface but useful
+        Both bounds are optional, so this also serves doctor-wide and
+        clinic-wide listings. status may be one status or a list.
+        Use after (a cursor) and limit to page through large ranges.
         """
-        query = """
-            SELECT * FROM appointments 
-            WHERE appointment_date BETWEEN $1 AND $2
+        rows = await self._fetch_range_rows(
+            start_date, end_date, status, doctor_id,
+            self.decode_cursor(after) if after else None,
+            limit
+        )
+        
+        return [self._map_row_to_appointment(row) for row in rows]
+    
+    async def iter_by_date_range(
+        self,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        status: Optional[AppointmentStatus] = None,
+        doctor_id: Optional[DoctorId] = None,
+        batch_size: int = 500
+    ) -> AsyncIterator[Appointment]:
+        """
+        Stream appointments within a date range
+        Demonstrates: Server-side keyset paging - at most batch_size rows
+        are held in memory however large the range is
+        """
+        position = None
+        while True:
+            rows = await self._fetch_range_rows(
+                start_date, end_date, status, doctor_id, position, batch_size
+            )
+            
+            for row in rows:
+                yield self._map_row_to_appointment(row)
+            
+            if len(rows) < batch_size:
+                return
+            position = self._keyset_of(rows[-1])
+    
+    async def stream_rows(
+        self,
+        filters: Dict[str, Any],
+        prefetch: int = 1000
+    ) -> AsyncIterator[asyncpg.Record]:
         """
-        params = [start_date, end_date]
+        Stream raw appointment rows for export
+        Demonstrates: Server-side cursor - rows arrive in prefetch-sized
+        chunks inside a read-only transaction, no domain mapping is done
         
-        if status:
-            query += " AND status = $3"
-            params.append(status.value)
+        The connection is held until the iterator is exhausted or closed.
+        """
+        conditions, params = self._build_filter_conditions(filters)
         
-        query += " ORDER BY appointment_date, start_time"
+        query = f"SELECT {', '.join(EXPORT_COLUMNS)} FROM appointments"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY appointment_date, start_time, id"
         
         try:
-            async with self.database.acquire() as connection:
-                rows = await connection.fetch(query, *params)
-                
-                return [self._map_row_to_appointment(row) for row in rows]
+            # Not the request's connection: the cursor lives as long as the
+            # response streams
+            async with self.database.acquire(
+                scoped=False, read_only=True, keys=_filter_keys(filters)
+            ) as connection:
+                async with connection.transaction(readonly=True):
+                    async for row in connection.cursor(query, *params, prefetch=prefetch):
+                        yield row
+                        
+        except Exception as e:
+            logger.error(f"Error streaming appointments: {e}")
+            raise
+    
+    async def _fetch_range_rows(
+        self,
+        start_date: Optional[date],
+        end_date: Optional[date],
+        status,
+        doctor_id: Optional[DoctorId],
+        position: Optional[Tuple[date, time, str]],
+        limit: Optional[int]
+    ) -> list:
+        """Run one keyset-ordered range query"""
+        conditions, params = self._build_filter_conditions({
+            'doctor_id': doctor_id,
+            'status': status,
+            'date_from': start_date,
+            'date_to': end_date
+        })
+        
+        if position:
+            conditions.append(self._keyset_condition(position, params))
+        
+        query = "SELECT * FROM appointments"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY appointment_date, start_time, id"
+        
+        if limit:
+            params.append(limit)
+            query += f" LIMIT ${len(params)}"
+        
+        try:
+            async with self.database.acquire(
+                read_only=True, keys=(f"doctor:{doctor_id}",) if doctor_id else ()
+            ) as connection:
+                return await connection.fetch(query, *params)
                 
         except Exception as e:
             logger.error(f"Error finding appointments by date range: {e}")
@@ -266,13 +1053,9 @@ class PostgreSQLAppointmentRepository(IAppointmentRepository):
         Count appointments by status
         Useful for analytics
         """
-        query = """
-            SELECT COUNT(*) FROM appointments WHERE status = $1
-        """
-        
         try:
-            async with self.database.acquire() as connection:
-                count = await connection.fetchval(query, status.value)
+            async with self.database.acquire(read_only=True) as connection:
+                count = await connection.fetchval_named(COUNT_APPOINTMENTS_BY_STATUS, status.value)
                 return count or 0
                 
         except Exception as e:
@@ -283,31 +1066,324 @@ class PostgreSQLAppointmentRepository(IAppointmentRepository):
         """
         Map a database row to an Appointment domain entity
         Private method for internal use only
-        Demonstrates: Data mapping layer
+        Demonstrates: Data mapping layer (trusted hydration, see row_mapping)
         """
         if not row:
             return None
         
-        return Appointment(
-            #id=AppointmentId(row['id']),
-            #patient_id=PatientId(row['patient_id']),
-            #doctor_id=DoctorId(row['doctor_id']),
-            id=AppointmentId(str(row['id'])),      
-            patient_id=PatientId(str(row['patient_id'])),
-            doctor_id=DoctorId(str(row['doctor_id'])),  
-            appointment_date=row['appointment_date'],
-            time_slot=TimeSlot(
-                start_time=row['start_time'],
-                end_time=row['end_time']
-            ),
-            status=AppointmentStatus(row['status']),
-            reason=row.get('reason'),
-            notes=row.get('notes'),
-            created_at=row['created_at'],
-            updated_at=row['updated_at'],
-            cancelled_at=row.get('cancelled_at'),
-            cancellation_reason=row.get('cancellation_reason')
+        return appointment_from_row(row)
+
+class PostgreSQLDoctorRepository(IDoctorRepository):
+    """
+    PostgreSQL implementation of the Doctor Repository
+    Doctors are managed elsewhere; this service only reads them
+    """
+    
+    def __init__(self, database):
+        self.database = database
+    
+    async def find_by_id(self, doctor_id: DoctorId) -> Optional[Dict[str, Any]]:
+        """
+        Find a doctor by its ID
+        """
+        try:
+            async with self.database.acquire(read_only=True) as connection:
+                row = await connection.fetchrow_named(FIND_DOCTOR_BY_ID, str(doctor_id))
+                return self._map_row_to_doctor(row) if row else None
+                
+        except Exception as e:
+            logger.error(f"Error finding doctor by ID: {e}")
+            raise
+    
+    async def find_by_specialty(self, specialty: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Find doctors by specialty (case-insensitive partial match)
+        """
+        try:
+            async with self.database.acquire(read_only=True) as connection:
+                rows = await connection.fetch_named(
+                    FIND_DOCTORS_BY_SPECIALTY,
+                    f"%{specialty}%" if specialty else None
+                )
+                return [self._map_row_to_doctor(row) for row in rows]
+                
+        except Exception as e:
+            logger.error(f"Error finding doctors by specialty: {e}")
+            raise
+    
+    async def find_page(
+        self,
+        specialty: Optional[str] = None,
+        available_day: Optional[str] = None,
+        limit: int = 20,
+        offset: int = 0
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Find one page of the doctor directory and the total match count
+        specialty is a case-insensitive partial match, available_day a
+        weekday name ("Monday", ...). Rows are returned as stored.
+        """
+        params = (
+            f"%{specialty}%" if specialty else None,
+            json.dumps([available_day]) if available_day else None
         )
+        
+        try:
+            async with self.database.acquire(read_only=True) as connection:
+                rows = await connection.fetch_named(LIST_DOCTORS, *params, limit, offset)
+                if rows:
+                    total = rows[0]['total_count']
+                elif offset:
+                    total = await connection.fetchval_named(COUNT_DOCTORS, *params)
+                else:
+                    total = 0
+                
+        except Exception as e:
+            logger.error(f"Error listing doctors: {e}")
+            raise
+        
+        doctors = []
+        for row in rows:
+            doctor = dict(row)
+            del doctor['total_count']
+            doctors.append(doctor)
+        return doctors, total or 0
+    
+    async def find_profile(
+        self,
+        doctor_id: DoctorId,
+        start_date: date,
+        end_date: date
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Find a doctor with the data of its detail page, in one query
+        Demonstrates: CTE aggregation instead of one round trip per figure
+        
+        Returns the row as stored plus total_appointments and
+        avg_appointment_duration (completed appointments),
+        upcoming_appointments (active, from start_date on) and booked:
+        the active (date, start, end) intervals between start_date and
+        end_date, ordered by date and start.
+        """
+        try:
+            async with self.database.acquire(
+                read_only=True, keys=(f"doctor:{doctor_id}",)
+            ) as connection:
+                row = await connection.fetchrow_named(
+                    FIND_DOCTOR_PROFILE, str(doctor_id), start_date, end_date
+                )
+                
+        except Exception as e:
+            logger.error(f"Error finding doctor profile: {e}")
+            raise
+        
+        if row is None:
+            return None
+        profile = dict(row)
+        profile['booked'] = list(zip(
+            profile.pop('booked_dates') or (),
+            profile.pop('booked_starts') or (),
+            profile.pop('booked_ends') or ()
+        ))
+        return profile
+    
+    async def find_all(self) -> List[Dict[str, Any]]:
+        """
+        Load the whole doctor directory, ordered like find_page
+        Rows are returned as stored (same shape as find_page)
+        """
+        try:
+            async with self.database.acquire(read_only=True) as connection:
+                rows = await connection.fetch_named(LIST_ALL_DOCTORS)
+                return [dict(row) for row in rows]
+                
+        except Exception as e:
+            logger.error(f"Error loading doctor directory: {e}")
+            raise
+    
+    async def get_version(self) -> Tuple[int, Optional[datetime]]:
+        """
+        Cheap fingerprint of the doctors table: (row count, last update)
+        """
+        try:
+            async with self.database.acquire(read_only=True) as connection:
+                row = await connection.fetchrow_named(DOCTORS_VERSION)
+                return row['doctor_count'], row['last_updated']
+                
+        except Exception as e:
+            logger.error(f"Error reading doctor directory version: {e}")
+            raise
+    
+    def _map_row_to_doctor(self, row) -> Dict[str, Any]:
+        """
+        Map a database row to a doctor dictionary
+        asyncpg returns JSONB columns as strings, so decode them here
+        """
+        doctor = dict(row)
+        doctor['id'] = str(doctor['id'])
+        for column, default in (('available_days', []), ('available_hours', {})):
+            value = doctor.get(column)
+            if isinstance(value, str):
+                value = json.loads(value)
+            doctor[column] = value if value is not None else default
+        return doctor
+
+class PostgreSQLDoctorStatsRepository(IDoctorStatsRepository):
+    """
+    PostgreSQL implementation of the doctor statistics summary
+    Demonstrates: Materialized counters - reads are one primary key
+    lookup whatever the number of appointments
+    """
+    
+    def __init__(self, database):
+        self.database = database
+    
+    async def find_by_doctor(self, doctor_id: DoctorId) -> Optional[Dict[str, Any]]:
+        """
+        Stats of a doctor, None if the doctor does not exist
+        A doctor without a summary row yet gets zero counts
+        """
+        try:
+            async with self.database.acquire(read_only=True) as connection:
+                row = await connection.fetchrow_named(FIND_DOCTOR_STATS, str(doctor_id))
+                return dict(row) if row else None
+                
+        except Exception as e:
+            logger.error(f"Error finding doctor stats: {e}")
+            raise
+    
+    async def apply(self, *deltas: DoctorStatsDelta) -> None:
+        """
+        Add deltas to their doctors' summary rows (created if missing)
+        One statement for all doctors; one delta per doctor
+        """
+        def column(status: str) -> List[int]:
+            return [delta.status_counts.get(status, 0) for delta in deltas]
+        
+        try:
+            async with self.database.acquire() as connection:
+                await connection.fetchval_named(
+                    APPLY_DOCTOR_STATS_DELTA,
+                    [str(delta.doctor_id) for delta in deltas],
+                    column('scheduled'),
+                    column('confirmed'),
+                    column('completed'),
+                    column('cancelled'),
+                    column('no_show'),
+                    [delta.duration_minutes for delta in deltas],
+                    [delta.completion_seconds for delta in deltas],
+                    [delta.first_date for delta in deltas],
+                    [delta.last_date for delta in deltas]
+                )
+                
+        except Exception as e:
+            logger.error(f"Error applying doctor stats delta: {e}")
+            raise
+    
+    async def reconcile(self) -> int:
+        """
+        Recompute every doctor's summary from the appointments table
+        Returns the number of doctors written
+        
+        Corrects lost deltas and narrows first/last dates. A delta
+        applied while this runs may be overwritten; the next run puts it
+        back, so drift never outlives one interval.
+        """
+        try:
+            # scoped=False: runs from a background task
+            async with self.database.acquire(scoped=False) as connection:
+                status = await connection.execute(RECONCILE_DOCTOR_STATS)
+                return int(status.split()[-1])
+                
+        except Exception as e:
+            logger.error(f"Error reconciling doctor stats: {e}")
+            raise
+
+class PostgreSQLAppointmentRollupRepository(IAppointmentRollupRepository):
+    """
+    PostgreSQL implementation of the daily appointment rollups
+    Demonstrates: Rollup tables - range statistics read a few rows per
+    doctor and day instead of every appointment
+    """
+    
+    def __init__(self, database):
+        self.database = database
+    
+    async def summarize(
+        self,
+        date_from: date,
+        date_to: date,
+        doctor_id: Optional[DoctorId] = None
+    ) -> Dict[str, Any]:
+        """Totals by status, ISO weekday and hour over a date range"""
+        try:
+            async with self.database.acquire(read_only=True) as connection:
+                rows = await connection.fetch_named(
+                    SUMMARIZE_APPOINTMENT_ROLLUPS,
+                    date_from,
+                    date_to,
+                    str(doctor_id) if doctor_id else None
+                )
+        except Exception as e:
+            logger.error(f"Error summarizing appointment rollups: {e}")
+            raise
+        
+        summary = {'by_status': {}, 'by_weekday': {}, 'by_hour': {}}
+        for row in rows:
+            if row['by_status']:
+                if row['appointment_count']:
+                    summary['by_status'][row['status']] = (
+                        row['appointment_count'],
+                        row['duration_minutes_sum']
+                    )
+            elif row['booked_count']:
+                if row['by_weekday']:
+                    summary['by_weekday'][row['weekday']] = row['booked_count']
+                else:
+                    summary['by_hour'][row['hour']] = row['booked_count']
+        return summary
+    
+    async def apply(self, delta: AppointmentRollupDelta) -> None:
+        """Add a delta to its rollup rows (one statement for all rows)"""
+        changes = delta.changes()
+        try:
+            async with self.database.acquire() as connection:
+                await connection.fetchval_named(
+                    APPLY_APPOINTMENT_ROLLUP_DELTA,
+                    [doctor_id for (doctor_id, _, _, _), _, _ in changes],
+                    [day for (_, day, _, _), _, _ in changes],
+                    [hour for (_, _, hour, _), _, _ in changes],
+                    [status for (_, _, _, status), _, _ in changes],
+                    [count for _, count, _ in changes],
+                    [minutes for _, _, minutes in changes]
+                )
+                
+        except Exception as e:
+            logger.error(f"Error applying appointment rollup delta: {e}")
+            raise
+    
+    async def reconcile(self) -> int:
+        """
+        Rebuild every rollup row from the appointments table
+        Returns the number of rows written, 0 when another worker is
+        already rebuilding
+        
+        Readers see the old rows until the rebuild commits. As with the
+        doctor stats, a delta racing the rebuild may be lost or counted
+        twice until the next run.
+        """
+        try:
+            # scoped=False: runs from a background task
+            async with self.database.acquire(scoped=False) as connection:
+                async with connection.transaction():
+                    if not await connection.fetchval(LOCK_APPOINTMENT_ROLLUPS_REBUILD):
+                        logger.info("Appointment rollups rebuild already running, skipped")
+                        return 0
+                    return await connection.fetchval(REBUILD_APPOINTMENT_ROLLUPS)
+                
+        except Exception as e:
+            logger.error(f"Error rebuilding appointment rollups: {e}")
+            raise
 
 class CachedAppointmentRepository(IAppointmentRepository):
     """
@@ -315,14 +1391,186 @@ class CachedAppointmentRepository(IAppointmentRepository):
     Demonstrates: Decorator Pattern, Caching Strategy
     """
     
-    def __init__(self, repository: IAppointmentRepository, cache_service):
+    def __init__(
+        self,
+        repository: IAppointmentRepository,
+        cache_service,
+        cache_ttl: int = 300,  # 5 minutes
+        local_cache: Optional[LocalCache] = None,
+        early_refresh_beta: float = 1.0,
+        codec: Optional[CacheCodec] = None
+    ):
         """
         Wrap another repository with caching
-        Demonstrates: Composition over inheritance
+        Demonstrates: Composition over inheritance, two-tier caching
+        cache_service is the shared (L2) backend (see infrastructure.cache);
+        local_cache is an optional in-process (L1) cache of domain objects
+        kept coherent through CACHE_INVALIDATION_CHANNEL.
+        early_refresh_beta tunes probabilistic early refresh (0 disables it).
+        codec lays out cached values (see infrastructure.cache_codec)
         """
         self.repository = repository
         self.cache = cache_service
-        self.cache_ttl = 300  # 5 minutes
+        self.cache_ttl = cache_ttl
+        self.local_cache = local_cache
+        self.early_refresh_beta = early_refresh_beta
+        self.codec = codec or BinaryCodec()
+        self.single_flight = SingleFlight()
+        self._load_seconds: Dict[str, float] = {}  # key_type -> average load time
+    
+    async def _cached_read(
+        self,
+        cache_key: str,
+        key_type: str,
+        load: Callable[[], Awaitable[Any]],
+        encode: Callable[[Any], bytes],
+        decode: Callable[[str], Any]
+    ):
+        """
+        Read through L1, then L2, then the wrapped repository
+        load must read the primary: a replica may lag behind a write
+        another worker just invalidated, and the stale rows would be
+        shared through L2 for the whole TTL
+        Demonstrates:
+        - Single-flight: concurrent misses on one key share one load
+        - Probabilistic early refresh (XFetch): as a key nears expiry,
+          an increasing share of hits triggers a background reload, so
+          it is refreshed before every caller misses at once
+        """
+        local = self._get_local(cache_key, key_type)
+        if local is not None:
+            return local
+        generation = self._generation()
+        
+        cached, ttl_remaining = await self.cache.get_with_ttl(cache_key)
+        if cached is not None:
+            try:
+                value = decode(cached)
+            except ValueError as e:
+                # e.g. written by a newer codec version during a rollout:
+                # treat as a miss, the load overwrites it
+                logger.warning(f"Undecodable cache entry {cache_key}: {e}")
+                record_cache_event("undecodable")
+                cached = None
+        record_cache_lookup(key_type, cached is not None)
+        
+        if cached is not None:
+            if (
+                not self.single_flight.in_flight(cache_key)
+                and self._should_refresh_early(key_type, ttl_remaining)
+            ):
+                record_cache_event("early_refresh")
+                self.single_flight.spawn(
+                    cache_key,
+                    lambda: self._refresh(cache_key, key_type, load, encode)
+                )
+            self._set_local(cache_key, value, generation)
+            return value
+        
+        if self.single_flight.in_flight(cache_key):
+            record_cache_event("coalesced")
+        value = await self.single_flight.do(
+            cache_key,
+            lambda: self._load_and_store(cache_key, key_type, load, encode, generation)
+        )
+        # Every coalesced caller gets its own copy of the shared result
+        return self._detach(value)
+    
+    async def _load_and_store(
+        self,
+        cache_key: str,
+        key_type: str,
+        load: Callable[[], Awaitable[Any]],
+        encode: Callable[[Any], bytes],
+        generation: Optional[int] = None
+    ):
+        """
+        Load from the wrapped repository and fill both cache tiers
+        The fill is claimed before the load and an invalidation voids the
+        claim (see _invalidate_cache), so a load that read the rows before
+        a write never stores them after it - in L2, where other workers
+        would take them into their own L1, nor locally
+        """
+        token = await self.cache.begin_fill(cache_key)
+        started = perf_counter()
+        value = await load()
+        
+        # Moving average of the load time drives early refresh
+        elapsed = perf_counter() - started
+        previous = self._load_seconds.get(key_type, elapsed)
+        self._load_seconds[key_type] = 0.8 * previous + 0.2 * elapsed
+        
+        if value is not None:
+            if await self.cache.complete_fill(cache_key, token, self.cache_ttl, encode(value)):
+                self._set_local(cache_key, value, generation)
+            else:
+                record_cache_event("stale_fill")
+        return value
+    
+    async def _refresh(self, cache_key, key_type, load, encode):
+        """Background early refresh; failures only cost the refresh"""
+        try:
+            await self._load_and_store(cache_key, key_type, load, encode)
+        except Exception as e:
+            logger.error(f"Early refresh failed for {cache_key}: {e}")
+    
+    def _should_refresh_early(self, key_type: str, ttl_remaining: Optional[float]) -> bool:
+        """
+        XFetch decision: refresh when
+            ttl_remaining <= load_time * beta * -ln(random())
+        so the probability rises sharply as expiry approaches
+        """
+        if ttl_remaining is None or self.early_refresh_beta <= 0:
+            return False
+        load_seconds = self._load_seconds.get(key_type)
+        if not load_seconds:
+            return False
+        gap = load_seconds * self.early_refresh_beta * -math.log(1.0 - random.random())
+        return ttl_remaining <= gap
+    
+    def _get_local(self, cache_key: str, key_type: str):
+        """
+        Read the in-process cache
+        Returns copies so callers can mutate entities freely
+        """
+        if self.local_cache is None:
+            return None
+        value = self.local_cache.get(cache_key)
+        record_cache_lookup(key_type, value is not None, tier="local")
+        return self._detach(value)
+    
+    def _set_local(self, cache_key: str, value, generation: Optional[int]):
+        """
+        Store a copy in the in-process cache
+        The generation only guards against invalidations seen by this
+        process; loads therefore only get here once their shared cache
+        fill went through (see _load_and_store)
+        """
+        if self.local_cache is not None:
+            self.local_cache.set(cache_key, self._detach(value), generation)
+    
+    def _generation(self) -> Optional[int]:
+        """Invalidation generation seen before a read (see LocalCache.set)"""
+        return self.local_cache.generation if self.local_cache is not None else None
+    
+    @staticmethod
+    def _detach(value):
+        """Shallow copies of cached entities"""
+        if value is None:
+            return None
+        if isinstance(value, list):
+            return [copy.copy(apt) for apt in value]
+        return copy.copy(value)
+    
+    def handle_invalidation(self, message: str) -> None:
+        """Drop keys published on CACHE_INVALIDATION_CHANNEL"""
+        if self.local_cache is not None:
+            self.local_cache.invalidate(*json.loads(message))
+    
+    def handle_invalidation_gap(self) -> None:
+        """Invalidations may have been missed: drop the whole local cache"""
+        if self.local_cache is not None:
+            self.local_cache.clear()
     
     async def save(self, appointment: Appointment) -> Appointment:
         """Save and invalidate cache"""
@@ -333,94 +1581,178 @@ class CachedAppointmentRepository(IAppointmentRepository):
         
         return result
     
-    async def find_by_id(self, appointment_id: AppointmentId) -> Optional[Appointment]:
-        """Find with cache"""
-        cache_key = f"appointment:{appointment_id}"
-        
-        # Check cache first
-        cached = await self.cache.get(cache_key)
-        if cached:
-            logger.debug(f"Cache hit for appointment: {appointment_id}")
-            return Appointment.from_dict(json.loads(cached))
-        
-        # Fetch from repository
-        appointment = await self.repository.find_by_id(appointment_id)
-        
-        if appointment:
-            # Store in cache
-            await self.cache.setex(
-                cache_key,
-                self.cache_ttl,
-                json.dumps(appointment.to_dict())
-            )
+    async def save_many(self, appointments: List[Appointment]) -> List[Appointment]:
+        """Save in bulk and invalidate cache"""
+        result = await self.repository.save_many(appointments)
         
-        return appointment
-    
-    async def find_by_patient(self, patient_id: PatientId) -> List[Appointment]:
-        """Find by patient with cache"""
-        cache_key = f"patient_appointments:{patient_id}"
+        await self._invalidate_cache(*appointments)
         
-        # Check cache
-        cached = await self.cache.get(cache_key)
-        if cached:
-            logger.debug(f"Cache hit for patient appointments: {patient_id}")
-            appointments_data = json.loads(cached)
-            return [Appointment.from_dict(data) for data in appointments_data]
+        return result
+    
+    async def save_series(
+        self,
+        series: AppointmentSeries,
+        appointments: List[Appointment]
+    ) -> AppointmentSeries:
+        """Save a series and invalidate cache"""
+        result = await self.repository.save_series(series, appointments)
         
-        # Fetch from repository
-        appointments = await self.repository.find_by_patient(patient_id)
+        await self._invalidate_cache(*appointments)
         
-        # Store in cache
-        await self.cache.setex(
-            cache_key,
-            self.cache_ttl,
-            json.dumps([apt.to_dict() for apt in appointments])
+        return result
+    
+    async def find_by_id(
+        self,
+        appointment_id: AppointmentId,
+        primary: bool = False
+    ) -> Optional[Appointment]:
+        """Find with cache (primary=True bypasses it)"""
+        if primary:
+            return await self.repository.find_by_id(appointment_id, primary=True)
+        return await self._cached_read(
+            f"appointment:{appointment_id}",
+            "appointment",
+            lambda: self.repository.find_by_id(appointment_id, primary=True),
+            self.codec.encode_appointment,
+            self.codec.decode_appointment
+        )
+    
+    async def find_by_patient(
+        self,
+        patient_id: PatientId,
+        primary: bool = False
+    ) -> List[Appointment]:
+        """Find by patient with cache (primary=True bypasses it)"""
+        if primary:
+            return await self.repository.find_by_patient(patient_id, primary=True)
+        return await self._cached_read(
+            f"patient_appointments:{patient_id}",
+            "patient_appointments",
+            lambda: self.repository.find_by_patient(patient_id, primary=True),
+            self.codec.encode_appointments,
+            self.codec.decode_appointments
         )
-        
-        return appointments
     
     async def find_by_doctor_and_date(
         self, 
         doctor_id: DoctorId, 
-        appointment_date: date
+        appointment_date: date,
+        primary: bool = False
     ) -> List[Appointment]:
-        """Find by doctor and date with cache"""
-        cache_key = f"doctor_appointments:{doctor_id}:{appointment_date.isoformat()}"
-        
-        # Check cache
-        cached = await self.cache.get(cache_key)
-        if cached:
-            logger.debug(f"Cache hit for doctor appointments: {doctor_id} on {appointment_date}")
-            appointments_data = json.loads(cached)
-            return [Appointment.from_dict(data) for data in appointments_data]
-        
-        # Fetch from repository
-        appointments = await self.repository.find_by_doctor_and_date(
-            doctor_id, appointment_date
+        """
+        Find by doctor and date with cache (primary=True bypasses it)
+        Today's schedules are the hottest keys and are normally served
+        from the in-process cache without any I/O
+        """
+        if primary:
+            return await self.repository.find_by_doctor_and_date(
+                doctor_id, appointment_date, primary=True
+            )
+        return await self._cached_read(
+            f"doctor_appointments:{doctor_id}:{appointment_date.isoformat()}",
+            "doctor_appointments",
+            lambda: self.repository.find_by_doctor_and_date(
+                doctor_id, appointment_date, primary=True
+            ),
+            self.codec.encode_appointments,
+            self.codec.decode_appointments
         )
-        
-        # Store in cache
-        await self.cache.setex(
-            cache_key,
-            self.cache_ttl,
-            json.dumps([apt.to_dict() for apt in appointments])
+    
+    async def find_page(
+        self,
+        filters: Dict[str, Any],
+        limit: int = 20,
+        cursor: Optional[str] = None,
+        offset: int = 0,
+        views: bool = False
+    ) -> AppointmentPage:
+        """Paginated queries are not cached"""
+        return await self.repository.find_page(filters, limit, cursor, offset, views)
+    
+    async def find_by_date_range(
+        self,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        status: Optional[AppointmentStatus] = None,
+        doctor_id: Optional[DoctorId] = None,
+        after: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> List[Appointment]:
+        """Range scans are not cached"""
+        return await self.repository.find_by_date_range(
+            start_date, end_date, status, doctor_id, after, limit
+        )
+    
+    def iter_by_date_range(
+        self,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        status: Optional[AppointmentStatus] = None,
+        doctor_id: Optional[DoctorId] = None,
+        batch_size: int = 500
+    ) -> AsyncIterator[Appointment]:
+        """Streams are not cached"""
+        return self.repository.iter_by_date_range(
+            start_date, end_date, status, doctor_id, batch_size
+        )
+    
+    def stream_rows(
+        self,
+        filters: Dict[str, Any],
+        prefetch: int = 1000
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Streams are not cached"""
+        return self.repository.stream_rows(filters, prefetch)
+    
+    async def find_booked_intervals(
+        self,
+        doctor_id: DoctorId,
+        start_date: date,
+        end_date: date
+    ) -> List[Tuple[date, time, time]]:
+        """Range scans are not cached"""
+        return await self.repository.find_booked_intervals(
+            doctor_id, start_date, end_date
         )
-        
-        return appointments
     
-    async def update(self, appointment: Appointment) -> Appointment:
-        """Update and invalidate cache"""
-        result = await self.repository.update(appointment)
+    async def find_booked_intervals_for_doctors(
+        self,
+        doctor_ids: List[str],
+        start_date: date,
+        end_date: date
+    ) -> List[Tuple[str, date, time, time]]:
+        """Range scans are not cached"""
+        return await self.repository.find_booked_intervals_for_doctors(
+            doctor_ids, start_date, end_date
+        )
+    
+    async def update(
+        self,
+        appointment: Appointment,
+        previous_date: Optional[date] = None
+    ) -> Appointment:
+        """
+        Update and invalidate cache
+        A reschedule moves the appointment between doctor/day lists: the
+        caller passes the stored date (previous_date) so the old day is
+        invalidated too, without reading the row again
+        """
+        result = await self.repository.update(appointment, previous_date)
         
         # Invalidate related cache entries
-        await self._invalidate_cache(appointment)
+        if previous_date is not None and previous_date != appointment.appointment_date:
+            previous = copy.copy(appointment)
+            previous.appointment_date = previous_date
+            await self._invalidate_cache(appointment, previous)
+        else:
+            await self._invalidate_cache(appointment)
         
         return result
     
     async def delete(self, appointment_id: AppointmentId) -> bool:
         """Delete and invalidate cache"""
         # Get appointment first to know what cache to invalidate
-        appointment = await self.repository.find_by_id(appointment_id)
+        appointment = await self.repository.find_by_id(appointment_id, primary=True)
         
         result = await self.repository.delete(appointment_id)
         
@@ -429,17 +1761,37 @@ class CachedAppointmentRepository(IAppointmentRepository):
         
         return result
     
-    async def _invalidate_cache(self, appointment: Appointment):
+    async def _invalidate_cache(self, *appointments: Appointment):
         """
-        Invalidate all cache entries related to an appointment
+        Invalidate all cache entries related to the given appointments
+        Demonstrates: Batched invalidation - every key is deleted and the
+        invalidation message published in one pipelined round trip
         """
-        keys_to_delete = [
-            f"appointment:{appointment.id}",
-            f"patient_appointments:{appointment.patient_id}",
-            f"doctor_appointments:{appointment.doctor_id}:{appointment.appointment_date.isoformat()}"
-        ]
+        keys_to_delete = list(dict.fromkeys(
+            key
+            for appointment in appointments
+            for key in (
+                f"appointment:{appointment.id}",
+                f"patient_appointments:{appointment.patient_id}",
+                f"doctor_appointments:{appointment.doctor_id}:{appointment.appointment_date.isoformat()}"
+            )
+        ))
+        if not keys_to_delete:
+            return
         
-        for key in keys_to_delete:
-            await self.cache.delete(key)
+        # Loads already running for these keys may return old data to
+        # their callers; later readers must not join them, and deleting
+        # the keys voids their fills so the old data is not cached
+        self.single_flight.forget(*keys_to_delete)
+        
+        # Drop local copies here right away, and in every other worker and
+        # replica through the invalidation channel
+        if self.local_cache is not None:
+            self.local_cache.invalidate(*keys_to_delete)
+            await self.cache.invalidate(
+                keys_to_delete, CACHE_INVALIDATION_CHANNEL, json.dumps(keys_to_delete)
+            )
+        else:
+            await self.cache.invalidate(keys_to_delete)
         
-        logger.debug(f"Cache invalidated for appointment: {appointment.id}")
+        logger.debug(f"Cache invalidated for {len(appointments)} appointment(s)")
@@ -0,0 +1,123 @@
+# Appointment Row Mapping
+# Demonstrates: Data Mapper, Trusted hydration, Lazy read models
+
+from datetime import date, datetime
+from typing import Any, Dict, Optional
+
+from domain.entities import (
+    Appointment,
+    AppointmentStatus,
+    AppointmentId,
+    PatientId,
+    DoctorId,
+    TimeSlot
+)
+
+# Enum lookup without going through AppointmentStatus.__call__
+_STATUS_BY_VALUE = {status.value: status for status in AppointmentStatus}
+
+def _text(value) -> Optional[str]:
+    """UUID (or other) column value as text, None stays None"""
+    return None if value is None else str(value)
+
+def appointment_from_row(row) -> Appointment:
+    """
+    Build an Appointment from an appointments row
+    Demonstrates: Trusted hydration - rows were validated when written,
+    so invariants are not re-checked (that would also reject every
+    appointment in the past)
+    """
+    return Appointment.restore(
+        id=AppointmentId.restore(str(row['id'])),
+        patient_id=PatientId.restore(str(row['patient_id'])),
+        doctor_id=DoctorId.restore(str(row['doctor_id'])),
+        appointment_date=row['appointment_date'],
+        time_slot=TimeSlot.restore(row['start_time'], row['end_time']),
+        status=_STATUS_BY_VALUE[row['status']],
+        reason=row['reason'],
+        notes=row['notes'],
+        created_at=row['created_at'],
+        updated_at=row['updated_at'],
+        cancelled_at=row['cancelled_at'],
+        cancellation_reason=row['cancellation_reason'],
+        series_id=_text(row['series_id'])
+    )
+
+class AppointmentRowView:
+    """
+    Read-only appointment backed by a database row
+    Demonstrates: Lazy read model - nothing is converted until an
+    attribute is read, and only that attribute
+    
+    Exposes the attributes AppointmentResponseDTO.from_domain reads, so
+    list endpoints can render rows without building entities. Use
+    to_entity() for anything that changes the appointment.
+    """
+    
+    __slots__ = ('_row',)
+    
+    def __init__(self, row):
+        self._row = row
+    
+    @property
+    def id(self) -> AppointmentId:
+        return AppointmentId.restore(str(self._row['id']))
+    
+    @property
+    def patient_id(self) -> PatientId:
+        return PatientId.restore(str(self._row['patient_id']))
+    
+    @property
+    def doctor_id(self) -> DoctorId:
+        return DoctorId.restore(str(self._row['doctor_id']))
+    
+    @property
+    def appointment_date(self) -> date:
+        return self._row['appointment_date']
+    
+    @property
+    def time_slot(self) -> TimeSlot:
+        return TimeSlot.restore(self._row['start_time'], self._row['end_time'])
+    
+    @property
+    def status(self) -> AppointmentStatus:
+        return _STATUS_BY_VALUE[self._row['status']]
+    
+    @property
+    def reason(self) -> Optional[str]:
+        return self._row['reason']
+    
+    @property
+    def notes(self) -> Optional[str]:
+        return self._row['notes']
+    
+    @property
+    def created_at(self) -> datetime:
+        return self._row['created_at']
+    
+    @property
+    def updated_at(self) -> datetime:
+        return self._row['updated_at']
+    
+    @property
+    def cancelled_at(self) -> Optional[datetime]:
+        return self._row['cancelled_at']
+    
+    @property
+    def cancellation_reason(self) -> Optional[str]:
+        return self._row['cancellation_reason']
+    
+    @property
+    def series_id(self) -> Optional[str]:
+        return _text(self._row['series_id'])
+    
+    def to_entity(self) -> Appointment:
+        """Materialize the full domain entity"""
+        return appointment_from_row(self._row)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Same shape as Appointment.to_dict"""
+        return self.to_entity().to_dict()
+    
+    def __repr__(self) -> str:
+        return f"AppointmentRowView(id={self._row['id']})"
@@ -117,6 +117,7 @@ class AppointmentResponseDTO(BaseModel):
     updated_at: datetime
     cancelled_at: Optional[datetime]
     cancellation_reason: Optional[str]
+    series_id: Optional[str] = None
 
     @classmethod
     def from_domain(cls, appointment):
@@ -138,7 +139,8 @@ class AppointmentResponseDTO(BaseModel):
             created_at=appointment.created_at,
             updated_at=appointment.updated_at,
             cancelled_at=appointment.cancelled_at,
-            cancellation_reason=appointment.cancellation_reason
+            cancellation_reason=appointment.cancellation_reason,
+            series_id=appointment.series_id
         )
 
     class Config:
@@ -171,11 +173,14 @@ class AppointmentListResponseDTO(BaseModel):
     total: int
     page: int
     page_size: int
+    next_cursor: Optional[str] = None
     has_next: bool = False
     has_previous: bool = False
 
     @validator('has_next', always=True)
     def calculate_has_next(cls, v, values):
+        if values.get('next_cursor'):
+            return True
         if 'total' in values and 'page' in values and 'page_size' in values:
             return values['page'] * values['page_size'] < values['total']
         return False
@@ -287,6 +292,10 @@ class AppointmentFilterDTO(BaseModel):
         return v
 
 
+# Maximum number of appointments accepted by one bulk request
+MAX_BULK_APPOINTMENTS = 500
+
+
 class BulkAppointmentCreateDTO(BaseModel):
     """
     DTO for creating multiple appointments
@@ -298,11 +307,97 @@ class BulkAppointmentCreateDTO(BaseModel):
     def validate_appointments(cls, v):
         if not v or len(v) == 0:
             raise ValueError('At least one appointment is required')
-        if len(v) > 10:
-            raise ValueError('Maximum 10 appointments can be created at once')
+        if len(v) > MAX_BULK_APPOINTMENTS:
+            raise ValueError(
+                f'Maximum {MAX_BULK_APPOINTMENTS} appointments can be created at once'
+            )
+        return v
+
+
+class BulkAppointmentItemResultDTO(BaseModel):
+    """Result of one item of a bulk request"""
+    index: int
+    status: str  # 'created' or 'failed'
+    appointment: Optional[AppointmentResponseDTO] = None
+    error: Optional[str] = None
+
+
+class BulkAppointmentResponseDTO(BaseModel):
+    """
+    DTO for bulk creation results
+    Demonstrates: Partial success reporting
+    """
+    results: List[BulkAppointmentItemResultDTO]
+    created: int
+    failed: int
+
+    @classmethod
+    def from_results(cls, results):
+        """
+        Convert BulkCreateAppointmentsUseCase results (one dict per item,
+        in request order) to the response
+        """
+        items = [
+            BulkAppointmentItemResultDTO(
+                index=result["index"],
+                status=result["status"],
+                appointment=(
+                    AppointmentResponseDTO.from_domain(result["appointment"])
+                    if "appointment" in result else None
+                ),
+                error=result.get("error")
+            )
+            for result in results
+        ]
+        created = sum(1 for item in items if item.status == "created")
+        return cls(results=items, created=created, failed=len(items) - created)
+
+
+class RecurrenceFrequencyDTO(str, Enum):
+    """Recurrence frequency enumeration for API"""
+    DAILY = "daily"
+    WEEKLY = "weekly"
+    MONTHLY = "monthly"
+
+
+class RecurrenceDTO(BaseModel):
+    """
+    DTO for a recurrence rule (RRULE-like)
+    Demonstrates: Nested input validation
+    """
+    frequency: RecurrenceFrequencyDTO
+    interval: int = Field(default=1, ge=1, le=12, description="Repeat every N units")
+    weekdays: List[str] = Field(default_factory=list, description="Weekly rules only, e.g. [\"Monday\"]")
+    until: Optional[date] = Field(None, description="Last possible occurrence date")
+    count: Optional[int] = Field(None, ge=1, le=52, description="Number of occurrences")
+
+    @validator('count', always=True)
+    def validate_end(cls, v, values):
+        if v is None and values.get('until') is None:
+            raise ValueError('Either until or count is required')
         return v
 
 
+class CreateAppointmentSeriesDTO(CreateAppointmentDTO):
+    """
+    DTO for creating a recurring appointment series
+    appointment_date is the first date of the series
+    """
+    recurrence: RecurrenceDTO
+    skip_conflicts: bool = Field(
+        default=False,
+        description="Skip unavailable occurrences instead of rejecting the series"
+    )
+
+
+class AppointmentSeriesResponseDTO(BaseModel):
+    """DTO for recurring series responses"""
+    series_id: str
+    recurrence: dict
+    appointments: List[AppointmentResponseDTO]
+    skipped_dates: List[date]
+
+
 class AppointmentStatisticsDTO(BaseModel):
     """
     DTO for appointment statistics
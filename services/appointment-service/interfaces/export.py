@@ -0,0 +1,74 @@
+# Export Formatters
+# Demonstrates: Streaming serialization straight from database rows
+
+import csv
+import io
+import json
+from datetime import date, time, datetime
+from typing import Any, AsyncIterator, Mapping, Sequence
+from uuid import UUID
+
+# Rows are grouped into chunks so each write to the socket carries
+# a useful amount of data without delaying the first byte
+ROWS_PER_CHUNK = 200
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv"
+}
+
+
+def _serialize(value: Any) -> Any:
+    """Convert database values into JSON/CSV friendly scalars"""
+    if isinstance(value, (date, time, datetime)):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    return value
+
+
+async def to_ndjson(
+    rows: AsyncIterator[Mapping[str, Any]],
+    columns: Sequence[str]
+) -> AsyncIterator[bytes]:
+    """Encode rows as newline-delimited JSON"""
+    chunk = []
+    async for row in rows:
+        chunk.append(json.dumps({column: _serialize(row[column]) for column in columns}))
+        if len(chunk) >= ROWS_PER_CHUNK:
+            yield ("\n".join(chunk) + "\n").encode()
+            chunk = []
+    if chunk:
+        yield ("\n".join(chunk) + "\n").encode()
+
+
+async def to_csv(
+    rows: AsyncIterator[Mapping[str, Any]],
+    columns: Sequence[str]
+) -> AsyncIterator[bytes]:
+    """Encode rows as CSV with a header line"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    writer.writerow(columns)
+    yield buffer.getvalue().encode()
+    buffer.seek(0)
+    buffer.truncate()
+
+    pending = 0
+    async for row in rows:
+        writer.writerow(["" if row[column] is None else _serialize(row[column]) for column in columns])
+        pending += 1
+        if pending >= ROWS_PER_CHUNK:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    if pending:
+        yield buffer.getvalue().encode()
+
+
+EXPORT_FORMATTERS = {
+    "ndjson": to_ndjson,
+    "csv": to_csv
+}
@@ -0,0 +1,25 @@
+# HTTP Middleware
+# Demonstrates: Pure ASGI middleware, Request-scoped resources
+
+
+class RequestScopedConnectionMiddleware:
+    """
+    One pooled database connection per HTTP request
+    Demonstrates: Unit of work scope (see Database.request_scope)
+    
+    Written as plain ASGI rather than with @app.middleware("http"):
+    BaseHTTPMiddleware runs the endpoint in a separate task, and the
+    request scope only hands its connection to the task that opened it.
+    """
+    
+    def __init__(self, app, database):
+        self.app = app
+        self.database = database
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        async with self.database.request_scope():
+            await self.app(scope, receive, send)
@@ -4,6 +4,8 @@
 
 from fastapi import FastAPI, HTTPException, Depends
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response, StreamingResponse
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 from contextlib import asynccontextmanager
 from typing import List, Optional
 from datetime import datetime, date, time
@@ -12,36 +14,70 @@ import logging
 from datetime import timedelta
 
 # Domain Layer Imports
-from domain.entities import Appointment, AppointmentStatus
+from domain.entities import Appointment, AppointmentStatus, SlotUnavailableError
 from domain.value_objects import TimeSlot, AppointmentId
 
 # Application Layer Imports
 from application.use_cases import (
     CreateAppointmentUseCase,
+    BulkCreateAppointmentsUseCase,
+    CreateRecurringSeriesUseCase,
     UpdateAppointmentUseCase,
     CancelAppointmentUseCase,
     GetAppointmentUseCase,
     ListAppointmentsUseCase
 )
-from application.services import AvailabilityService, ValidationService
+from application.services import (
+    AvailabilityService,
+    ValidationService,
+    DoctorScheduleCache,
+    DoctorDirectory,
+    SummaryReconciler,
+    AppointmentAnalyticsService,
+    OccupancyCache
+)
 
 # Infrastructure Layer Imports
 from infrastructure.database import Database
-from infrastructure.repositories import PostgreSQLAppointmentRepository
-from infrastructure.messaging import EventPublisher
+from infrastructure.cache import CACHE_INVALIDATION_CHANNEL, LocalCache, create_cache
+from infrastructure.cache_codec import create_codec
+from infrastructure.repositories import (
+    PostgreSQLAppointmentRepository,
+    PostgreSQLDoctorRepository,
+    PostgreSQLDoctorStatsRepository,
+    PostgreSQLAppointmentRollupRepository,
+    CachedAppointmentRepository,
+    EXPORT_COLUMNS
+)
+from infrastructure.messaging import (
+    EventPublisher,
+    OccupancyEventHandler,
+    DoctorStatsEventHandler,
+    AppointmentRollupEventHandler
+)
 
 # Interface Layer Imports
 from interfaces.dto import (
     CreateAppointmentDTO,
     UpdateAppointmentDTO,
     AppointmentResponseDTO,
-    AppointmentListResponseDTO
+    AppointmentListResponseDTO,
+    BulkAppointmentCreateDTO,
+    BulkAppointmentResponseDTO,
+    CreateAppointmentSeriesDTO,
+    AppointmentSeriesResponseDTO,
+    AppointmentStatisticsDTO
 )
+from interfaces.export import EXPORT_FORMATTERS, EXPORT_MEDIA_TYPES
+from interfaces.middleware import RequestScopedConnectionMiddleware
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Maximum number of days a single availability range query may span
+MAX_AVAILABILITY_RANGE_DAYS = 90
+
 # Dependency Injection Container (Manual DI for educational purposes)
 class DIContainer:
     """
@@ -52,19 +88,89 @@ class DIContainer:
     
     def __init__(self):
         # Infrastructure
-        self.database = Database(os.getenv("DATABASE_URL"))
+        self.database = Database.from_env(os.getenv("DATABASE_URL"))
         self.event_publisher = EventPublisher()
         
+        # Cache backend: "redis", "memory" (single process) or "none"
+        self.cache = create_cache(
+            os.getenv("CACHE_BACKEND", "redis" if os.getenv("REDIS_URL") else "none"),
+            os.getenv("REDIS_URL")
+        )
+        
         # Repositories
         self.appointment_repository = PostgreSQLAppointmentRepository(
             self.database
         )
+        # In-process cache in front of the shared one (0 entries disables it)
+        self.local_cache = None
+        local_cache_entries = int(os.getenv("LOCAL_CACHE_MAX_ENTRIES", "10000"))
+        if self.cache is not None and local_cache_entries > 0:
+            self.local_cache = LocalCache(
+                max_entries=local_cache_entries,
+                ttl=float(os.getenv("LOCAL_CACHE_TTL_SECONDS", "30"))
+            )
+        
+        if self.cache is not None:
+            self.appointment_repository = CachedAppointmentRepository(
+                self.appointment_repository,
+                self.cache,
+                cache_ttl=int(os.getenv("CACHE_TTL_SECONDS", "300")),
+                local_cache=self.local_cache,
+                early_refresh_beta=float(os.getenv("CACHE_EARLY_REFRESH_BETA", "1.0")),
+                codec=create_codec(os.getenv("CACHE_CODEC", "binary"))
+            )
+        self.doctor_repository = PostgreSQLDoctorRepository(self.database)
+        self.doctor_stats_repository = PostgreSQLDoctorStatsRepository(self.database)
+        self.appointment_rollup_repository = PostgreSQLAppointmentRollupRepository(self.database)
         
         # Domain Services
+        self.schedule_cache = DoctorScheduleCache(self.doctor_repository)
+        # In-memory /doctors listing, reloaded on doctor_changes
+        self.doctor_directory = DoctorDirectory(
+            self.doctor_repository,
+            refresh_interval=float(os.getenv("DOCTOR_DIRECTORY_REFRESH_SECONDS", "60"))
+        )
+        # Materialized availability bitmaps, patched from appointment events
+        self.occupancy_cache = None
+        if self.cache is not None:
+            self.occupancy_cache = OccupancyCache(
+                self.cache,
+                ttl=int(os.getenv("OCCUPANCY_CACHE_TTL_SECONDS", "3600"))
+            )
+            occupancy_handler = OccupancyEventHandler(self.occupancy_cache)
+            for event_type in OccupancyEventHandler.EVENT_TYPES:
+                self.event_publisher.event_bus.register_handler(event_type, occupancy_handler)
+        
+        # Doctor statistics counters, patched from appointment events and
+        # recomputed periodically
+        doctor_stats_handler = DoctorStatsEventHandler(self.doctor_stats_repository)
+        for event_type in DoctorStatsEventHandler.EVENT_TYPES:
+            self.event_publisher.event_bus.register_handler(event_type, doctor_stats_handler)
+        self.doctor_stats_reconciler = SummaryReconciler(
+            self.doctor_stats_repository,
+            "Doctor stats",
+            interval=float(os.getenv("DOCTOR_STATS_RECONCILE_SECONDS", "900"))
+        )
+        
+        # Daily appointment rollups behind /analytics/appointments,
+        # maintained the same way
+        rollup_handler = AppointmentRollupEventHandler(self.appointment_rollup_repository)
+        for event_type in AppointmentRollupEventHandler.EVENT_TYPES:
+            self.event_publisher.event_bus.register_handler(event_type, rollup_handler)
+        self.appointment_rollup_reconciler = SummaryReconciler(
+            self.appointment_rollup_repository,
+            "Appointment rollups",
+            interval=float(os.getenv("APPOINTMENT_ROLLUPS_RECONCILE_SECONDS", "3600"))
+        )
+        self.analytics_service = AppointmentAnalyticsService(self.appointment_rollup_repository)
+        
         self.availability_service = AvailabilityService(
-            self.appointment_repository
+            self.appointment_repository,
+            self.doctor_repository,
+            self.schedule_cache,
+            self.occupancy_cache
         )
-        self.validation_service = ValidationService()
+        self.validation_service = ValidationService(self.schedule_cache)
         
         # Use Cases (Application Services)
         self.create_appointment_use_case = CreateAppointmentUseCase(
@@ -74,6 +180,19 @@ class DIContainer:
             event_publisher=self.event_publisher
         )
         
+        self.bulk_create_appointments_use_case = BulkCreateAppointmentsUseCase(
+            repository=self.appointment_repository,
+            validation_service=self.validation_service,
+            event_publisher=self.event_publisher
+        )
+        
+        self.create_recurring_series_use_case = CreateRecurringSeriesUseCase(
+            repository=self.appointment_repository,
+            availability_service=self.availability_service,
+            validation_service=self.validation_service,
+            event_publisher=self.event_publisher
+        )
+        
         self.update_appointment_use_case = UpdateAppointmentUseCase(
             repository=self.appointment_repository,
             validation_service=self.validation_service,
@@ -105,10 +224,45 @@ async def lifespan(app: FastAPI):
     await di_container.database.connect()
     logger.info("Database connected successfully")
     
+    # Pre-open connections and prepare statements before taking traffic
+    warm_up_size = os.getenv("DB_POOL_WARM_UP_SIZE")
+    await di_container.database.warm_up(int(warm_up_size) if warm_up_size else None)
+    
+    if di_container.cache is not None:
+        await di_container.cache.connect()
+        logger.info(f"Cache connected: {type(di_container.cache).__name__}")
+    
+    # Keep in-process caches of all workers coherent
+    if di_container.local_cache is not None:
+        await di_container.cache.subscribe(
+            CACHE_INVALIDATION_CHANNEL,
+            di_container.appointment_repository.handle_invalidation,
+            on_gap=di_container.appointment_repository.handle_invalidation_gap
+        )
+    
+    # Drop compiled doctor schedules and reload the doctor directory
+    # when a doctor row changes
+    def on_doctor_change(doctor_id: str):
+        di_container.schedule_cache.invalidate(doctor_id or None)
+        di_container.doctor_directory.invalidate(doctor_id or None)
+    
+    try:
+        await di_container.database.listen("doctor_changes", on_doctor_change)
+    except Exception as e:
+        logger.warning(f"Doctor change notifications unavailable: {e}")
+    await di_container.doctor_directory.start()
+    await di_container.doctor_stats_reconciler.start()
+    await di_container.appointment_rollup_reconciler.start()
+    
     yield
     
     # Shutdown
     logger.info("Shutting down Appointment Service...")
+    await di_container.doctor_directory.stop()
+    await di_container.doctor_stats_reconciler.stop()
+    await di_container.appointment_rollup_reconciler.stop()
+    if di_container.cache is not None:
+        await di_container.cache.disconnect()
     await di_container.database.disconnect()
     logger.info("Database disconnected successfully")
 
@@ -129,6 +283,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# One database connection per HTTP request
+app.add_middleware(RequestScopedConnectionMiddleware, database=di_container.database)
+
 # Health Check Endpoint
 @app.get("/health")
 async def health_check():
@@ -138,6 +295,13 @@ async def health_check():
         "service": "appointment-service",
         "timestamp": datetime.utcnow().isoformat()
     }
+
+# Prometheus Metrics Endpoint
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics (cache hits/misses, ...)"""
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
 @app.get("/doctors")
 async def list_doctors(
     specialty: Optional[str] = None,
@@ -155,67 +319,17 @@ async def list_doctors(
     - page_size: Items per page (default: 20, max: 100)
     """
     try:
-        query = """
-            SELECT 
-                d.id,
-                d.name,
-                d.email,
-                d.phone,
-                d.specialty,
-                d.license_number,
-                d.available_days,
-                d.available_hours,
-                d.created_at
-            FROM doctors d
-            WHERE 1=1
-        """
-        
-        params = []
-        param_count = 1
-        
-        # Filter by specialty
-        if specialty:
-            query += f" AND d.specialty ILIKE ${param_count}"
-            params.append(f"%{specialty}%")
-            param_count += 1
-        
-        # Filter by available date
-        if available_date:
-            # Get day of week from date
-            day_name = available_date.strftime("%A")
-            query += f" AND d.available_days @> ${param_count}::jsonb"
-            params.append(f'["{day_name}"]')
-            param_count += 1
-        
-        # Pagination
         offset = (page - 1) * page_size
-        query += f" ORDER BY d.name LIMIT ${param_count} OFFSET ${param_count + 1}"
-        params.extend([page_size, offset])
-        
-        # Execute query
-        result = await di_container.database.fetch(query, *params)
-        
-        # Get total count
-        count_query = """
-            SELECT COUNT(*) as total FROM doctors d WHERE 1=1
-        """
-        count_params = []
-        
-        if specialty:
-            count_query += " AND d.specialty ILIKE $1"
-            count_params.append(f"%{specialty}%")
-        
-        if available_date:
-            day_name = available_date.strftime("%A")
-            param_idx = len(count_params) + 1
-            count_query += f" AND d.available_days @> ${param_idx}::jsonb"
-            count_params.append(f'["{day_name}"]')
-        
-        count_result = await di_container.database.fetchrow(count_query, *count_params)
-        total = count_result["total"]
+        doctors, total = await di_container.doctor_directory.find_page(
+            specialty=specialty,
+            # Filter by available date: doctors working on that weekday
+            available_day=available_date.strftime("%A") if available_date else None,
+            limit=page_size,
+            offset=offset
+        )
         
         return {
-            "doctors": [dict(row) for row in result],
+            "doctors": doctors,
             "total": total,
             "page": page,
             "page_size": page_size,
@@ -236,66 +350,21 @@ async def get_doctor(doctor_id: str):
     Returns complete doctor information with schedule
     """
     try:
-        query = """
-            SELECT 
-                d.id,
-                d.name,
-                d.email,
-                d.phone,
-                d.specialty,
-                d.license_number,
-                d.available_days,
-                d.available_hours,
-                d.created_at,
-                d.updated_at,
-                COUNT(a.id) as total_appointments,
-                AVG(EXTRACT(EPOCH FROM (a.updated_at - a.created_at))) as avg_appointment_duration
-            FROM doctors d
-            LEFT JOIN appointments a ON a.doctor_id = d.id 
-                AND a.status = 'completed'
-            WHERE d.id = $1
-            GROUP BY d.id
-        """
-        
-        result = await di_container.database.fetchrow(query, doctor_id)
+        # Doctor row, aggregates and next-7-day bookings in one query
+        start_date = date.today()
+        end_date = start_date + timedelta(days=6)
+        doctor_data = await di_container.doctor_repository.find_profile(
+            doctor_id, start_date, end_date
+        )
         
-        if not result:
+        if not doctor_data:
             raise HTTPException(status_code=404, detail="Doctor not found")
         
-        doctor_data = dict(result)
-        
-        # Get upcoming appointments count
-        upcoming_query = """
-            SELECT COUNT(*) as upcoming_count
-            FROM appointments
-            WHERE doctor_id = $1 
-                AND appointment_date >= CURRENT_DATE
-                AND status IN ('scheduled', 'confirmed')
-        """
-        upcoming_result = await di_container.database.fetchrow(upcoming_query, doctor_id)
-        doctor_data["upcoming_appointments"] = upcoming_result["upcoming_count"]
-        
-        # Get available time slots for next 7 days
-        doctor_data["next_available_slots"] = []
-        for i in range(7):
-            check_date = date.today() + timedelta(days=i)
-            day_name = check_date.strftime("%A")
-            
-            # Check if doctor works on this day
-            if day_name in doctor_data.get("available_days", []):
-                slots = await di_container.availability_service.get_available_slots(
-                    doctor_id=doctor_id,
-                    date=check_date,
-                    duration_minutes=30
-                )
-                
-                if slots:
-                    doctor_data["next_available_slots"].append({
-                        "date": check_date.isoformat(),
-                        "day": day_name,
-                        "slots_count": len(slots),
-                        "first_slot": slots[0].start_time.isoformat() if slots else None
-                    })
+        # Free slots per day computed in memory from those bookings
+        booked = doctor_data.pop("booked")
+        doctor_data["next_available_slots"] = di_container.availability_service.summarize_free_days(
+            doctor_data, booked, start_date, end_date, duration_minutes=30
+        )
         
         return doctor_data
         
@@ -314,43 +383,32 @@ async def get_doctor_statistics(doctor_id: str):
     Returns appointment metrics and performance data
     """
     try:
-        # Verify doctor exists
-        doctor_check = await di_container.database.fetchrow(
-            "SELECT id FROM doctors WHERE id = $1",
-            doctor_id
-        )
+        # Materialized counters: one primary key lookup, whatever the
+        # doctor's history size
+        stats = await di_container.doctor_stats_repository.find_by_doctor(doctor_id)
         
-        if not doctor_check:
+        if not stats:
             raise HTTPException(status_code=404, detail="Doctor not found")
         
-        # Get comprehensive statistics
-        stats_query = """
-            SELECT 
-                COUNT(*) as total_appointments,
-                COUNT(CASE WHEN status = 'completed' THEN 1 END) as completed_count,
-                COUNT(CASE WHEN status = 'cancelled' THEN 1 END) as cancelled_count,
-                COUNT(CASE WHEN status = 'no_show' THEN 1 END) as no_show_count,
-                COUNT(CASE WHEN status IN ('scheduled', 'confirmed') THEN 1 END) as upcoming_count,
-                AVG(duration_minutes) as avg_duration,
-                MIN(appointment_date) as first_appointment_date,
-                MAX(appointment_date) as last_appointment_date
-            FROM appointments
-            WHERE doctor_id = $1
-        """
-        
-        stats = await di_container.database.fetchrow(stats_query, doctor_id)
+        total_appointments = (
+            stats["scheduled_count"]
+            + stats["confirmed_count"]
+            + stats["completed_count"]
+            + stats["cancelled_count"]
+            + stats["no_show_count"]
+        )
         
         # Calculate rates
-        total = stats["total_appointments"] or 1  # Avoid division by zero
+        total = total_appointments or 1  # Avoid division by zero
         
         return {
             "doctor_id": doctor_id,
-            "total_appointments": stats["total_appointments"],
+            "total_appointments": total_appointments,
             "completed": stats["completed_count"],
             "cancelled": stats["cancelled_count"],
             "no_show": stats["no_show_count"],
-            "upcoming": stats["upcoming_count"],
-            "average_duration_minutes": float(stats["avg_duration"]) if stats["avg_duration"] else 0,
+            "upcoming": stats["scheduled_count"] + stats["confirmed_count"],
+            "average_duration_minutes": stats["duration_minutes_sum"] / total if total_appointments else 0,
             "cancellation_rate": round(stats["cancelled_count"] / total, 3),
             "no_show_rate": round(stats["no_show_count"] / total, 3),
             "completion_rate": round(stats["completed_count"] / total, 3),
@@ -364,6 +422,94 @@ async def get_doctor_statistics(doctor_id: str):
         logger.error(f"Error getting doctor statistics: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
+@app.get("/availability/search")
+async def search_availability(
+    start_date: date,
+    end_date: date,
+    specialty: Optional[str] = None,
+    duration_minutes: int = 30,
+    limit: int = 50
+):
+    """
+    Search free slots across all doctors of a specialty
+    Demonstrates: Batched loading (one booking query for all doctors)
+    
+    Query Parameters:
+    - specialty: Filter by medical specialty (partial match)
+    - start_date / end_date: Date window (inclusive)
+    - duration_minutes: Appointment duration (default: 30)
+    - limit: Maximum number of slots returned, earliest first (default: 50, max: 500)
+    """
+    if end_date < start_date:
+        raise HTTPException(status_code=400, detail="end_date must be on or after start_date")
+    if (end_date - start_date).days >= MAX_AVAILABILITY_RANGE_DAYS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Date range cannot exceed {MAX_AVAILABILITY_RANGE_DAYS} days"
+        )
+    
+    try:
+        results = await di_container.availability_service.search_available_slots(
+            specialty=specialty,
+            start_date=start_date,
+            end_date=end_date,
+            duration_minutes=duration_minutes,
+            limit=min(max(limit, 1), 500)
+        )
+        
+        return {
+            "specialty": specialty,
+            "start_date": start_date.isoformat(),
+            "end_date": end_date.isoformat(),
+            "available_slots": [
+                {
+                    "doctor_id": result["doctor_id"],
+                    "doctor_name": result["doctor_name"],
+                    "specialty": result["specialty"],
+                    "date": result["date"].isoformat(),
+                    "start_time": result["time_slot"].start_time.isoformat(),
+                    "end_time": result["time_slot"].end_time.isoformat()
+                }
+                for result in results
+            ]
+        }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error searching availability: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@app.get("/analytics/appointments", response_model=AppointmentStatisticsDTO)
+async def get_appointment_analytics(
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    doctor_id: Optional[str] = None
+):
+    """
+    Clinic-wide appointment statistics over a date range
+    Demonstrates: Rollup tables (per doctor x day x hour x status counts)
+    
+    Query Parameters:
+    - date_from / date_to: Appointment dates (inclusive, default: last 30 days)
+    - doctor_id: Restrict to one doctor
+    """
+    date_to = date_to or date.today()
+    date_from = date_from or date_to - timedelta(days=30)
+    
+    try:
+        statistics = await di_container.analytics_service.get_statistics(
+            date_from,
+            date_to,
+            doctor_id
+        )
+        return AppointmentStatisticsDTO(**statistics)
+        
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error getting appointment analytics: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
 # ============================================================================
 # RUTAS CON PATHS ESPECÍFICOS PRIMERO (para evitar conflictos)
 # ============================================================================
@@ -385,54 +531,164 @@ async def create_appointment(
             appointment_data.dict()
         )
         return AppointmentResponseDTO.from_domain(appointment)
+    except SlotUnavailableError as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error creating appointment: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
+@app.post("/appointments/bulk", response_model=BulkAppointmentResponseDTO)
+async def bulk_create_appointments(
+    bulk_data: BulkAppointmentCreateDTO
+):
+    """
+    Create many appointments in one request
+    Demonstrates: Batch processing - items are validated and checked
+    together, then inserted in a single transaction
+    Each item is reported as created or failed; failures do not block
+    the other items
+    """
+    try:
+        results = await di_container.bulk_create_appointments_use_case.execute(
+            [item.dict() for item in bulk_data.appointments]
+        )
+        
+        return BulkAppointmentResponseDTO.from_results(results)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error creating appointments in bulk: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@app.post("/appointments/series", response_model=AppointmentSeriesResponseDTO)
+async def create_appointment_series(
+    series_data: CreateAppointmentSeriesDTO
+):
+    """
+    Create a recurring appointment series
+    Demonstrates: Lazy recurrence expansion, batched availability check
+    Occurrences are checked together and saved with the series atomically
+    """
+    try:
+        data = series_data.dict(exclude={"skip_conflicts"})
+        series, appointments, skipped_dates = (
+            await di_container.create_recurring_series_use_case.execute(
+                data,
+                skip_conflicts=series_data.skip_conflicts
+            )
+        )
+        
+        return AppointmentSeriesResponseDTO(
+            series_id=str(series.id),
+            recurrence=series.rule.to_dict(),
+            appointments=[
+                AppointmentResponseDTO.from_domain(apt)
+                for apt in appointments
+            ],
+            skipped_dates=skipped_dates
+        )
+    except SlotUnavailableError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error creating appointment series: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
 @app.get("/appointments", response_model=AppointmentListResponseDTO)
 async def list_appointments(
     patient_id: Optional[str] = None,
     doctor_id: Optional[str] = None,
+    date: Optional[date] = None,
     date_from: Optional[date] = None,
     date_to: Optional[date] = None,
     status: Optional[AppointmentStatus] = None,
     page: int = 1,
-    page_size: int = 20
+    page_size: int = 20,
+    cursor: Optional[str] = None
 ):
     """
     List appointments with filters
-    Demonstrates: Query object pattern
+    Demonstrates: Query object pattern, Keyset pagination
+    Pass next_cursor from the previous response as cursor to get the next page
     """
+    page = max(page, 1)
+    page_size = min(max(page_size, 1), 100)
+    
     try:
         filters = {
             "patient_id": patient_id,
             "doctor_id": doctor_id,
+            "date": date,
             "date_from": date_from,
             "date_to": date_to,
             "status": status
         }
         
-        appointments = await di_container.list_appointments_use_case.execute(
+        result = await di_container.list_appointments_use_case.execute(
             filters=filters,
             page=page,
-            page_size=page_size
+            page_size=page_size,
+            cursor=cursor
         )
         
         return AppointmentListResponseDTO(
             appointments=[
                 AppointmentResponseDTO.from_domain(apt) 
-                for apt in appointments
+                for apt in result.appointments
             ],
-            total=len(appointments),
+            total=result.total,
             page=page,
-            page_size=page_size
+            page_size=page_size,
+            next_cursor=result.next_cursor
         )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error listing appointments: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
+@app.get("/appointments/export")
+async def export_appointments(
+    format: str = "ndjson",
+    patient_id: Optional[str] = None,
+    doctor_id: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    status: Optional[AppointmentStatus] = None
+):
+    """
+    Export appointments as NDJSON or CSV
+    Demonstrates: Server-side cursor + streaming response (flat memory,
+    first byte is sent before the query finishes)
+    ⚠️ ESTA RUTA DEBE ESTAR ANTES DE /appointments/{appointment_id}
+    """
+    if format not in EXPORT_FORMATTERS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported format: {format} (use {', '.join(EXPORT_FORMATTERS)})"
+        )
+    
+    filters = {
+        "patient_id": patient_id,
+        "doctor_id": doctor_id,
+        "date_from": date_from,
+        "date_to": date_to,
+        "status": status
+    }
+    
+    rows = di_container.appointment_repository.stream_rows(filters)
+    
+    return StreamingResponse(
+        EXPORT_FORMATTERS[format](rows, EXPORT_COLUMNS),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={
+            "Content-Disposition": f'attachment; filename="appointments.{format}"'
+        }
+    )
+
 @app.get("/appointments/availability/{doctor_id}")
 async def check_availability(
     doctor_id: str,
@@ -447,7 +703,7 @@ async def check_availability(
     try:
         available_slots = await di_container.availability_service.get_available_slots(
             doctor_id=doctor_id,
-            date=date,
+            appointment_date=date,
             duration_minutes=duration_minutes
         )
         
@@ -466,6 +722,58 @@ async def check_availability(
         logger.error(f"Error checking availability: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
+@app.get("/appointments/availability/{doctor_id}/range")
+async def check_availability_range(
+    doctor_id: str,
+    start_date: date,
+    end_date: date,
+    duration_minutes: int = 30
+):
+    """
+    Check available time slots for a doctor over a date range
+    Demonstrates: Single range query instead of one query per day
+    ⚠️ ESTA RUTA DEBE ESTAR ANTES DE /appointments/{appointment_id}
+    """
+    if end_date < start_date:
+        raise HTTPException(status_code=400, detail="end_date must be on or after start_date")
+    if (end_date - start_date).days >= MAX_AVAILABILITY_RANGE_DAYS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Date range cannot exceed {MAX_AVAILABILITY_RANGE_DAYS} days"
+        )
+    
+    try:
+        slots_by_day = await di_container.availability_service.get_available_slots_range(
+            doctor_id=doctor_id,
+            start_date=start_date,
+            end_date=end_date,
+            duration_minutes=duration_minutes
+        )
+        
+        return {
+            "doctor_id": doctor_id,
+            "start_date": start_date.isoformat(),
+            "end_date": end_date.isoformat(),
+            "days": [
+                {
+                    "date": day.isoformat(),
+                    "available_slots": [
+                        {
+                            "start_time": slot.start_time.isoformat(),
+                            "end_time": slot.end_time.isoformat()
+                        }
+                        for slot in slots
+                    ]
+                }
+                for day, slots in slots_by_day.items()
+            ]
+        }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error checking availability range: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
 @app.get("/appointments/{appointment_id}", response_model=AppointmentResponseDTO)
 async def get_appointment(appointment_id: str):
     """
@@ -505,6 +813,8 @@ async def update_appointment(
         return AppointmentResponseDTO.from_domain(appointment)
     except HTTPException:
         raise
+    except SlotUnavailableError as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -0,0 +1,225 @@
+# Tests for the bitmap availability engine
+# Run from services/appointment-service: python -m pytest tests
+
+import asyncio
+import random
+from datetime import date, time, timedelta
+
+import pytest
+
+from application.services import AvailabilityService, DoctorScheduleCache
+from domain.availability import (
+    DEFAULT_WORKING_MASK,
+    MINUTES_PER_DAY,
+    SLOT_STEP_MINUTES,
+    DayOccupancy,
+    ScheduleTemplate,
+    interval_mask,
+    minute_of_day
+)
+
+FULL_DAY_MASK = interval_mask(0, MINUTES_PER_DAY)
+
+def brute_force_starts(bookings, duration, working_mask, step=SLOT_STEP_MINUTES):
+    """Enumerate every grid start and check its minutes one by one"""
+    booked = set()
+    for start, end in bookings:
+        booked.update(range(start, end))
+    working = {minute for minute in range(MINUTES_PER_DAY) if working_mask >> minute & 1}
+    return [
+        start
+        for start in range(0, MINUTES_PER_DAY, step)
+        if start + duration <= MINUTES_PER_DAY
+        and all(minute in working and minute not in booked
+                for minute in range(start, start + duration))
+    ]
+
+def assert_matches_brute_force(bookings, duration, working_mask=DEFAULT_WORKING_MASK):
+    occupancy = DayOccupancy.from_intervals(bookings)
+    expected = brute_force_starts(bookings, duration, working_mask)
+
+    assert occupancy.free_starts(duration, working_mask) == expected
+    assert occupancy.free_summary(duration, working_mask) == (
+        len(expected), expected[0] if expected else None
+    )
+
+def test_empty_day_follows_working_windows():
+    starts = DayOccupancy().free_starts(30)
+
+    assert starts[0] == 8 * 60
+    assert starts[-1] == 17 * 60 + 30
+    assert 12 * 60 + 30 in starts and 12 * 60 + 45 not in starts  # lunch
+    assert_matches_brute_force([], 30)
+
+@pytest.mark.parametrize("bookings", [
+    [(9 * 60, 9 * 60 + 30), (9 * 60 + 30, 10 * 60)],          # touching
+    [(9 * 60, 9 * 60 + 30), (10 * 60, 10 * 60 + 15)],          # gap shorter than the slot
+    [(9 * 60 + 7, 9 * 60 + 22)],                               # off the slot grid
+    [(8 * 60, 17 * 60)],                                       # longer than the slot
+    [(12 * 60 + 45, 14 * 60 + 15)]                             # across the lunch break
+])
+@pytest.mark.parametrize("duration", [15, 30, 45, 60, 90])
+def test_bookings_match_brute_force(bookings, duration):
+    assert_matches_brute_force(bookings, duration)
+
+@pytest.mark.parametrize("bookings", [
+    [(0, 30)],                                  # starts at midnight
+    [(MINUTES_PER_DAY - 30, MINUTES_PER_DAY)],  # ends at midnight
+    [(0, 15), (MINUTES_PER_DAY - 15, MINUTES_PER_DAY)]
+])
+@pytest.mark.parametrize("duration", [15, 30, 60])
+def test_bookings_at_midnight_match_brute_force(bookings, duration):
+    assert_matches_brute_force(bookings, duration, FULL_DAY_MASK)
+
+def test_slot_never_runs_past_the_end_of_the_day():
+    starts = DayOccupancy().free_starts(60, FULL_DAY_MASK)
+
+    assert starts[-1] == MINUTES_PER_DAY - 60
+
+def test_release_frees_only_the_released_interval():
+    occupancy = DayOccupancy.from_intervals([(9 * 60, 10 * 60), (10 * 60, 11 * 60)])
+    occupancy.release(9 * 60, 10 * 60)
+
+    assert occupancy.is_free(9 * 60, 10 * 60)
+    assert not occupancy.is_free(10 * 60 + 59, 11 * 60)
+    assert_matches_brute_force([(10 * 60, 11 * 60)], 30)
+
+def test_non_positive_duration_has_no_slots():
+    assert DayOccupancy().free_starts(0) == []
+    assert DayOccupancy().free_summary(-15) == (0, None)
+
+def test_random_days_match_brute_force():
+    rng = random.Random(20240601)
+    for _ in range(200):
+        bookings = []
+        for _ in range(rng.randint(0, 8)):
+            start = rng.randrange(0, MINUTES_PER_DAY - 1)
+            bookings.append((start, min(MINUTES_PER_DAY, start + rng.randint(1, 180))))
+        working_mask = rng.choice([DEFAULT_WORKING_MASK, FULL_DAY_MASK])
+        assert_matches_brute_force(bookings, rng.choice([15, 20, 30, 45, 120]), working_mask)
+
+def test_bitmap_round_trip():
+    occupancy = DayOccupancy.from_intervals([
+        (0, 1), (9 * 60, 9 * 60 + 45), (MINUTES_PER_DAY - 1, MINUTES_PER_DAY)
+    ])
+
+    assert DayOccupancy.from_bitmap(occupancy.to_bitmap()).bits == occupancy.bits
+    # MSB-first per byte, like Redis SETBIT: minute 0 is the top bit
+    assert occupancy.to_bitmap()[0] == 0x80
+
+class BookedIntervalsRepository:
+    def __init__(self, booked):
+        self.booked = booked  # (date, start time, end time), ordered by date
+
+    async def find_booked_intervals(self, doctor_id, start_date, end_date):
+        return [row for row in self.booked if start_date <= row[0] <= end_date]
+
+class FixedScheduleCache:
+    def __init__(self, schedule):
+        self.schedule = schedule
+
+    async def get(self, doctor_id):
+        return self.schedule
+
+def random_week(rng, start_date):
+    booked = []
+    for offset in range(7):
+        day = start_date + timedelta(days=offset)
+        for _ in range(rng.randint(0, 5)):
+            start = rng.randrange(7 * 60, 18 * 60, 5)
+            end = min(start + rng.choice([15, 30, 45, 120]), MINUTES_PER_DAY - 1)
+            booked.append((day, time(start // 60, start % 60), time(end // 60, end % 60)))
+    return booked
+
+def expected_by_day(booked, schedule, start_date, days, duration):
+    expected = {}
+    for offset in range(days):
+        day = start_date + timedelta(days=offset)
+        intervals = [
+            (minute_of_day(start), minute_of_day(end))
+            for booked_date, start, end in booked if booked_date == day
+        ]
+        expected[day] = brute_force_starts(intervals, duration, schedule.working_mask(day))
+    return expected
+
+def test_range_matches_brute_force_per_day():
+    rng = random.Random(7)
+    start_date = date(2030, 1, 7)  # Monday
+    schedule = ScheduleTemplate.compile(
+        ["Monday", "Tuesday", "Thursday", "Saturday"],
+        {"start": "07:30", "end": "16:00", "Saturday": {"start": "09:00", "end": "12:00"}}
+    )
+    schedule_cache = FixedScheduleCache(schedule)
+
+    for _ in range(20):
+        booked = random_week(rng, start_date)
+        duration = rng.choice([15, 30, 60])
+        service = AvailabilityService(
+            BookedIntervalsRepository(booked), schedule_cache=schedule_cache
+        )
+
+        slots_by_day = asyncio.run(service.get_available_slots_range(
+            "doctor", start_date, start_date + timedelta(days=6), duration
+        ))
+
+        assert {
+            day: [slot.start_minute for slot in slots] for day, slots in slots_by_day.items()
+        } == expected_by_day(booked, schedule, start_date, 7, duration)
+        assert all(
+            slot.duration_minutes == duration
+            for slots in slots_by_day.values() for slot in slots
+        )
+
+def test_summaries_match_brute_force_per_day():
+    rng = random.Random(11)
+    start_date = date(2030, 1, 7)
+    doctor = {'id': "doctor", 'available_days': ["Monday", "Wednesday", "Sunday"]}
+    schedule = ScheduleTemplate.compile(doctor['available_days'])
+    service = AvailabilityService(None, schedule_cache=DoctorScheduleCache())
+
+    for _ in range(20):
+        booked = random_week(rng, start_date)
+        summaries = service.summarize_free_days(
+            doctor, booked, start_date, start_date + timedelta(days=6), 30
+        )
+
+        expected = expected_by_day(booked, schedule, start_date, 7, 30)
+        assert summaries == [
+            {
+                "date": day.isoformat(),
+                "day": day.strftime("%A"),
+                "slots_count": len(starts),
+                "first_slot": time(starts[0] // 60, starts[0] % 60).isoformat()
+            }
+            for day, starts in expected.items() if starts
+        ]
+
+def test_range_rejects_reversed_dates_and_non_positive_duration():
+    service = AvailabilityService(BookedIntervalsRepository([]))
+
+    with pytest.raises(ValueError):
+        asyncio.run(service.get_available_slots_range(
+            "doctor", date(2030, 1, 8), date(2030, 1, 7)
+        ))
+    with pytest.raises(ValueError):
+        asyncio.run(service.get_available_slots_range(
+            "doctor", date(2030, 1, 7), date(2030, 1, 8), duration_minutes=-30
+        ))
+
+def test_only_missing_available_days_means_the_default_days():
+    monday, saturday = date(2030, 1, 7), date(2030, 1, 12)
+
+    default = ScheduleTemplate.compile(None)
+    assert default.works_on(monday) and not default.works_on(saturday)
+
+    # Empty list, the column default: no working day, as /doctors filters it
+    nowhere = ScheduleTemplate.compile([])
+    assert not nowhere.works_on(monday) and not nowhere.works_on(saturday)
+
+def test_search_rejects_non_positive_duration():
+    service = AvailabilityService(BookedIntervalsRepository([]), doctor_repository=object())
+
+    with pytest.raises(ValueError):
+        asyncio.run(service.search_available_slots(
+            None, date(2030, 1, 7), date(2030, 1, 8), duration_minutes=0
+        ))
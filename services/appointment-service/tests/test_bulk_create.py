@@ -0,0 +1,108 @@
+# Tests for bulk appointment creation and its per-item results
+# Run from services/appointment-service: python -m pytest tests
+
+import asyncio
+from datetime import date, time, timedelta
+
+from application.use_cases import BulkCreateAppointmentsUseCase
+from domain.entities import SlotUnavailableError
+from interfaces.dto import BulkAppointmentResponseDTO
+
+DOCTOR_ID = "987f6543-e21b-12d3-a456-426614174000"
+DAY = date.today() + timedelta(days=7)
+
+class ValidationService:
+    """Rejects items without a patient, accepts everything else"""
+
+    def validate_appointment_data(self, data):
+        return bool(data.get('patient_id'))
+
+    def validate_business_rules(self, appointment, schedule=None):
+        return True
+
+    async def get_schedule(self, doctor_id):
+        return None
+
+class Repository:
+    def __init__(self, booked=(), conflict=False):
+        self.booked = list(booked)  # (doctor_id, date, start, end)
+        self.conflict = conflict
+        self.saved = []
+
+    async def find_booked_intervals_for_doctors(self, doctor_ids, start_date, end_date):
+        return [row for row in self.booked if row[0] in doctor_ids]
+
+    async def save_many(self, appointments):
+        if self.conflict:
+            raise SlotUnavailableError("Time slot is not available")
+        self.saved.extend(appointments)
+        return appointments
+
+class Publisher:
+    def __init__(self):
+        self.events = []
+
+    async def publish(self, event_type, data):
+        self.events.append((event_type, data))
+
+def item(start: str, patient_id="123e4567-e89b-12d3-a456-426614174000"):
+    return {
+        'patient_id': patient_id,
+        'doctor_id': DOCTOR_ID,
+        'appointment_date': DAY,
+        'appointment_time': start,
+        'duration_minutes': 30,
+        'reason': "Control"
+    }
+
+def bulk_create(items, repository=None):
+    repository = repository or Repository()
+    publisher = Publisher()
+    use_case = BulkCreateAppointmentsUseCase(repository, ValidationService(), publisher)
+    return asyncio.run(use_case.execute(items)), repository, publisher
+
+def test_failures_do_not_block_other_items():
+    results, repository, publisher = bulk_create(
+        [
+            item("09:00"),
+            item("09:00", patient_id=""),  # invalid
+            item("09:15"),                 # overlaps the first item
+            item("10:00"),                 # overlaps an existing booking
+            item("11:00")
+        ],
+        Repository(booked=[(DOCTOR_ID, DAY, time(10, 0), time(10, 30))])
+    )
+
+    assert [result['index'] for result in results] == [0, 1, 2, 3, 4]
+    assert [result['status'] for result in results] == [
+        'created', 'failed', 'failed', 'failed', 'created'
+    ]
+    assert results[1]['error'] == "Invalid appointment data"
+    assert results[2]['error'] == results[3]['error'] == "Time slot is not available"
+    assert [apt.time_slot.start_time for apt in repository.saved] == [time(9, 0), time(11, 0)]
+    ((event_type, data),) = publisher.events
+    assert event_type == 'appointment.bulk_created'
+    assert data['appointment_ids'] == [str(apt.id) for apt in repository.saved]
+
+def test_concurrent_conflict_fails_every_accepted_item():
+    results, repository, publisher = bulk_create(
+        [item("09:00"), item("09:00", patient_id=""), item("11:00")],
+        Repository(conflict=True)
+    )
+
+    assert [result['status'] for result in results] == ['failed', 'failed', 'failed']
+    assert results[0]['error'] == results[2]['error'] == "Time slot is not available"
+    assert results[1]['error'] == "Invalid appointment data"
+    assert publisher.events == []
+
+def test_response_reports_each_item_and_the_totals():
+    results, repository, _ = bulk_create([item("09:00"), item("09:15"), item("11:00")])
+
+    response = BulkAppointmentResponseDTO.from_results(results)
+
+    assert (response.created, response.failed) == (2, 1)
+    assert [entry.status for entry in response.results] == ['created', 'failed', 'created']
+    assert response.results[0].appointment.id == str(repository.saved[0].id)
+    assert response.results[0].error is None
+    assert response.results[1].appointment is None
+    assert response.results[1].error == "Time slot is not available"
@@ -0,0 +1,105 @@
+# Tests for the cache codecs
+# Run from services/appointment-service: python -m pytest tests
+
+from datetime import date, datetime, time, timezone
+
+import pytest
+
+from domain.entities import Appointment, AppointmentStatus
+from domain.value_objects import AppointmentId, PatientId, DoctorId, TimeSlot
+from infrastructure.cache_codec import BinaryCodec, JsonCodec, create_codec
+
+CODECS = [BinaryCodec(), JsonCodec()]
+
+def make_appointment(**overrides) -> Appointment:
+    fields = dict(
+        id=AppointmentId.restore("550e8400-e29b-41d4-a716-446655440000"),
+        patient_id=PatientId.restore("123e4567-e89b-12d3-a456-426614174000"),
+        doctor_id=DoctorId.restore("987f6543-e21b-12d3-a456-426614174000"),
+        appointment_date=date(2024, 3, 4),
+        time_slot=TimeSlot(time(9, 0), time(9, 45)),
+        status=AppointmentStatus.SCHEDULED,
+        reason=None,
+        notes=None,
+        created_at=datetime(2024, 3, 1, 8, 30, 15, 123456),
+        updated_at=datetime(2024, 3, 1, 8, 30, 15, 123456),
+        cancelled_at=None,
+        cancellation_reason=None,
+        series_id=None
+    )
+    fields.update(overrides)
+    return Appointment.restore(**fields)
+
+def assert_same(decoded: Appointment, original: Appointment):
+    assert decoded.to_dict() == original.to_dict()
+    assert decoded.time_slot == original.time_slot
+    assert decoded.created_at == original.created_at
+    assert decoded.cancelled_at == original.cancelled_at
+
+@pytest.mark.parametrize("codec", CODECS, ids=["binary", "json"])
+def test_none_fields_round_trip(codec):
+    appointment = make_appointment()
+
+    decoded = codec.decode_appointment(codec.encode_appointment(appointment))
+
+    assert_same(decoded, appointment)
+    assert decoded.reason is None and decoded.notes is None and decoded.series_id is None
+
+@pytest.mark.parametrize("codec", CODECS, ids=["binary", "json"])
+def test_cancelled_appointment_round_trips(codec):
+    appointment = make_appointment(
+        status=AppointmentStatus.CANCELLED,
+        reason="Control",
+        notes="Fasting – bring results",
+        updated_at=datetime(2024, 3, 2, 10, 0, tzinfo=timezone.utc),
+        cancelled_at=datetime(2024, 3, 2, 10, 0, tzinfo=timezone.utc),
+        cancellation_reason="Patient request"
+    )
+
+    decoded = codec.decode_appointment(codec.encode_appointment(appointment))
+
+    assert_same(decoded, appointment)
+    assert decoded.status is AppointmentStatus.CANCELLED
+    assert decoded.cancelled_at.tzinfo is not None
+    assert decoded.created_at.tzinfo is None
+
+@pytest.mark.parametrize("codec", CODECS, ids=["binary", "json"])
+def test_series_list_round_trips(codec):
+    series_id = "a1b2c3d4-0000-4000-8000-000000000001"
+    appointments = [
+        make_appointment(
+            id=AppointmentId.restore(f"550e8400-e29b-41d4-a716-44665544000{n}"),
+            appointment_date=date(2024, 3, 4 + 7 * n),
+            series_id=series_id
+        )
+        for n in range(3)
+    ]
+
+    decoded = codec.decode_appointments(codec.encode_appointments(appointments))
+
+    assert [apt.to_dict() for apt in decoded] == [apt.to_dict() for apt in appointments]
+
+def test_empty_list_round_trips():
+    codec = BinaryCodec()
+
+    assert codec.decode_appointments(codec.encode_appointments([])) == []
+
+def test_binary_codec_reads_json_entries():
+    appointment = make_appointment(reason="Control")
+
+    decoded = BinaryCodec().decode_appointment(JsonCodec().encode_appointment(appointment))
+
+    assert_same(decoded, appointment)
+
+def test_binary_codec_rejects_unknown_version():
+    data = bytearray(BinaryCodec().encode_appointment(make_appointment()))
+    data[2] = 99  # version byte, after the magic
+
+    with pytest.raises(ValueError):
+        BinaryCodec().decode_appointments(bytes(data))
+
+def test_create_codec():
+    assert isinstance(create_codec(None), BinaryCodec)
+    assert isinstance(create_codec("JSON"), JsonCodec)
+    with pytest.raises(ValueError):
+        create_codec("msgpack")
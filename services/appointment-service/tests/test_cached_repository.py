@@ -0,0 +1,167 @@
+# Tests for CachedAppointmentRepository
+# Run from services/appointment-service: python -m pytest tests
+
+import asyncio
+import copy
+from datetime import date, datetime, time, timedelta
+
+from domain.entities import Appointment, AppointmentStatus
+from domain.value_objects import AppointmentId, PatientId, DoctorId, TimeSlot
+from infrastructure.cache import InMemoryCache, LocalCache
+from infrastructure.repositories import CachedAppointmentRepository
+
+APPOINTMENT_ID = "550e8400-e29b-41d4-a716-446655440000"
+DOCTOR_ID = "987f6543-e21b-12d3-a456-426614174000"
+CACHE_KEY = f"appointment:{APPOINTMENT_ID}"
+
+class GatedRepository:
+    """
+    Holds one appointment row
+    A load reads the row, then waits on gate (when set) before returning,
+    like a query whose result is still in flight when a write commits
+    """
+
+    def __init__(self, appointment: Appointment):
+        self.appointment = appointment
+        self.gate = None
+        self.loading = asyncio.Event()
+        self.reads = 0
+
+    async def find_by_id(self, appointment_id, primary: bool = False):
+        self.reads += 1
+        value = copy.copy(self.appointment)
+        if self.gate is not None:
+            gate, self.gate = self.gate, None
+            self.loading.set()
+            await gate.wait()
+        return value
+
+    async def find_by_doctor_and_date(self, doctor_id, appointment_date, primary: bool = False):
+        self.reads += 1
+        if self.appointment.appointment_date != appointment_date:
+            return []
+        return [copy.copy(self.appointment)]
+
+    async def update(self, appointment: Appointment, previous_date=None) -> Appointment:
+        self.appointment = copy.copy(appointment)
+        return appointment
+
+def make_appointment(reason: str, days_ahead: int = 1) -> Appointment:
+    created_at = datetime.utcnow()
+    return Appointment.restore(
+        id=AppointmentId.restore(APPOINTMENT_ID),
+        patient_id=PatientId.restore("123e4567-e89b-12d3-a456-426614174000"),
+        doctor_id=DoctorId.restore(DOCTOR_ID),
+        appointment_date=date.today() + timedelta(days=days_ahead),
+        time_slot=TimeSlot(time(9, 0), time(9, 30)),
+        status=AppointmentStatus.SCHEDULED,
+        reason=reason,
+        notes=None,
+        created_at=created_at,
+        updated_at=created_at,
+        cancelled_at=None,
+        cancellation_reason=None,
+        series_id=None
+    )
+
+def make_repository(appointment: Appointment):
+    repository = GatedRepository(appointment)
+    cached = CachedAppointmentRepository(
+        repository,
+        InMemoryCache(),
+        local_cache=LocalCache(),
+        early_refresh_beta=0
+    )
+    return repository, cached
+
+def test_miss_fills_both_tiers():
+    async def scenario():
+        repository, cached = make_repository(make_appointment("Control"))
+
+        found = await cached.find_by_id(AppointmentId.restore(APPOINTMENT_ID))
+
+        assert found.reason == "Control"
+        assert await cached.cache.get(CACHE_KEY) is not None
+        assert cached.local_cache.get(CACHE_KEY) is not None
+
+    asyncio.run(scenario())
+
+def test_load_finishing_after_invalidation_is_not_stored():
+    async def scenario():
+        repository, cached = make_repository(make_appointment("Control"))
+        gate = repository.gate = asyncio.Event()
+
+        # load reads the old row ...
+        load = asyncio.create_task(cached.find_by_id(AppointmentId.restore(APPOINTMENT_ID)))
+        await repository.loading.wait()
+        # ... a write commits and invalidates ...
+        await cached.update(make_appointment("Follow-up"))
+        # ... then the load stores its result
+        gate.set()
+        stale = await load
+
+        assert stale.reason == "Control"
+        assert await cached.cache.get(CACHE_KEY) is None
+        assert cached.local_cache.get(CACHE_KEY) is None
+        found = await cached.find_by_id(AppointmentId.restore(APPOINTMENT_ID))
+        assert found.reason == "Follow-up"
+
+    asyncio.run(scenario())
+
+def test_other_worker_does_not_take_racing_fill_into_local_cache():
+    async def scenario():
+        repository, cached = make_repository(make_appointment("Control"))
+        other = CachedAppointmentRepository(
+            repository,
+            cached.cache,
+            local_cache=LocalCache(),
+            early_refresh_beta=0
+        )
+        gate = repository.gate = asyncio.Event()
+
+        load = asyncio.create_task(cached.find_by_id(AppointmentId.restore(APPOINTMENT_ID)))
+        await repository.loading.wait()
+        await cached.update(make_appointment("Follow-up"))
+        gate.set()
+        await load
+
+        # The invalidation message went out before the racing load ended;
+        # the other worker must still never see the old row
+        found = await other.find_by_id(AppointmentId.restore(APPOINTMENT_ID))
+        assert found.reason == "Follow-up"
+        assert other.local_cache.get(CACHE_KEY).reason == "Follow-up"
+
+    asyncio.run(scenario())
+
+def test_undecodable_entry_is_reloaded_as_a_miss():
+    async def scenario():
+        repository, cached = make_repository(make_appointment("Control"))
+        data = bytearray(cached.codec.encode_appointment(make_appointment("Old")))
+        data[2] = 99  # unknown codec version
+        await cached.cache.setex(CACHE_KEY, 60, bytes(data))
+
+        found = await cached.find_by_id(AppointmentId.restore(APPOINTMENT_ID))
+
+        assert found.reason == "Control"
+        stored = cached.codec.decode_appointment(await cached.cache.get(CACHE_KEY))
+        assert stored.reason == "Control"
+
+    asyncio.run(scenario())
+
+def test_reschedule_invalidates_both_days_without_reading_the_row():
+    async def scenario():
+        original = make_appointment("Control")
+        repository, cached = make_repository(original)
+        old_day, new_day = original.appointment_date, original.appointment_date + timedelta(days=1)
+        doctor = DoctorId.restore(DOCTOR_ID)
+        assert len(await cached.find_by_doctor_and_date(doctor, old_day)) == 1
+        assert await cached.find_by_doctor_and_date(doctor, new_day) == []
+        reads = repository.reads
+
+        await cached.update(make_appointment("Control", days_ahead=2), previous_date=old_day)
+
+        assert repository.reads == reads
+        assert await cached.find_by_doctor_and_date(doctor, old_day) == []
+        assert len(await cached.find_by_doctor_and_date(doctor, new_day)) == 1
+
+    asyncio.run(scenario())
@@ -0,0 +1,130 @@
+# Tests for the in-memory doctor directory and its snapshot paging
+# Run from services/appointment-service: python -m pytest tests
+
+import asyncio
+import json
+from datetime import datetime
+
+import pytest
+
+from application.services import DoctorDirectory, DoctorDirectorySnapshot
+
+def doctor(name: str, specialty: str, days):
+    # available_days as asyncpg returns JSONB, a string
+    return {'id': name, 'name': name, 'specialty': specialty, 'available_days': json.dumps(days)}
+
+DOCTORS = [
+    doctor("Ana", "Cardiology", ["Monday", "Wednesday"]),
+    doctor("Bruno", "Pediatric Cardiology", ["Tuesday"]),
+    doctor("Carla", "Dermatology", ["Monday"]),
+    doctor("Diego", "cardiology", ["Monday", "Friday"]),
+    doctor("Elena", None, ["Monday"]),
+    doctor("Fabio", "Neurology", [])
+]
+
+def brute_force_page(specialty, available_day, limit, offset):
+    """Filter row by row, like the repository's SQL"""
+    matches = [
+        row for row in DOCTORS
+        if (not specialty or specialty.lower() in (row['specialty'] or '').lower())
+        and (not available_day or available_day in json.loads(row['available_days']))
+    ]
+    return matches[offset:offset + limit], len(matches)
+
+@pytest.mark.parametrize("specialty", [None, "", "cardio", "CARDIOLOGY", "logy", "x-ray"])
+@pytest.mark.parametrize("available_day", [None, "Monday", "Tuesday", "Sunday"])
+def test_snapshot_filters_match_brute_force(specialty, available_day):
+    snapshot = DoctorDirectorySnapshot(DOCTORS)
+
+    assert snapshot.find_page(specialty, available_day, limit=100) == brute_force_page(
+        specialty, available_day, 100, 0
+    )
+
+@pytest.mark.parametrize("limit, offset", [(2, 0), (2, 2), (2, 4), (4, 5), (3, 10)])
+def test_snapshot_pages_keep_the_repository_order(limit, offset):
+    snapshot = DoctorDirectorySnapshot(DOCTORS)
+
+    assert snapshot.find_page(limit=limit, offset=offset) == brute_force_page(
+        None, None, limit, offset
+    )
+    assert snapshot.find_page("cardio", limit=limit, offset=offset) == brute_force_page(
+        "cardio", None, limit, offset
+    )
+
+class DoctorRepository:
+    def __init__(self, doctors, version=(0, None)):
+        self.doctors = doctors
+        self.version = version
+        self.loads = 0
+        self.page_queries = 0
+        self.loading = None  # set to an asyncio.Event to hold find_all
+
+    async def get_version(self):
+        return self.version
+
+    async def find_all(self):
+        self.loads += 1
+        if self.loading is not None:
+            await self.loading.wait()
+        return list(self.doctors)
+
+    async def find_page(self, specialty=None, available_day=None, limit=20, offset=0):
+        self.page_queries += 1
+        return brute_force_page(specialty, available_day, limit, offset)
+
+def test_pages_come_from_the_database_until_loaded():
+    async def scenario():
+        repository = DoctorRepository(DOCTORS)
+        directory = DoctorDirectory(repository, refresh_interval=0)
+
+        assert await directory.find_page(limit=2) == brute_force_page(None, None, 2, 0)
+        assert repository.page_queries == 1
+
+        await directory.start()
+        assert await directory.find_page(limit=2) == brute_force_page(None, None, 2, 0)
+        assert repository.page_queries == 1
+
+    asyncio.run(scenario())
+
+def test_change_during_reload_triggers_another_reload():
+    async def scenario():
+        repository = DoctorRepository(DOCTORS[:1])
+        directory = DoctorDirectory(repository, refresh_interval=0)
+        await directory.start()
+
+        repository.loading = asyncio.Event()
+        directory.invalidate()
+        await asyncio.sleep(0)
+        # Second notification while the first reload is still reading rows
+        repository.doctors = DOCTORS
+        directory.invalidate()
+        await directory.find_page()
+        assert repository.page_queries == 1
+
+        repository.loading.set()
+        await directory._reload
+        assert repository.loads == 3
+        assert await directory.find_page(limit=100) == brute_force_page(None, None, 100, 0)
+        assert repository.page_queries == 1
+
+    asyncio.run(scenario())
+
+def test_version_check_reloads_only_on_change():
+    async def scenario():
+        repository = DoctorRepository(DOCTORS[:1], version=(1, datetime(2030, 1, 7, 9, 0)))
+        directory = DoctorDirectory(repository, refresh_interval=0.001)
+        await directory.start()
+
+        await asyncio.sleep(0.02)
+        assert repository.loads == 1
+
+        # A change whose notification was lost
+        repository.doctors = DOCTORS
+        repository.version = (len(DOCTORS), datetime(2030, 1, 7, 9, 5))
+        await asyncio.sleep(0.02)
+        await directory.stop()
+
+        assert repository.loads == 2
+        assert (await directory.find_page(limit=100))[1] == len(DOCTORS)
+
+    asyncio.run(scenario())
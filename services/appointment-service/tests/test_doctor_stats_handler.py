@@ -0,0 +1,116 @@
+# Tests for DoctorStatsEventHandler
+# Run from services/appointment-service: python -m pytest tests
+
+import asyncio
+from datetime import date, datetime, time, timedelta, timezone
+
+from application.use_cases import _slot_snapshot, _status_change
+from domain.entities import Appointment, AppointmentStatus
+from domain.value_objects import AppointmentId, PatientId, DoctorId, TimeSlot
+from infrastructure.messaging import DoctorStatsEventHandler, Event, EventType
+
+DOCTOR_ID = "987f6543-e21b-12d3-a456-426614174000"
+
+class RecordingStatsRepository:
+    """Keeps the applied deltas"""
+
+    def __init__(self):
+        self.deltas = []
+
+    async def apply(self, *deltas):
+        self.deltas.append(deltas)
+
+def make_appointment(created_at: datetime, doctor_id: str = DOCTOR_ID) -> Appointment:
+    return Appointment.restore(
+        id=AppointmentId.restore("550e8400-e29b-41d4-a716-446655440000"),
+        patient_id=PatientId.restore("123e4567-e89b-12d3-a456-426614174000"),
+        doctor_id=DoctorId.restore(doctor_id),
+        appointment_date=date.today() + timedelta(days=1),
+        time_slot=TimeSlot(time(9, 0), time(9, 45)),
+        status=AppointmentStatus.SCHEDULED,
+        reason="Control",
+        notes=None,
+        created_at=created_at,
+        updated_at=created_at,
+        cancelled_at=None,
+        cancellation_reason=None,
+        series_id=None
+    )
+
+def handle(event_type: EventType, data) -> RecordingStatsRepository:
+    repository = RecordingStatsRepository()
+    handler = DoctorStatsEventHandler(repository)
+    asyncio.run(handler.handle(Event(event_type, "550e8400-e29b-41d4-a716-446655440000", data)))
+    return repository
+
+def change_status(appointment: Appointment, status: AppointmentStatus):
+    previous = _slot_snapshot(appointment)
+    appointment.update_status(status)
+    return _status_change(appointment, previous)
+
+def test_created_counts_scheduled_appointment():
+    appointment = make_appointment(datetime.utcnow())
+
+    repository = handle(EventType.APPOINTMENT_CREATED, appointment.to_dict())
+
+    ((delta,),) = repository.deltas
+    assert delta.doctor_id == DOCTOR_ID
+    assert delta.status_counts == {'scheduled': 1}
+    assert delta.duration_minutes == 45
+    assert delta.first_date == delta.last_date == appointment.appointment_date
+
+def test_status_change_moves_one_appointment():
+    appointment = make_appointment(datetime.utcnow())
+
+    repository = handle(
+        EventType.APPOINTMENT_CONFIRMED,
+        change_status(appointment, AppointmentStatus.CONFIRMED)
+    )
+
+    ((delta,),) = repository.deltas
+    assert delta.status_counts == {'scheduled': -1, 'confirmed': 1}
+    assert delta.duration_minutes == 0
+    assert delta.completion_seconds == 0
+
+def test_completion_of_stored_appointment_mixes_aware_and_naive_timestamps():
+    # created_at as read back from the timestamptz column, updated_at as
+    # set by the entity (naive UTC)
+    created_at = datetime.now(timezone.utc) - timedelta(hours=2)
+    appointment = make_appointment(created_at)
+    appointment.update_status(AppointmentStatus.CONFIRMED)
+
+    repository = handle(
+        EventType.APPOINTMENT_COMPLETED,
+        change_status(appointment, AppointmentStatus.COMPLETED)
+    )
+
+    ((delta,),) = repository.deltas
+    assert delta.status_counts == {'confirmed': -1, 'completed': 1}
+    assert 7190 < delta.completion_seconds < 7210
+
+def test_event_without_snapshots_applies_nothing():
+    repository = handle(
+        EventType.APPOINTMENT_CANCELLED,
+        {'appointment_id': "550e8400-e29b-41d4-a716-446655440000", 'doctor_id': DOCTOR_ID}
+    )
+
+    assert repository.deltas == []
+
+def test_bulk_created_applies_one_delta_per_doctor_in_one_call():
+    other_doctor = "887f6543-e21b-12d3-a456-426614174000"
+    appointments = [
+        make_appointment(datetime.utcnow()),
+        make_appointment(datetime.utcnow()),
+        make_appointment(datetime.utcnow(), other_doctor)
+    ]
+
+    repository = handle(
+        EventType.APPOINTMENTS_BULK_CREATED,
+        {'appointments': [apt.to_dict() for apt in appointments]}
+    )
+
+    (deltas,) = repository.deltas
+    by_doctor = {delta.doctor_id: delta for delta in deltas}
+    assert by_doctor[DOCTOR_ID].status_counts == {'scheduled': 2}
+    assert by_doctor[DOCTOR_ID].duration_minutes == 90
+    assert by_doctor[other_doctor].status_counts == {'scheduled': 1}
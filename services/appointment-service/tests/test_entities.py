@@ -0,0 +1,57 @@
+# Tests for the Appointment entity
+# Run from services/appointment-service: python -m pytest tests
+
+from datetime import date, datetime, time, timedelta, timezone
+
+import pytest
+
+from domain.entities import Appointment, AppointmentStatus
+from domain.value_objects import AppointmentId, PatientId, DoctorId, TimeSlot
+
+def restore_past_cancelled() -> Appointment:
+    return Appointment.restore(
+        id=AppointmentId.restore("550e8400-e29b-41d4-a716-446655440000"),
+        patient_id=PatientId.restore("123e4567-e89b-12d3-a456-426614174000"),
+        doctor_id=DoctorId.restore("987f6543-e21b-12d3-a456-426614174000"),
+        appointment_date=date.today() - timedelta(days=30),
+        time_slot=TimeSlot(time(9, 0), time(9, 30)),
+        status=AppointmentStatus.CANCELLED,
+        created_at=datetime(2024, 1, 2, 8, 0, tzinfo=timezone.utc),
+        updated_at=datetime(2024, 1, 3, 8, 0, tzinfo=timezone.utc),
+        reason="Control",
+        cancelled_at=datetime(2024, 1, 3, 8, 0, tzinfo=timezone.utc),
+        cancellation_reason="Patient request"
+    )
+
+def test_restore_accepts_past_rows_and_round_trips_through_to_dict():
+    appointment = restore_past_cancelled()
+
+    data = appointment.to_dict()
+    restored = Appointment.from_dict(data)
+
+    assert restored.to_dict() == data
+    assert restored.appointment_date < date.today()
+    assert restored.created_at == appointment.created_at
+    assert restored.cancelled_at == appointment.cancelled_at
+
+def test_restore_requires_timestamps():
+    with pytest.raises(TypeError):
+        Appointment.restore(
+            id=AppointmentId.restore("550e8400-e29b-41d4-a716-446655440000"),
+            patient_id=PatientId.restore("123e4567-e89b-12d3-a456-426614174000"),
+            doctor_id=DoctorId.restore("987f6543-e21b-12d3-a456-426614174000"),
+            appointment_date=date.today(),
+            time_slot=TimeSlot(time(9, 0), time(9, 30)),
+            status=AppointmentStatus.SCHEDULED
+        )
+
+def test_new_appointment_in_the_past_is_rejected():
+    with pytest.raises(ValueError):
+        Appointment(
+            id=AppointmentId(""),
+            patient_id=PatientId.restore("123e4567-e89b-12d3-a456-426614174000"),
+            doctor_id=DoctorId.restore("987f6543-e21b-12d3-a456-426614174000"),
+            appointment_date=date.today() - timedelta(days=1),
+            time_slot=TimeSlot(time(9, 0), time(9, 30)),
+            status=AppointmentStatus.SCHEDULED
+        )
@@ -0,0 +1,73 @@
+# Tests for keyset pagination cursors and filter statements
+# Run from services/appointment-service: python -m pytest tests
+
+import base64
+import uuid
+from datetime import date, time
+
+import pytest
+
+from infrastructure.repositories import PostgreSQLAppointmentRepository as Repository
+
+def make_row(appointment_date: date, start_time: time, appointment_id=None):
+    # asyncpg returns uuid columns as uuid.UUID
+    return {
+        'appointment_date': appointment_date,
+        'start_time': start_time,
+        'id': appointment_id or uuid.uuid4()
+    }
+
+def test_cursor_round_trips_the_keyset_position():
+    row = make_row(date(2030, 1, 7), time(9, 30))
+
+    assert Repository.decode_cursor(Repository.encode_cursor(row)) == (
+        date(2030, 1, 7), time(9, 30), str(row['id'])
+    )
+
+def test_cursor_is_url_safe():
+    cursor = Repository.encode_cursor(make_row(date(2030, 1, 7), time(9, 30, 15)))
+
+    assert all(c.isalnum() or c in "-_=" for c in cursor)
+
+@pytest.mark.parametrize("cursor", [
+    "",
+    "not base64!",
+    base64.urlsafe_b64encode(b"2030-01-07|09:30").decode(),
+    base64.urlsafe_b64encode(b"2030-13-07|09:30|" + str(uuid.uuid4()).encode()).decode(),
+    base64.urlsafe_b64encode(b"2030-01-07|25:00|" + str(uuid.uuid4()).encode()).decode(),
+    base64.urlsafe_b64encode(b"2030-01-07|09:30|not-a-uuid").decode(),
+    base64.urlsafe_b64encode(b"\xff\xfe").decode()
+])
+def test_invalid_cursor_is_a_value_error(cursor):
+    with pytest.raises(ValueError, match="Invalid pagination cursor"):
+        Repository.decode_cursor(cursor)
+
+def test_pages_follow_each_other_without_gaps_or_repeats():
+    # Ties on date and time are broken by id, as in the ORDER BY
+    rows = sorted(
+        (make_row(date(2030, 1, 7 + n % 3), time(9 + n % 2, 0)) for n in range(25)),
+        key=Repository._keyset_of
+    )
+
+    seen, position = [], None
+    while True:
+        page = [row for row in rows if position is None or Repository._keyset_of(row) > position][:10]
+        seen.extend(page)
+        if len(page) < 10:
+            break
+        position = Repository.decode_cursor(Repository.encode_cursor(page[-1]))
+
+    assert seen == rows
+
+def test_keyset_condition_follows_filter_parameters():
+    conditions, params = Repository._build_filter_conditions({
+        'doctor_id': "987f6543-e21b-12d3-a456-426614174000",
+        'status': "scheduled"
+    })
+    position = (date(2030, 1, 7), time(9, 30), str(uuid.uuid4()))
+
+    condition = Repository._keyset_condition(position, params)
+
+    assert conditions == ["doctor_id = $1::uuid", "status = ANY($2::appointment_status[])"]
+    assert condition == "(appointment_date, start_time, id) > ($3, $4, $5::uuid)"
+    assert params[2:] == list(position)
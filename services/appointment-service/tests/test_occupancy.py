@@ -0,0 +1,160 @@
+# Tests for the materialized occupancy bitmaps and OccupancyEventHandler
+# Run from services/appointment-service: python -m pytest tests
+
+import asyncio
+from datetime import date, time
+
+from application.services import AvailabilityService, OccupancyCache
+from domain.availability import DayOccupancy
+from domain.value_objects import TimeSlot
+from infrastructure.cache import InMemoryCache
+from infrastructure.messaging import Event, EventType, OccupancyEventHandler
+
+DOCTOR_ID = "987f6543-e21b-12d3-a456-426614174000"
+DAY = date(2030, 1, 7)
+NINE = TimeSlot(time(9, 0), time(9, 30))
+TEN = TimeSlot(time(10, 0), time(10, 30))
+
+def snapshot(time_slot: TimeSlot, status: str = "scheduled"):
+    return {
+        'appointment_date': DAY.isoformat(),
+        'start_time': time_slot.start_time.isoformat(),
+        'end_time': time_slot.end_time.isoformat(),
+        'status': status
+    }
+
+def change(previous, current):
+    return {'doctor_id': DOCTOR_ID, 'previous': previous, 'current': current}
+
+async def cached_day(*booked: TimeSlot) -> OccupancyCache:
+    occupancy_cache = OccupancyCache(InMemoryCache())
+    occupancy = DayOccupancy()
+    for time_slot in booked:
+        occupancy.book(time_slot.start_minute, time_slot.end_minute)
+    token = await occupancy_cache.begin_fill(DOCTOR_ID, DAY)
+    assert await occupancy_cache.put(DOCTOR_ID, DAY, occupancy, token)
+    return occupancy_cache
+
+async def handle(occupancy_cache: OccupancyCache, event_type: EventType, data) -> DayOccupancy:
+    handler = OccupancyEventHandler(occupancy_cache)
+    assert handler.can_handle(event_type)
+    await handler.handle(Event(event_type, "550e8400-e29b-41d4-a716-446655440000", data))
+    return await occupancy_cache.get(DOCTOR_ID, DAY)
+
+def is_free(occupancy: DayOccupancy, time_slot: TimeSlot) -> bool:
+    return occupancy.is_free(time_slot.start_minute, time_slot.end_minute)
+
+def test_created_books_the_slot():
+    async def scenario():
+        occupancy_cache = await cached_day()
+        occupancy = await handle(
+            occupancy_cache,
+            EventType.APPOINTMENT_CREATED,
+            {'doctor_id': DOCTOR_ID, **snapshot(NINE)}
+        )
+        assert not is_free(occupancy, NINE)
+
+    asyncio.run(scenario())
+
+def test_completed_frees_the_slot():
+    async def scenario():
+        occupancy_cache = await cached_day(NINE)
+        occupancy = await handle(
+            occupancy_cache,
+            EventType.APPOINTMENT_COMPLETED,
+            change(snapshot(NINE, "confirmed"), snapshot(NINE, "completed"))
+        )
+        assert is_free(occupancy, NINE)
+
+    asyncio.run(scenario())
+
+def test_no_show_update_frees_the_slot():
+    async def scenario():
+        occupancy_cache = await cached_day(NINE)
+        occupancy = await handle(
+            occupancy_cache,
+            EventType.APPOINTMENT_UPDATED,
+            change(snapshot(NINE, "confirmed"), snapshot(NINE, "no_show"))
+        )
+        assert is_free(occupancy, NINE)
+
+    asyncio.run(scenario())
+
+def test_confirmed_keeps_the_slot():
+    async def scenario():
+        occupancy_cache = await cached_day(NINE)
+        occupancy = await handle(
+            occupancy_cache,
+            EventType.APPOINTMENT_CONFIRMED,
+            change(snapshot(NINE), snapshot(NINE, "confirmed"))
+        )
+        assert not is_free(occupancy, NINE)
+
+    asyncio.run(scenario())
+
+def test_reschedule_moves_the_slot():
+    async def scenario():
+        occupancy_cache = await cached_day(NINE)
+        occupancy = await handle(
+            occupancy_cache,
+            EventType.APPOINTMENT_UPDATED,
+            change(snapshot(NINE), snapshot(TEN))
+        )
+        assert is_free(occupancy, NINE)
+        assert not is_free(occupancy, TEN)
+
+    asyncio.run(scenario())
+
+def test_patch_during_fill_voids_the_fill():
+    async def scenario():
+        occupancy_cache = OccupancyCache(InMemoryCache())
+
+        token = await occupancy_cache.begin_fill(DOCTOR_ID, DAY)
+        # A booking lands after the fill read the database ...
+        await occupancy_cache.book(DOCTOR_ID, DAY, NINE)
+        # ... so the bitmap built without it must not be stored
+        stored = await occupancy_cache.put(DOCTOR_ID, DAY, DayOccupancy(), token)
+
+        assert not stored
+        assert await occupancy_cache.get(DOCTOR_ID, DAY) is None
+
+    asyncio.run(scenario())
+
+def test_newer_fill_supersedes_an_older_one():
+    async def scenario():
+        occupancy_cache = OccupancyCache(InMemoryCache())
+
+        older = await occupancy_cache.begin_fill(DOCTOR_ID, DAY)
+        newer = await occupancy_cache.begin_fill(DOCTOR_ID, DAY)
+
+        assert not await occupancy_cache.put(DOCTOR_ID, DAY, DayOccupancy(), older)
+        assert await occupancy_cache.put(DOCTOR_ID, DAY, DayOccupancy(), newer)
+        assert await occupancy_cache.get(DOCTOR_ID, DAY) is not None
+
+    asyncio.run(scenario())
+
+class BookingDuringLoadRepository:
+    """Returns no appointment, but a booking event lands while loading"""
+
+    def __init__(self, occupancy_cache: OccupancyCache):
+        self.occupancy_cache = occupancy_cache
+
+    async def find_by_doctor_and_date(self, doctor_id, appointment_date, primary: bool = False):
+        await self.occupancy_cache.book(doctor_id, appointment_date, NINE)
+        return []
+
+def test_availability_fill_racing_a_booking_is_not_cached():
+    async def scenario():
+        occupancy_cache = OccupancyCache(InMemoryCache())
+        service = AvailabilityService(
+            BookingDuringLoadRepository(occupancy_cache),
+            occupancy_cache=occupancy_cache
+        )
+
+        await service._day_occupancy(DOCTOR_ID, DAY)
+
+        # Next read recomputes from the database instead of trusting a
+        # bitmap that misses the booking
+        assert await occupancy_cache.get(DOCTOR_ID, DAY) is None
+
+    asyncio.run(scenario())
@@ -0,0 +1,54 @@
+# Tests for QueryRegistry and statement preparation
+# Run from services/appointment-service: python -m pytest tests
+
+import asyncio
+
+import pytest
+
+from infrastructure.database import PreparedConnection, QueryRegistry
+from infrastructure.repositories import FIND_DOCTOR_PROFILE, UPDATE_APPOINTMENT
+
+class RecordingConnection(PreparedConnection):
+    """PreparedConnection without a server: prepare() records the SQL"""
+
+    def __init__(self):
+        self._prepared = {}
+        self.prepared_sql = []
+
+    async def prepare(self, sql):
+        self.prepared_sql.append(sql)
+        return sql
+
+    def is_closed(self):
+        return True  # never connected, nothing to close on collection
+
+def test_read_only_is_declared_not_sniffed():
+    registry = QueryRegistry()
+    cte = registry.register("cte", "WITH x AS (SELECT 1) SELECT * FROM x", read_only=True)
+    locking = registry.register("locking", "SELECT pg_advisory_lock(1)")
+
+    assert cte.read_only
+    assert not locking.read_only
+    assert FIND_DOCTOR_PROFILE.read_only
+    assert not UPDATE_APPOINTMENT.read_only
+
+def test_reregistering_with_another_classification_fails():
+    registry = QueryRegistry()
+    registry.register("q", "SELECT 1", read_only=True)
+
+    assert registry.register("q", "SELECT 1", read_only=True).read_only
+    with pytest.raises(ValueError):
+        registry.register("q", "SELECT 1")
+
+def test_replica_connections_prepare_only_read_only_statements():
+    registry = QueryRegistry()
+    registry.register("read", "WITH x AS (SELECT 1) SELECT * FROM x", read_only=True)
+    registry.register("write", "UPDATE t SET a = 1")
+
+    replica = RecordingConnection()
+    asyncio.run(replica.prepare_registered(registry, read_only=True))
+    primary = RecordingConnection()
+    asyncio.run(primary.prepare_registered(registry))
+
+    assert replica.prepared_sql == ["WITH x AS (SELECT 1) SELECT * FROM x"]
+    assert len(primary.prepared_sql) == 2
@@ -0,0 +1,186 @@
+# Tests for RecurrenceRule and recurring series creation
+# Run from services/appointment-service: python -m pytest tests
+
+import asyncio
+from datetime import date, timedelta
+
+import pytest
+
+from application.use_cases import CreateRecurringSeriesUseCase
+from domain.entities import SlotUnavailableError
+from domain.recurrence import MAX_SERIES_OCCURRENCES, RecurrenceFrequency, RecurrenceRule
+
+DAILY = RecurrenceFrequency.DAILY
+WEEKLY = RecurrenceFrequency.WEEKLY
+MONTHLY = RecurrenceFrequency.MONTHLY
+
+def test_monthly_on_the_31st_skips_shorter_months():
+    rule = RecurrenceRule(MONTHLY, count=4)
+
+    assert list(rule.occurrences(date(2025, 1, 31))) == [
+        date(2025, 1, 31), date(2025, 3, 31), date(2025, 5, 31), date(2025, 7, 31)
+    ]
+
+def test_monthly_on_the_29th_and_30th_skips_february():
+    assert list(RecurrenceRule(MONTHLY, count=3).occurrences(date(2025, 1, 29))) == [
+        date(2025, 1, 29), date(2025, 3, 29), date(2025, 4, 29)
+    ]
+    assert list(RecurrenceRule(MONTHLY, count=2).occurrences(date(2025, 1, 30))) == [
+        date(2025, 1, 30), date(2025, 3, 30)
+    ]
+    # ... unless it is a leap year
+    assert list(RecurrenceRule(MONTHLY, count=2).occurrences(date(2024, 1, 29))) == [
+        date(2024, 1, 29), date(2024, 2, 29)
+    ]
+
+def test_monthly_interval_crosses_years():
+    rule = RecurrenceRule(MONTHLY, interval=5, count=3)
+
+    assert list(rule.occurrences(date(2025, 10, 15))) == [
+        date(2025, 10, 15), date(2026, 3, 15), date(2026, 8, 15)
+    ]
+
+def test_weekly_interval_yields_weekdays_in_order():
+    # Wednesday start, every 2 weeks on Thursday and Monday
+    rule = RecurrenceRule(WEEKLY, interval=2, weekdays=(3, 0), count=5)
+
+    assert rule.weekdays == (0, 3)
+    assert list(rule.occurrences(date(2025, 1, 1))) == [
+        date(2025, 1, 2),    # Thursday of the first week, Monday is before start
+        date(2025, 1, 13),
+        date(2025, 1, 16),
+        date(2025, 1, 27),
+        date(2025, 1, 30)
+    ]
+
+def test_weekly_without_weekdays_repeats_the_start_weekday():
+    rule = RecurrenceRule(WEEKLY, count=3)
+
+    assert list(rule.occurrences(date(2025, 1, 1))) == [
+        date(2025, 1, 1), date(2025, 1, 8), date(2025, 1, 15)
+    ]
+
+def test_until_is_inclusive_and_stops_before_count():
+    rule = RecurrenceRule(DAILY, interval=3, until=date(2025, 1, 7), count=10)
+
+    assert list(rule.occurrences(date(2025, 1, 1))) == [
+        date(2025, 1, 1), date(2025, 1, 4), date(2025, 1, 7)
+    ]
+
+def test_count_stops_before_until():
+    rule = RecurrenceRule(DAILY, until=date(2025, 12, 31), count=2)
+
+    assert list(rule.occurrences(date(2025, 1, 1))) == [date(2025, 1, 1), date(2025, 1, 2)]
+
+def test_until_alone_is_capped():
+    rule = RecurrenceRule(DAILY, until=date(2030, 1, 1))
+
+    occurrences = list(rule.occurrences(date(2025, 1, 1)))
+
+    assert len(occurrences) == MAX_SERIES_OCCURRENCES
+    assert occurrences[-1] == date(2025, 1, 1) + timedelta(days=MAX_SERIES_OCCURRENCES - 1)
+
+@pytest.mark.parametrize("kwargs", [
+    {'count': MAX_SERIES_OCCURRENCES + 1},
+    {'count': 0},
+    {'count': 1, 'interval': 0},
+    {},
+    {'count': 1, 'weekdays': (7,)}
+])
+def test_invalid_rules_are_rejected(kwargs):
+    with pytest.raises(ValueError):
+        RecurrenceRule(WEEKLY, **kwargs)
+
+def test_weekdays_only_apply_to_weekly_rules():
+    with pytest.raises(ValueError):
+        RecurrenceRule(DAILY, weekdays=(0,), count=1)
+
+def test_dict_round_trip_accepts_weekday_names():
+    rule = RecurrenceRule.from_dict({
+        'frequency': 'weekly',
+        'interval': 2,
+        'weekdays': ['thursday', 'Monday'],
+        'until': '2025-06-30'
+    })
+
+    assert rule == RecurrenceRule(WEEKLY, interval=2, weekdays=(0, 3), until=date(2025, 6, 30))
+    assert RecurrenceRule.from_dict(rule.to_dict()) == rule
+
+class AcceptingValidationService:
+    def validate_appointment_data(self, data):
+        return True
+
+    def validate_business_rules(self, appointment, schedule=None):
+        return True
+
+    async def get_schedule(self, doctor_id):
+        return None
+
+class BookedDatesAvailabilityService:
+    def __init__(self, booked):
+        self.booked = set(booked)
+
+    async def check_slots(self, doctor_id, slots):
+        return [day not in self.booked for day, _ in slots]
+
+class RecordingRepository:
+    def __init__(self):
+        self.saved = []
+
+    async def save_series(self, series, appointments):
+        self.saved.append((series, appointments))
+        return series
+
+class RecordingPublisher:
+    def __init__(self):
+        self.events = []
+
+    async def publish(self, event_type, data):
+        self.events.append((event_type, data))
+
+def create_series(booked=(), skip_conflicts=False):
+    repository = RecordingRepository()
+    publisher = RecordingPublisher()
+    use_case = CreateRecurringSeriesUseCase(
+        repository,
+        BookedDatesAvailabilityService(booked),
+        AcceptingValidationService(),
+        publisher
+    )
+    result = asyncio.run(use_case.execute(
+        {
+            'patient_id': "123e4567-e89b-12d3-a456-426614174000",
+            'doctor_id': "987f6543-e21b-12d3-a456-426614174000",
+            'appointment_date': "2030-01-07",
+            'appointment_time': "09:00",
+            'duration_minutes': 30,
+            'recurrence': {'frequency': 'weekly', 'count': 3}
+        },
+        skip_conflicts=skip_conflicts
+    ))
+    return result, repository, publisher
+
+def test_series_books_every_occurrence_in_one_save_and_one_event():
+    (series, appointments, skipped), repository, publisher = create_series()
+
+    assert [apt.appointment_date for apt in appointments] == [
+        date(2030, 1, 7), date(2030, 1, 14), date(2030, 1, 21)
+    ]
+    assert skipped == []
+    assert all(apt.series_id == str(series.id) for apt in appointments)
+    assert len(repository.saved) == 1
+    ((event_type, data),) = publisher.events
+    assert event_type == 'appointment.series_created'
+    assert data['appointment_dates'] == ["2030-01-07", "2030-01-14", "2030-01-21"]
+
+def test_series_conflict_rejects_the_whole_series():
+    with pytest.raises(SlotUnavailableError):
+        create_series(booked=[date(2030, 1, 14)])
+
+def test_series_conflict_is_skipped_on_request():
+    (series, appointments, skipped), repository, publisher = create_series(
+        booked=[date(2030, 1, 14)], skip_conflicts=True
+    )
+
+    assert [apt.appointment_date for apt in appointments] == [date(2030, 1, 7), date(2030, 1, 21)]
+    assert skipped == [date(2030, 1, 14)]